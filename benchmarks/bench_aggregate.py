@@ -0,0 +1,44 @@
+"""
+Замер агрегации транзакций (сумма, количество, среднее по складам и продуктам):
+выгрузка всех транзакций в JSON для подсчёта на клиенте, Aggregator за один проход по моделям
+и агрегация над колоночным хранилищем (TransactionColumns).
+Запуск из корня проекта: python -m benchmarks.bench_aggregate [количество транзакций ...]
+"""
+import sys
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.core.aggregator import Aggregator
+from src.core.prototype import Prototype
+from src.dto.aggregate_dto import AggregateDto
+from src.dto.filter_dto import FilterDto
+from src.logics.responses.json_response import JsonResponse
+from src.logics.transaction_columns import TransactionColumns
+
+AGGREGATES = [AggregateDto(field_name="value", func="sum"), AggregateDto(func="count"),
+              AggregateDto(field_name="value", func="avg")]
+FILTERS = [FilterDto(field_name="value", value=0, op=">")]
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+    columns = TransactionColumns(transactions)
+
+    rows = []
+    for group_by in (["storage"], ["storage", "product"]):
+        expected = Aggregator.aggregate(Prototype(transactions).lazy().filter_mul(FILTERS), group_by, AGGREGATES)
+        assert len(columns.aggregate(FILTERS, None, group_by, AGGREGATES)) == len(expected)
+
+        export_time = measure(lambda: JsonResponse.build(Prototype(transactions).filter_mul(FILTERS).data), repeat=1)
+        one_pass_time = measure(lambda: Aggregator.aggregate(Prototype(transactions).lazy().filter_mul(FILTERS),
+                                                             group_by, AGGREGATES))
+        columns_time = measure(lambda: columns.aggregate(FILTERS, None, group_by, AGGREGATES))
+        rows.append([transactions_count, ", ".join(group_by), len(expected),
+                     f"{export_time:.3f}", f"{one_pass_time:.3f}", f"{columns_time:.4f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("Агрегация транзакций (секунды)",
+                ["Транзакции", "Группировка", "Строк", "Выгрузка JSON", "Aggregator", "Столбцы"],
+                [row for size in sizes for row in run(size)])
@@ -0,0 +1,51 @@
+"""
+Замер конвертации транзакций в словари для JSON: исходная реализация (выбор конвертера перебором
+_type_to_converter с issubclass и новый экземпляр конвертера для каждого значения, get_fields с dir и getattr
+для каждой модели) и функции конвертации FactoryConverters, скомпилированные для каждого класса.
+Запуск из корня проекта: python -m benchmarks.bench_converters [количество транзакций ...]
+"""
+import json
+import sys
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.core.functions import get_fields
+from src.logics.converters.dict_converter import DictConverter
+from src.logics.converters.iterable_converter import IterableConverter
+from src.logics.converters.model_converter import ModelConverter
+from src.logics.factory_converters import FactoryConverters
+
+
+def convert_reflection(obj):
+    """Исходная реализация FactoryConverters.convert и ModelConverter.convert"""
+    for types, converter_class in FactoryConverters._type_to_converter.items():
+        if not isinstance(types, tuple):
+            types = (types,)
+        if issubclass(type(obj), types):
+            converter = converter_class()
+            break
+    if isinstance(converter, ModelConverter):
+        return {field: convert_reflection(getattr(obj, field)) for field in get_fields(obj)}
+    if isinstance(converter, DictConverter):
+        return {key: convert_reflection(value) for key, value in obj.items()}
+    if isinstance(converter, IterableConverter):
+        return [convert_reflection(item) for item in obj]
+    return converter.convert(obj)
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+    assert FactoryConverters.convert(transactions[:1000]) == convert_reflection(transactions[:1000])
+
+    reflection_time = measure(lambda: convert_reflection(transactions), repeat=1)
+    compiled_time = measure(lambda: FactoryConverters.convert(transactions))
+    reflection_json_time = measure(lambda: json.dumps(convert_reflection(transactions), ensure_ascii=False), repeat=1)
+    compiled_json_time = measure(lambda: json.dumps(FactoryConverters.convert(transactions), ensure_ascii=False))
+    return [[transactions_count, "convert", f"{reflection_time:.3f}", f"{compiled_time:.3f}"],
+            [transactions_count, "convert + json.dumps", f"{reflection_json_time:.3f}", f"{compiled_json_time:.3f}"]]
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("Конвертация транзакций для JSON (секунды)",
+                ["Транзакции", "Операция", "get_fields", "Скомпилированные функции"],
+                [row for size in sizes for row in run(size)])
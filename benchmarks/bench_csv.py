@@ -0,0 +1,55 @@
+"""
+Замер CSV ответа по транзакциям: исходная реализация (get_fields, str для каждого значения,
+склейка строк через text +=), CsvResponse.build (модуль csv, план столбцов один раз на класс)
+и CsvResponse.stream: время до первой части, общее время и пиковая память (tracemalloc).
+Запуск из корня проекта: python -m benchmarks.bench_csv [количество транзакций ...]
+"""
+import sys
+
+from benchmarks.bench_json_stream import consume, peak_memory
+from benchmarks.functions import create_dataset, print_table
+from src.core.functions import get_fields
+from src.logics.responses.csv_response import CsvResponse
+
+
+def build_concat(transactions: list) -> str:
+    """Исходная реализация CsvResponse.build"""
+    result = []
+    fields = get_fields(transactions[0])
+    result.append(list(fields.keys()))
+    for item in transactions:
+        result.append([str(getattr(item, field)) for field in fields])
+
+    text = ""
+    for row in result:
+        text += ";".join(row) + '\n'
+    return text
+
+
+def concat_chunks(transactions: list):
+    """Исходное тело ответа одной частью"""
+    yield build_concat(transactions)
+
+
+def build_chunks(transactions: list):
+    """Тело ответа CsvResponse.build одной частью"""
+    yield CsvResponse.build(transactions)
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+    assert "".join(CsvResponse.stream(transactions[:5000])) == CsvResponse.build(transactions[:5000])
+
+    rows = []
+    for title, chunks in (("text +=", concat_chunks), ("build", build_chunks), ("stream", CsvResponse.stream)):
+        first, total = consume(chunks(transactions))
+        peak = peak_memory(chunks(transactions))
+        rows.append([transactions_count, title, f"{first:.4f}", f"{total:.3f}", f"{peak:.1f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("CSV ответ по транзакциям",
+                ["Транзакции", "Ответ", "Первая часть (секунды)", "Всего (секунды)", "Пик памяти (МБ)"],
+                [row for size in sizes for row in run(size)])
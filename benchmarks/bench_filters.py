@@ -0,0 +1,46 @@
+"""
+Замер фильтрации Prototype.filter_mul: последовательное применение фильтров
+(по одному проходу и списку на каждый фильтр) и компилированный предикат FilterCompiler.
+Запуск из корня проекта: python -m benchmarks.bench_filters [количество элементов]
+"""
+import sys
+from datetime import datetime
+from itertools import cycle, islice
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.core.functions import get_nested_attr
+from src.core.prototype import Prototype
+from src.dto.filter_dto import FilterDto
+
+# Фильтры, которые пропускают почти все элементы (чтобы проверялись все условия)
+FILTERS = [
+    FilterDto(field_name="value", value=-1000.0, op=">="),
+    FilterDto(field_name="product.name", value="", op="!="),
+    FilterDto(field_name="storage.id", value="", op="!="),
+    FilterDto(field_name="period", value=datetime(2000, 1, 1), op=">="),
+    FilterDto(field_name="unit.conversion_factor", value=0.0, op=">"),
+]
+
+
+def filter_sequential(data: list, dtos: list[FilterDto]) -> list:
+    """Прежний алгоритм: отдельный проход и новый список на каждый фильтр"""
+    for dto in dtos:
+        func = Prototype._operator_to_func[dto.op]
+        data = list(filter(lambda item: func(get_nested_attr(item, dto.field_name.split(".")), dto.value), data))
+    return data
+
+
+if __name__ == '__main__':
+    items_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    transactions, _, _ = create_dataset(items_count)
+
+    rows = []
+    for filters_count in [1, 5, 20]:
+        dtos = list(islice(cycle(FILTERS), filters_count))
+        sequential_time = measure(lambda: filter_sequential(transactions, dtos), repeat=1)
+        compiled_time = measure(lambda: Prototype(transactions).filter_mul(dtos), repeat=1)
+        rows.append([filters_count, f"{sequential_time:.3f}", f"{compiled_time:.3f}",
+                     f"{sequential_time / compiled_time:.1f}x"])
+
+    print_table(f"Фильтрация {items_count} элементов (секунды)",
+                ["Фильтров", "последовательно", "компилированный предикат", "ускорение"], rows)
@@ -0,0 +1,68 @@
+"""
+Замер отбора транзакций по вторичным индексам (HashIndex, RangeIndex) и последовательным просмотром,
+в том числе по деревьям фильтров (FilterExpressionDto).
+Индексы строятся по тем же полям, что и в Repository.
+Запуск из корня проекта: python -m benchmarks.bench_indexes [количество транзакций ...]
+"""
+import sys
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.core.hash_index import HashIndex
+from src.core.indexed_list import IndexedList
+from src.core.prototype import Prototype
+from src.core.range_index import RangeIndex
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+
+
+def cases(transactions: list) -> dict[str, list[FilterDto]]:
+    product = transactions[0].product
+    storage = transactions[0].storage
+    return {
+        "product.id ==": [FilterDto(field_name="product.id", value=product.id, op="==")],
+        "value > 900": [FilterDto(field_name="value", value=900, op=">")],
+        "storage ==, value > 50": [FilterDto(field_name="storage", value=storage, op="=="),
+                                   FilterDto(field_name="value", value=50, op=">")],
+        "product ==, storage ==": [FilterDto(field_name="product", value=product, op="=="),
+                                   FilterDto(field_name="storage.id", value=storage.id, op="==")],
+    }
+
+
+def expression_cases(transactions: list) -> dict[str, FilterExpressionDto]:
+    products = [transactions[0].product, transactions[1].product]
+    storage = transactions[0].storage
+    either_product = FilterExpressionDto(op="or", filters=[FilterDto(field_name="product", value=product, op="==")
+                                                           for product in products])
+    return {
+        "product == or product ==": either_product,
+        "(product or product), storage ==": FilterExpressionDto(
+            filters=[FilterDto(field_name="storage.id", value=storage.id, op="==")], expressions=[either_product]),
+        "storage == or value > 990": FilterExpressionDto(op="or", filters=[
+            FilterDto(field_name="storage", value=storage, op="=="), FilterDto(field_name="value", value=990, op=">")]),
+    }
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+    indexes = {"product.id": HashIndex("product.id"), "storage.id": HashIndex("storage.id"), "value": RangeIndex("value")}
+    for index in indexes.values():
+        index.extend(transactions)
+    indexed = IndexedList(transactions, indexes)
+
+    rows = []
+    for name, filters in cases(transactions).items():
+        linear_time = measure(lambda: Prototype(transactions).filter_mul(filters))
+        index_time = measure(lambda: Prototype(indexed).filter_mul(filters))
+        rows.append([transactions_count, name, f"{linear_time:.4f}", f"{index_time:.4f}"])
+    for name, expression in expression_cases(transactions).items():
+        linear_time = measure(lambda: Prototype(transactions).filter_expr(expression))
+        index_time = measure(lambda: Prototype(indexed).filter_expr(expression))
+        rows.append([transactions_count, name, f"{linear_time:.4f}", f"{index_time:.4f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    print_table("Отбор по вторичным индексам (секунды)",
+                ["Транзакции", "Фильтры", "Просмотр", "Индексы"],
+                [row for size in sizes for row in run(size)])
@@ -0,0 +1,28 @@
+"""
+Замер JSON ответа по транзакциям: вложенные модели раскрываются в каждой строке (JsonResponse)
+и выводятся один раз в таблице ссылок (JsonRefsResponse, аргумент запроса refs=true).
+Запуск из корня проекта: python -m benchmarks.bench_json_refs [количество транзакций ...]
+"""
+import sys
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.logics.responses.json_refs_response import JsonRefsResponse
+from src.logics.responses.json_response import JsonResponse
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+
+    rows = []
+    for title, response in (("JsonResponse", JsonResponse), ("JsonRefsResponse", JsonRefsResponse)):
+        size = len(response.build(transactions).encode("utf-8"))
+        build_time = measure(lambda: response.build(transactions))
+        rows.append([transactions_count, title, f"{size / 1024 / 1024:.1f}", f"{build_time:.3f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("JSON ответ по транзакциям",
+                ["Транзакции", "Ответ", "Размер (МБ)", "Время (секунды)"],
+                [row for size in sizes for row in run(size)])
@@ -0,0 +1,57 @@
+"""
+Замер JSON ответа по транзакциям: тело целиком (JsonResponse.build), по частям (JsonResponse.stream)
+и NDJSON по частям (NdjsonResponse.stream):
+время до первой части, общее время и пиковая память (tracemalloc) при передаче частей.
+Запуск из корня проекта: python -m benchmarks.bench_json_stream [количество транзакций ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.functions import create_dataset, print_table
+from src.logics.responses.json_response import JsonResponse
+from src.logics.responses.ndjson_response import NdjsonResponse
+
+
+def consume(chunks) -> tuple[float, float]:
+    """Передать части (без хранения): время до первой части и общее время"""
+    started = time.perf_counter()
+    first = None
+    for _ in chunks:
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def peak_memory(chunks) -> float:
+    """Пиковая память (МБ) при передаче частей"""
+    tracemalloc.start()
+    for _ in chunks:
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def build_chunks(transactions: list):
+    """Тело ответа одной частью"""
+    yield JsonResponse.build(transactions)
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+    assert "".join(JsonResponse.stream(transactions[:5000])) == JsonResponse.build(transactions[:5000])
+
+    rows = []
+    for title, chunks in (("build", build_chunks), ("stream", JsonResponse.stream), ("ndjson", NdjsonResponse.stream)):
+        first, total = consume(chunks(transactions))
+        peak = peak_memory(chunks(transactions))
+        rows.append([transactions_count, title, f"{first:.4f}", f"{total:.3f}", f"{peak:.1f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("Потоковый JSON ответ по транзакциям",
+                ["Транзакции", "Ответ", "Первая часть (секунды)", "Всего (секунды)", "Пик памяти (МБ)"],
+                [row for size in sizes for row in run(size)])
@@ -0,0 +1,50 @@
+"""
+Замер оператора like на наименованиях продуктов: re.fullmatch для каждого элемента (как было)
+и скомпилированный один раз на фильтр шаблон LikePattern (строковые методы для литеральных шаблонов).
+Запуск из корня проекта: python -m benchmarks.bench_like [количество продуктов ...]
+"""
+import re
+import sys
+
+from benchmarks.functions import measure, print_table
+from src.core.prototype import Prototype
+from src.dto.filter_dto import FilterDto
+from src.models.product import ProductModel
+
+# Шаблоны: префикс, суффикс, подстрока, регулярное выражение, без учёта регистра
+PATTERNS = [
+    ("like", "Продукт 12.*"),
+    ("like", ".*99"),
+    ("like", ".*укт 5.*"),
+    ("like", "Продукт [0-9]*7"),
+    ("ilike", "продукт 3.*"),
+    ("ilike", "ПРОДУКТ [0-9]*7"),
+]
+
+
+def filter_fullmatch(items: list, dto: FilterDto) -> list:
+    """Исходная реализация: re.fullmatch с разбором шаблона через внутренний кеш re для каждого элемента"""
+    flags = re.IGNORECASE if dto.op == "ilike" else 0
+    return [item for item in items if re.fullmatch(dto.value, item.name, flags)]
+
+
+def run(products_count: int) -> list[list]:
+    products = [ProductModel.create(f"Продукт {number}") for number in range(products_count)]
+
+    rows = []
+    for op, pattern in PATTERNS:
+        dto = FilterDto(field_name="name", value=pattern, op=op)
+        expected = filter_fullmatch(products, dto)
+        assert Prototype(products).filter(dto).data == expected
+
+        fullmatch_time = measure(lambda: filter_fullmatch(products, dto))
+        compiled_time = measure(lambda: Prototype(products).filter(dto))
+        rows.append([products_count, f"{op} {pattern}", len(expected), f"{fullmatch_time:.4f}", f"{compiled_time:.4f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("Оператор like по наименованиям продуктов (секунды)",
+                ["Продукты", "Шаблон", "Найдено", "re.fullmatch", "LikePattern"],
+                [row for size in sizes for row in run(size)])
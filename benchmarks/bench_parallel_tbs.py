@@ -0,0 +1,55 @@
+"""
+Замер масштабирования ParallelTbsEngine по количеству процессов-исполнителей.
+Сводная ведомость по всем складам (без фильтра по складу), разбиение по моделям
+и по колоночному хранилищу TransactionColumns.
+
+Последовательная часть основного процесса (разбиение по складам) замеряется отдельно:
+ускорение на любом количестве ядер не превышает отношения времени расчёта в одном процессе
+к этой части.
+Запуск из корня проекта: python -m benchmarks.bench_parallel_tbs [количество транзакций]
+"""
+import os
+import sys
+from datetime import datetime
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.tbs_engines.hash_tbs_engine import HashTbsEngine
+from src.logics.tbs_engines.parallel_tbs_engine import ParallelTbsEngine
+from src.logics.transaction_columns import TransactionColumns
+
+START = datetime(2024, 6, 1)
+END = datetime(2024, 6, 30, 23, 59, 59)
+# Количество процессов (целевое оборудование - 12 ядер, см. docs/TechnicalTask.md)
+WORKERS = [1, 2, 4, 8, 12]
+
+
+if __name__ == '__main__':
+    transactions_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    transactions, products, _ = create_dataset(transactions_count, storages_count=12)
+    columns = TransactionColumns(transactions)
+    dto = FilterTbsDto()
+
+    hash_time = measure(lambda: HashTbsEngine().calculate(transactions, products, dto, START, END))
+    rows = [["hash", "-", f"{hash_time:.3f}", "1.0x", "-"]]
+    for title, engine_columns in (("модели", None), ("столбцы", columns)):
+        # Последовательное разбиение по складам в основном процессе
+        engine = ParallelTbsEngine(1, engine_columns)
+        if engine_columns is None:
+            partition_time = measure(lambda: engine._ParallelTbsEngine__partition_models(transactions, dto))
+        else:
+            partition_time = measure(lambda: engine._ParallelTbsEngine__partition_columns(columns, dto, END))
+
+        for workers in WORKERS:
+            engine = ParallelTbsEngine(workers, engine_columns)
+            # Первый запуск создаёт пул процессов и в замер не входит
+            engine.calculate(transactions, products, dto, START, END)
+            elapsed = measure(lambda: engine.calculate(transactions, products, dto, START, END))
+            engine.close()
+            bound = f"{elapsed / partition_time:.0f}x" if workers == 1 else ""
+            rows.append([f"parallel ({title}), {workers}", f"{partition_time:.3f}", f"{elapsed:.3f}",
+                         f"{hash_time / elapsed:.1f}x", bound])
+
+    print_table(f"Сводная ОСВ, {transactions_count} транзакций, ядер на машине: {os.cpu_count()}",
+                ["Движок, процессов", "Разбиение в основном процессе (с)", "Время (с)", "Ускорение",
+                 "Предел ускорения"], rows)
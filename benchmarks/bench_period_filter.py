@@ -0,0 +1,45 @@
+"""
+Замер отбора транзакций по диапазону дат: последовательный Prototype.filter
+и двоичный поиск по упорядоченному по дате SortedList (как в Repository).
+Запуск из корня проекта: python -m benchmarks.bench_period_filter [количество транзакций ...]
+"""
+import sys
+from datetime import datetime
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.core.prototype import Prototype
+from src.core.sorted_list import SortedList
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.turnover_balance_sheet import TurnoverBalanceSheet
+
+# Неделя из года истории
+START = datetime(2024, 6, 1)
+END = datetime(2024, 6, 7, 23, 59, 59)
+BLOCK_DATE = datetime(2024, 5, 1)
+FILTERS = [FilterDto(field_name="period", value=BLOCK_DATE, op=">="), FilterDto(field_name="period", value=END, op="<=")]
+
+
+def run(transactions_count: int) -> list:
+    transactions, products, _ = create_dataset(transactions_count)
+    ordered = SortedList(sorted(transactions, key=lambda item: item.period), "period")
+
+    linear_time = measure(lambda: Prototype(transactions).filter_mul(FILTERS))
+    bisect_time = measure(lambda: Prototype(ordered).filter_mul(FILTERS))
+    tbs_linear_time = measure(lambda: TurnoverBalanceSheet.calculate(transactions, products, FilterTbsDto(), START, END, BLOCK_DATE))
+    tbs_bisect_time = measure(lambda: TurnoverBalanceSheet.calculate(ordered, products, FilterTbsDto(), START, END, BLOCK_DATE))
+
+    return [
+        transactions_count,
+        f"{linear_time:.4f}",
+        f"{bisect_time:.4f}",
+        f"{tbs_linear_time:.4f}",
+        f"{tbs_bisect_time:.4f}",
+    ]
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    print_table("Отбор по диапазону дат (секунды)",
+                ["Транзакции", "filter, список", "filter, SortedList", "ОСВ, список", "ОСВ, SortedList"],
+                [run(size) for size in sizes])
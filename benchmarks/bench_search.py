@@ -0,0 +1,53 @@
+"""
+Замер поиска по наименованиям продуктов: фильтр like/contains по всем наименованиям (просмотр)
+и n-граммный индекс NgramIndex (поиск при наборе текста).
+Запуск из корня проекта: python -m benchmarks.bench_search [количество продуктов ...]
+"""
+import random
+import sys
+import time
+
+from benchmarks.functions import measure, print_table
+from src.core.ngram_index import NgramIndex
+from src.core.prototype import Prototype
+from src.dto.filter_dto import FilterDto
+from src.models.product import ProductModel
+
+WORDS = ["Мука", "Сахар", "Молоко", "Масло", "Сыр", "Яйцо", "Крупа", "Соль", "Перец", "Говядина", "Курица", "Рис",
+         "пшеничная", "ржаная", "сливочное", "твёрдый", "куриное", "рассыпчатый", "молотый", "охлаждённая"]
+
+# Запросы при наборе текста: начало слова, подстрока через пробел, подстрока внутри слова
+QUERIES = ["му", "мука", "сливоч", "ное 12", "ука"]
+
+
+def create_products(count: int, seed: int = 1) -> list[ProductModel]:
+    rnd = random.Random(seed)
+    return [ProductModel.create(f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {number}",
+                                f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {rnd.choice(WORDS)} арт. {number}")
+            for number in range(count)]
+
+
+def run(products_count: int) -> list[list]:
+    products = create_products(products_count)
+    index = NgramIndex(["name", "full_name"])
+    started = time.perf_counter()
+    index.extend(products)
+    build_time = time.perf_counter() - started
+
+    rows = []
+    # Последний запрос - наименование продукта целиком
+    for query in QUERIES + [products[products_count // 2].name]:
+        pattern = f"(?i).*{query}.*"
+        scan = lambda: Prototype(products).filter(FilterDto(field_name="name", value=pattern, op="like")).data
+        scan_time = measure(scan)
+        index_time = measure(lambda: index.search(query, 20), repeat=20)
+        rows.append([products_count, query, len(index.search(query, products_count)), f"{build_time:.2f}",
+                     f"{scan_time * 1000:.1f}", f"{index_time * 1000:.3f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("Поиск по наименованиям продуктов (построение - секунды, поиск - миллисекунды)",
+                ["Продукты", "Запрос", "Найдено", "Построение", "like (просмотр)", "NgramIndex, 20 лучших"],
+                [row for size in sizes for row in run(size)])
@@ -0,0 +1,55 @@
+"""
+Замер сортировки транзакций: ключ из get_nested_attr с разбором пути для каждого элемента (как было)
+и Sorter (attrgetter один раз на сортировку, направление для каждого поля, порядок RangeIndex).
+Запуск из корня проекта: python -m benchmarks.bench_sort [количество транзакций ...]
+"""
+import sys
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.core.functions import get_nested_attr
+from src.core.indexed_list import IndexedList
+from src.core.prototype import Prototype
+from src.core.range_index import RangeIndex
+from src.dto.sort_field_dto import SortFieldDto
+from src.dto.sorting_dto import SortingDto
+
+# Сортировки: по вложенным полям, по полю RangeIndex, с разными направлениями полей
+SORTS = [
+    ("product.name, period", SortingDto(field_names=["product.name", "period"])),
+    ("value desc (RangeIndex)", SortingDto(field_names=["value"], descending=True)),
+    ("storage.name, value desc", SortingDto(fields=[SortFieldDto(field_name="storage.name"),
+                                                    SortFieldDto(field_name="value", descending=True)])),
+]
+
+
+def sort_nested_attr(items: list, dto: SortingDto) -> list:
+    """Исходная реализация (одно направление для всех полей)"""
+    return sorted(items, key=lambda item: [get_nested_attr(item, field.split(".")) for field in dto.field_names],
+                  reverse=dto.descending)
+
+
+def run(transactions_count: int) -> list[list]:
+    transactions, _, _ = create_dataset(transactions_count)
+    index = RangeIndex("value")
+    index.extend(transactions)
+    indexed = IndexedList(transactions, {"value": index})
+
+    rows = []
+    for title, dto in SORTS:
+        expected = Prototype(list(transactions)).sort(dto).data
+        assert Prototype(indexed).sort(dto).data == expected
+        assert Prototype(indexed).lazy().sort(dto).limit(20).data == expected[:20]
+
+        old_time = measure(lambda: sort_nested_attr(transactions, dto)) if not dto.fields else None
+        sorter_time = measure(lambda: Prototype(indexed).sort(dto))
+        top_time = measure(lambda: Prototype(indexed).lazy().sort(dto).limit(20).data)
+        rows.append([transactions_count, title, "-" if old_time is None else f"{old_time:.4f}",
+                     f"{sorter_time:.4f}", f"{top_time:.4f}"])
+    return rows
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    print_table("Сортировка транзакций (секунды)",
+                ["Транзакции", "Сортировка", "get_nested_attr", "Sorter", "Sorter, limit 20"],
+                [row for size in sizes for row in run(size)])
@@ -0,0 +1,58 @@
+"""
+Замер скорости расчёта оборотно-сальдовой ведомости разными движками.
+Запуск из корня проекта: python -m benchmarks.bench_tbs [количество транзакций ...]
+"""
+import sys
+from datetime import datetime
+
+from benchmarks.functions import create_dataset, measure, print_table
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.balance_index import BalanceIndex
+from src.logics.tbs_engines.hash_tbs_engine import HashTbsEngine
+from src.logics.tbs_engines.prefix_index_tbs_engine import PrefixIndexTbsEngine
+from src.logics.tbs_engines.prototype_tbs_engine import PrototypeTbsEngine
+from src.logics.tbs_engines.vectorized_tbs_engine import VectorizedTbsEngine
+from src.logics.transaction_columns import TransactionColumns
+from src.logics.turnover_balance_sheet import TurnoverBalanceSheet
+
+START = datetime(2024, 6, 1)
+END = datetime(2024, 6, 30, 23, 59, 59)
+
+
+def run(transactions_count: int, products_count: int, with_prototype: bool) -> list:
+    transactions, products, _ = create_dataset(transactions_count, products_count)
+    columns = TransactionColumns(transactions)
+    index = BalanceIndex(transactions)
+    dto = FilterTbsDto()
+
+    def calculate(engine):
+        return lambda: TurnoverBalanceSheet.calculate(transactions, products, dto, START, END, engine=engine)
+
+    hash_time = measure(calculate(HashTbsEngine()))
+    vectorized_time = measure(calculate(VectorizedTbsEngine(columns)))
+    index_time = measure(calculate(PrefixIndexTbsEngine(index)))
+    build_time = measure(lambda: TransactionColumns(transactions), repeat=1)
+    index_build_time = measure(lambda: BalanceIndex(transactions), repeat=1)
+    prototype_time = measure(calculate(PrototypeTbsEngine()), repeat=1) if with_prototype else None
+
+    return [
+        transactions_count,
+        products_count,
+        f"{prototype_time:.3f}" if prototype_time is not None else "-",
+        f"{hash_time:.3f}",
+        f"{vectorized_time:.3f}",
+        f"{hash_time / vectorized_time:.1f}x",
+        f"{index_time:.4f}",
+        f"{build_time:.3f}",
+        f"{index_build_time:.3f}",
+    ]
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    rows = [run(2_000, 30, True)]
+    rows += [run(size, 300, False) for size in sizes]
+    print_table("Расчёт ОСВ (секунды)",
+                ["Транзакции", "Продукты", "prototype", "hash", "vectorized", "hash / vectorized", "index",
+                 "построение столбцов", "построение индекса"],
+                rows)
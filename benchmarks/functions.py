@@ -0,0 +1,64 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.product import ProductModel
+from src.models.product_group import ProductGroupModel
+from src.models.storage import StorageModel
+from src.models.transaction import TransactionModel
+
+
+def create_dataset(transactions_count: int, products_count: int = 300, storages_count: int = 11, seed: int = 1):
+    """
+    Генерирует тестовый набор данных для замеров: склады, продукты в граммах/килограммах
+    и транзакции за 2024 год в случайном порядке.
+
+    :param transactions_count: Количество транзакций.
+    :param products_count: Количество продуктов.
+    :param storages_count: Количество складов (по умолчанию 10 ресторанов и цех).
+    :param seed: Зерно генератора случайных чисел для воспроизводимости.
+    :return: Кортеж (список транзакций, словарь продуктов {id: ProductModel}, список складов).
+    """
+    rnd = random.Random(seed)
+    gr = MeasurementUnitModel.create('Грамм')
+    kg = MeasurementUnitModel.create('Килограмм', 1000.0, gr)
+    groups = [ProductGroupModel.create(f'Группа {i}') for i in range(10)]
+    products = [ProductModel.create(f'Продукт {i}', unit=gr, group=groups[i % len(groups)]) for i in range(products_count)]
+    storages = [StorageModel.create(f'Склад {i}', f'Адрес {i}') for i in range(storages_count)]
+
+    start = datetime(2024, 1, 1)
+    transactions = []
+    for _ in range(transactions_count):
+        transactions.append(TransactionModel.create(
+            start + timedelta(days=rnd.randrange(366)),
+            float(rnd.randint(-500, 1000)),
+            kg if rnd.random() < 0.3 else gr,
+            rnd.choice(products),
+            rnd.choice(storages)))
+
+    return transactions, {product.id: product for product in products}, storages
+
+
+def measure(func, repeat: int = 3) -> float:
+    """
+    Возвращает минимальное время выполнения функции (в секундах) из нескольких запусков.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def print_table(title: str, headers: list[str], rows: list[list]):
+    """
+    Печатает результаты замеров в виде markdown таблицы.
+    """
+    print(f"\n### {title}\n")
+    print("| " + " | ".join(headers) + " |")
+    print("|" + "---|" * len(headers))
+    for row in rows:
+        print("| " + " | ".join(str(value) for value in row) + " |")
@@ -1,21 +1,37 @@
 from datetime import datetime
 
 import connexion
-from flask import request
+from flask import Response, request
 
+from src.core.aggregator import Aggregator
 from src.core.functions import dump_json
+from src.core.observe_service import ObserveService
 from src.core.prototype import Prototype
+from src.dto.filter_aggregate_dto import FilterAggregateDto
 from src.dto.filter_dto import FilterDto
 from src.dto.filter_models_dto import FilterModelsDto
 from src.dto.filter_tbs_dto import FilterTbsDto
 from src.dto.functions import create_dto
 from src.export_manager import ExportManager
+from src.logics.balance_index import BalanceIndex
 from src.logics.factory_converters import FactoryConverters
 from src.logics.factory_entities import FactoryEntities
+from src.logics.factory_tbs_engines import FactoryTbsEngines
+from src.logics.name_search import NameSearch
+from src.logics.remains_checkpoints import RemainsCheckpoints
+from src.logics.responses.abstract_response import AbstractResponse
 from src.logics.responses.error_response import ErrorResponse
 from src.logics.responses.json_response import JsonResponse
 from src.logics.responses.response_format import ResponseFormat
+from src.logics.tbs_cache import TbsCache
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.tbs_engines.parallel_tbs_engine import ParallelTbsEngine
+from src.logics.tbs_engines.prefix_index_tbs_engine import PrefixIndexTbsEngine
+from src.logics.tbs_engines.tbs_engine_type import TbsEngineType
+from src.logics.tbs_engines.vectorized_tbs_engine import VectorizedTbsEngine
+from src.logics.transaction_columns import TransactionColumns
 from src.logics.turnover_balance_sheet import TurnoverBalanceSheet
+from src.logics.turnover_period import TurnoverPeriod
 from src.repository import RepoKeys, Repository
 from src.settings_manager import SettingsManager
 from src.start_service import StartService
@@ -26,12 +42,72 @@ settings_manager = SettingsManager()
 settings_manager.load()
 settings = settings_manager.settings
 
+# Колоночное хранилище транзакций, синхронизированное с репозиторием
+transaction_columns = TransactionColumns(repository.get_values(RepoKeys.TRANSACTIONS))
+ObserveService.add(transaction_columns)
+# Индекс накопленных дневных оборотов, синхронизированный с репозиторием
+balance_index = BalanceIndex(repository.get_values(RepoKeys.TRANSACTIONS))
+ObserveService.add(balance_index)
+# Помесячные контрольные точки остатков, синхронизированные с репозиторием
+remains_checkpoints = RemainsCheckpoints(repository.get_values(RepoKeys.TRANSACTIONS),
+                                         repository.get_values(RepoKeys.REMAINS_CHECKPOINTS), settings.block_date)
+ObserveService.add(remains_checkpoints)
+# Поиск по наименованиям продуктов, групп и рецептов, синхронизированный с репозиторием
+name_search = NameSearch(repository)
+ObserveService.add(name_search)
+# Кеш результатов ОСВ, сбрасываемый по изменениям репозитория
+tbs_cache = TbsCache()
+ObserveService.add(tbs_cache)
+# Многопроцессный движок ОСВ над колоночным хранилищем (пул процессов создаётся при первом расчёте и переиспользуется)
+parallel_tbs_engine = ParallelTbsEngine(columns=transaction_columns)
+
 app = connexion.FlaskApp(__name__)
 # todo fix swagger
 # app.add_api('swagger.yaml', base_path='/api')
 # Ссылка на документацию
 # http://127.0.0.1:8080/api/ui/
 
+def create_tbs_engine(name: str | None, default: TbsEngineType = TbsEngineType.HASH) -> AbstractTbsEngine:
+    """
+    Создать движок расчёта ОСВ по значению аргумента 'engine' (по умолчанию default)
+    """
+    engine_type = TbsEngineType(name) if name else default
+    if engine_type == TbsEngineType.VECTORIZED:
+        return VectorizedTbsEngine(transaction_columns)
+    if engine_type == TbsEngineType.INDEX:
+        return PrefixIndexTbsEngine(balance_index)
+    if engine_type == TbsEngineType.PARALLEL:
+        return parallel_tbs_engine
+    return FactoryTbsEngines().create(engine_type)()
+
+def json_format() -> ResponseFormat:
+    """
+    Формат JSON ответа по аргументам запроса:
+    'format=ndjson' - по одному JSON объекту в строке (ResponseFormat.NDJSON, ответ передаётся потоком);
+    'refs=true' - модели, вложенные в модели, выводятся один раз в таблице refs
+    и заменяются ссылками {"id": ...} (ResponseFormat.JSON_REFS)
+    """
+    if request.args.get('format', '').lower() == ResponseFormat.NDJSON:
+        return ResponseFormat.NDJSON
+    if request.args.get('refs', '').lower() == 'true':
+        return ResponseFormat.JSON_REFS
+    return ResponseFormat.JSON
+
+# Количество моделей, начиная с которого ответ передаётся потоком по частям
+STREAM_THRESHOLD = 10_000
+
+def respond(response: type[AbstractResponse], data, size: int):
+    """
+    Тело ответа: строка (build) или, если моделей не меньше STREAM_THRESHOLD или формат потоковый
+    (AbstractResponse.streaming), потоковый ответ Flask с частями stream
+    (сериализация по мере передачи, без построения всего ответа в памяти)
+    """
+    if response.streaming or size >= STREAM_THRESHOLD:
+        return Response(response.stream(data), mimetype=response.mimetype)
+    if response.mimetype is not None:
+        return Response(response.build(data), mimetype=response.mimetype)
+    return response.build(data)
+
 @app.route("/api/status", methods=['GET'])
 def status():
     """
@@ -70,8 +146,7 @@ def build_response():
         return ErrorResponse.build("неверный аргумент 'model'")
 
     models = list(repository.data[model].values())
-    result = FactoryEntities().create(f).build(models)
-    return result
+    return respond(FactoryEntities().create(f), models, len(models))
 
 
 @app.route("/api/recipes", methods=['GET'])
@@ -80,8 +155,7 @@ def get_recipes():
     Получить список всех рецептов
     """
     recipes = list(repository.data[RepoKeys.RECIPES].values())
-    result = FactoryConverters.convert(recipes)
-    return JsonResponse.build(result)
+    return respond(FactoryEntities().create(json_format()), recipes, len(recipes))
 
 @app.route("/api/recipes/<recipe_id>", methods=['GET'])
 def get_recipe(recipe_id: str):
@@ -93,8 +167,7 @@ def get_recipe(recipe_id: str):
     except Exception as e:
         return ErrorResponse.build(f"не найден рецепт с id: {recipe_id}")
 
-    result = FactoryConverters.convert(recipe)
-    return JsonResponse.build(result)
+    return respond(FactoryEntities().create(json_format()), recipe, 1)
 
 # Пример http://127.0.0.1:8080/api/tbs/7dc27e96-e6ad-4e5e-8c56-84e00667e3d7?start_date=2025-01-02&end_date=2025-02-01
 @app.route("/api/tbs/<storage_id>", methods=['GET'])
@@ -104,6 +177,7 @@ def get_tbs(storage_id: str):
     - `storage_id`: уникальный код склада
     - `start_date`: начальная дата отчёта
     - `end_date`: дата окончания отчёта
+    - `engine`: движок расчёта (prototype, hash, vectorized, index, parallel; по умолчанию index), необязательный
     """
 
     storage = start_service.repo.data[RepoKeys.STORAGES].get(storage_id)
@@ -115,6 +189,7 @@ def get_tbs(storage_id: str):
 
         start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d')
         end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+        engine = create_tbs_engine(request.args.get('engine'), TbsEngineType.INDEX)
     except Exception as e:
         return ErrorResponse.build(f"Ошибка в переданных аргументах: {e}")
 
@@ -126,19 +201,26 @@ def get_tbs(storage_id: str):
             repository.get_values(RepoKeys.TRANSACTIONS),
             repository.data[RepoKeys.PRODUCTS],
             dto, start_date, end_date, settings.block_date,
-            repository.get_values(RepoKeys.PRODUCT_REMAINS))
+            repository.get_values(RepoKeys.PRODUCT_REMAINS), engine=engine, cache=tbs_cache)
     except Exception as e:
         return ErrorResponse.build(f"Ошибка во время обработки данных: {e}")
 
-    return FactoryEntities().create(ResponseFormat.JSON).build(items)
+    return respond(FactoryEntities().create(json_format()), items, len(items))
+
+@app.route("/api/tbs-cache/stats", methods=['GET'])
+def get_tbs_cache_stats():
+    """
+    Счётчики кеша ОСВ: количество записей, попадания и промахи
+    """
+    return JsonResponse.build([tbs_cache.stats()])
 
 @app.route("/api/repository/all", methods=['POST', 'GET'])
 def get_all_from_repository():
     """
     Получить все данные из Repository в формате JSON
     """
-    data = FactoryConverters.convert(repository.data)
-    return JsonResponse.build(data)
+    size = sum(len(models) for models in repository.data.values())
+    return respond(FactoryEntities().create(json_format()), repository.data, size)
 
 @app.route("/api/save_all", methods=['POST', 'GET'])
 def save_all():
@@ -154,11 +236,13 @@ def save_all():
 def get_tbs_filter():
     """
     Оборотно-сальдовая ведомость (Turnover balance sheet)
+    - `engine`: движок расчёта (prototype, hash, vectorized, index, parallel), необязательный аргумент запроса
     """
     try:
         dto: FilterTbsDto = create_dto(FilterTbsDto, request.get_json())
         start_date = datetime.strptime(dto.start_date, '%Y-%m-%d')
         end_date = datetime.strptime(dto.end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+        engine = create_tbs_engine(request.args.get('engine'))
     except Exception as e:
         return ErrorResponse.build(f"Ошибка в переданных аргументах: {e}")
 
@@ -170,16 +254,45 @@ def get_tbs_filter():
             repository.get_values(RepoKeys.TRANSACTIONS),
             repository.data[RepoKeys.PRODUCTS],
             dto, start_date, end_date, settings.block_date,
+            repository.get_values(RepoKeys.PRODUCT_REMAINS), engine=engine, cache=tbs_cache)
+    except Exception as e:
+        return ErrorResponse.build(f"Ошибка во время обработки данных: {e}")
+
+    return respond(FactoryEntities().create(json_format()), items, len(items))
+
+@app.route("/api/tbs-series", methods=['POST'])
+def get_tbs_series():
+    """
+    Временной ряд оборотов по парам (склад, продукт) с фильтрацией через тело запроса (FilterTbsDto)
+    - `period`: длительность интервала (day, week, month; по умолчанию day), необязательный аргумент запроса
+    """
+    try:
+        dto: FilterTbsDto = create_dto(FilterTbsDto, request.get_json())
+        start_date = datetime.strptime(dto.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(dto.end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+        period = TurnoverPeriod(request.args.get('period', TurnoverPeriod.DAY))
+    except Exception as e:
+        return ErrorResponse.build(f"Ошибка в переданных аргументах: {e}")
+
+    if start_date >= end_date:
+        return ErrorResponse.build(f"Конечная дата не может быть раньше начальной")
+
+    try:
+        items = TurnoverBalanceSheet.calculate_series(
+            repository.get_values(RepoKeys.TRANSACTIONS),
+            repository.data[RepoKeys.PRODUCTS],
+            dto, start_date, end_date, period, settings.block_date,
             repository.get_values(RepoKeys.PRODUCT_REMAINS))
     except Exception as e:
         return ErrorResponse.build(f"Ошибка во время обработки данных: {e}")
 
-    return FactoryEntities().create(ResponseFormat.JSON).build(items)
+    return respond(FactoryEntities().create(json_format()), items, len(items))
 
 @app.route("/api/models-filter", methods=['POST'])
 def get_models_filter():
     """
     Получить модели и отфильтровать их
+    - `explain`: true - вернуть план фильтрации (способ доступа, порядок фильтров и оценки строк) вместо моделей
     """
     try:
         dto: FilterModelsDto = create_dto(FilterModelsDto, request.get_json())
@@ -190,8 +303,65 @@ def get_models_filter():
     except:
         return ErrorResponse.build(f"Неверный аргумент 'model':{dto.model}")
 
-    models = Prototype(repository.get_values(model)).filter_mul(dto.filters).sort(dto.sorts).data
-    return FactoryEntities().create(ResponseFormat.JSON).build(models)
+    prototype = Prototype(repository.get_values(model))
+    if request.args.get('explain', '').lower() == 'true':
+        try:
+            return JsonResponse.build(prototype.plan(dto.filters, dto.where).explain())
+        except Exception as e:
+            return ErrorResponse.build(f"Ошибка во время обработки данных: {e}")
+
+    try:
+        models = prototype.lazy().filter_mul(dto.filters, dto.where).sort(dto.sorts) \
+            .offset(dto.offset).limit(dto.limit).data
+    except Exception as e:
+        return ErrorResponse.build(f"Ошибка во время обработки данных: {e}")
+    return respond(FactoryEntities().create(json_format()), models, len(models))
+
+@app.route("/api/search", methods=['GET'])
+def get_search():
+    """
+    Поиск по наименованиям (продукты, группы номенклатуры, рецепты) с ранжированием совпадений
+    - `q`: строка поиска
+    - `model`: ключ репозитория (products, product_groups, recipes), необязательный аргумент; по умолчанию - все
+    - `limit`: наибольшее количество результатов (по умолчанию 20)
+    """
+    try:
+        query = request.args.get('q', '')
+        model = request.args.get('model')
+        keys = [RepoKeys(model)] if model else None
+        if keys and name_search.index(keys[0]) is None:
+            raise ValueError(f"поиск по модели {model} не поддерживается")
+        limit = int(request.args.get('limit', 20))
+    except Exception as e:
+        return ErrorResponse.build(f"Ошибка в переданных аргументах: {e}")
+
+    models = name_search.search(query, keys, limit)
+    return respond(FactoryEntities().create(json_format()), models, len(models))
+
+@app.route("/api/aggregate", methods=['POST'])
+def get_aggregate():
+    """
+    Агрегация моделей (sum, count, min, max, avg) с группировкой по полям и фильтрацией через тело запроса
+    (FilterAggregateDto). Возвращаются только строки агрегатов.
+    Транзакции агрегируются над колоночным хранилищем, если группировка и поля это позволяют.
+    """
+    try:
+        dto: FilterAggregateDto = create_dto(FilterAggregateDto, request.get_json())
+        model = RepoKeys(dto.model)
+    except Exception as e:
+        return ErrorResponse.build(f"Ошибка в переданных аргументах: {e}")
+
+    try:
+        rows = None
+        if model == RepoKeys.TRANSACTIONS:
+            rows = transaction_columns.aggregate(dto.filters, dto.where, dto.group_by, dto.aggregates)
+        if rows is None:
+            items = Prototype(repository.get_values(model)).lazy().filter_mul(dto.filters, dto.where)
+            rows = Aggregator.aggregate(items, dto.group_by, dto.aggregates)
+        rows = Aggregator.page(rows, dto.sorts, dto.offset, dto.limit)
+    except Exception as e:
+        return ErrorResponse.build(f"Ошибка во время обработки данных: {e}")
+    return respond(FactoryEntities().create(json_format()), rows, len(rows))
 
 @app.route("/api/set-block-date", methods=['POST'])
 def set_block_date_route():
@@ -209,6 +379,7 @@ def set_block_date_route():
             new_block_date,
             repository.get_values(RepoKeys.TRANSACTIONS),
             repository.data[RepoKeys.PRODUCTS],
+            remains_checkpoints,
         )
         return FactoryEntities().create(ResponseFormat.JSON).build([{"message": "Дата блокировки успешно изменена", "new_date": new_block_date.isoformat()}])
     except Exception as e:
@@ -243,9 +414,10 @@ def get_product_remains_route():
             repository.data[RepoKeys.PRODUCTS],
             settings.block_date,
             repository.get_values(RepoKeys.PRODUCT_REMAINS),
-            True
+            True,
+            remains_checkpoints,
         )
-        return FactoryEntities().create(ResponseFormat.JSON).build(remains_data)
+        return respond(FactoryEntities().create(json_format()), remains_data, len(remains_data))
     except Exception as e:
         return ErrorResponse.build(f"Ошибка при расчете остатков: {e}")
 
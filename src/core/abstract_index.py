@@ -0,0 +1,94 @@
+from abc import ABC, abstractmethod
+from operator import attrgetter
+
+
+class AbstractIndex(ABC):
+    """
+    Абстрактный базовый класс вторичного индекса моделей по полю (вложенные поля через точку).
+    Индекс отбирает модели, у которых поле удовлетворяет условию `поле op value`,
+    без просмотра всех моделей. Модели возвращаются в порядке добавления в индекс.
+
+    Индекс не отслеживает изменение поля у модели после добавления: модель нужно удалить и добавить заново.
+    """
+
+    # Операторы, которые выполняются по индексу
+    operators: set[str] = set()
+
+    def __init__(self, field: str):
+        """
+        :param field: Имя индексируемого поля (например, 'product.id').
+        """
+        self.field = field
+        self._getter = attrgetter(field)
+        # id модели -> порядковый номер добавления
+        self._positions: dict[str, int] = {}
+        # id моделей, у которых поле не удалось получить или проиндексировать
+        self._missing: set[str] = set()
+        self.__counter = 0
+
+    def __len__(self) -> int:
+        return len(self._positions) + len(self._missing)
+
+    @property
+    def complete(self) -> bool:
+        """Все модели проиндексированы"""
+        return not self._missing
+
+    def _register(self, model):
+        """Запомнить порядковый номер добавленной модели"""
+        self._positions[model.id] = self.__counter
+        self.__counter += 1
+
+    def in_order(self, models: list) -> list:
+        """Отсортировать модели (добавленные в индекс) в порядке добавления"""
+        models.sort(key=lambda model: self._positions[model.id])
+        return models
+
+    @abstractmethod
+    def add(self, model):
+        """
+        Добавить модель в индекс.
+        """
+        pass
+
+    def extend(self, models):
+        """
+        Добавить в индекс несколько моделей.
+        """
+        for model in models:
+            self.add(model)
+
+    @abstractmethod
+    def remove(self, model):
+        """
+        Удалить модель из индекса (по значению поля на момент добавления).
+        """
+        pass
+
+    @abstractmethod
+    def supports(self, op: str, value) -> bool:
+        """
+        Проверяет, что фильтр `поле op value` можно выполнить по индексу.
+        """
+        pass
+
+    @abstractmethod
+    def count(self, op: str, value) -> int:
+        """
+        Количество моделей, удовлетворяющих фильтру (без их выборки).
+        """
+        pass
+
+    @abstractmethod
+    def select(self, op: str, value) -> list:
+        """
+        Модели, удовлетворяющие фильтру `поле op value`, в порядке добавления в индекс.
+        """
+        pass
+
+    @abstractmethod
+    def ids(self, op: str, value) -> set[str]:
+        """
+        Множество id моделей, удовлетворяющих фильтру (для пересечения результатов нескольких индексов).
+        """
+        pass
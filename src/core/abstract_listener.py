@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+from src.core.event_type import EventType
+
+
+class AbstractListener(ABC):
+    """
+    Абстрактный базовый класс слушателя событий (паттерн Observer).
+    Слушатель регистрируется в ObserveService и получает все рассылаемые события.
+    """
+
+    @abstractmethod
+    def handle(self, event: EventType, params):
+        """
+        Обработать событие.
+
+        :param event: Тип события из перечисления EventType.
+        :param params: Параметры события (например, изменённая модель).
+        """
+        pass
@@ -0,0 +1,18 @@
+from enum import StrEnum
+
+
+class AggregateFunc(StrEnum):
+    """
+    Перечисление (Enum) агрегатных функций запроса агрегации (AggregateDto).
+    """
+
+    # Сумма значений поля
+    SUM = 'sum'
+    # Количество строк (или заполненных значений поля, если оно задано)
+    COUNT = 'count'
+    # Наименьшее значение поля
+    MIN = 'min'
+    # Наибольшее значение поля
+    MAX = 'max'
+    # Среднее значение поля
+    AVG = 'avg'
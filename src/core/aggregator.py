@@ -0,0 +1,137 @@
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Iterable
+
+from src.core.aggregate_func import AggregateFunc
+from src.core.sorter import Sorter
+from src.dto.aggregate_dto import AggregateDto
+from src.dto.sorting_dto import SortingDto
+from src.models.abstract_model import AbstractModel
+from src.models.validators.exceptions import OperationException
+
+
+class Aggregator:
+    """
+    Агрегация моделей с группировкой за один проход.
+    Строка результата - словарь {путь группировки: значение, имя столбца: значение агрегата}.
+    Модели в значениях группировки сравниваются по id.
+
+    Для каждого поля агрегации в группе хранится состояние [количество, сумма, минимум, максимум],
+    из которого вычисляются все агрегатные функции по этому полю. Значения None пропускаются.
+    """
+
+    @staticmethod
+    def aggregate(items: Iterable, group_by: list[str], aggregates: list[AggregateDto]) -> list[dict]:
+        """
+        Сгруппировать элементы и вычислить агрегатные функции.
+
+        :param items: Элементы (например, итератор LazyPrototype после фильтров).
+        :param group_by: Пути полей группировки (вложенные поля через точку).
+        :param aggregates: Агрегатные функции.
+        :return: Строки результата в порядке первого появления группы (без группировки - одна строка).
+        :raises OperationException: Если функция не поддерживается или значение поля не число.
+        """
+        Aggregator.validate(aggregates)
+        fields = Aggregator.fields(aggregates)
+        key_getters = [attrgetter(path) for path in group_by]
+        value_getters = [attrgetter(field) for field in fields]
+
+        # Ключ группы -> [значения группировки, количество строк, состояния полей]
+        groups: dict[tuple, list] = {}
+        for item in items:
+            values = [getter(item) for getter in key_getters]
+            key = tuple(value.id if isinstance(value, AbstractModel) else value for value in values)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = [values, 0, [[0, 0, None, None] for _ in fields]]
+            group[1] += 1
+
+            for getter, state in zip(value_getters, group[2]):
+                value = getter(item)
+                if value is None:
+                    continue
+                if not isinstance(value, (int, float)):
+                    raise OperationException(f"Агрегируемое значение не число: {value}")
+                state[0] += 1
+                state[1] += value
+                if state[2] is None or value < state[2]:
+                    state[2] = value
+                if state[3] is None or value > state[3]:
+                    state[3] = value
+
+        if not groups and not group_by:
+            groups[()] = [[], 0, [[0, 0, None, None] for _ in fields]]
+
+        positions = {field: number for number, field in enumerate(fields)}
+        result = []
+        for values, rows, states in groups.values():
+            row = dict(zip(group_by, values))
+            for dto in aggregates:
+                state = states[positions[dto.field_name]] if dto.field_name else None
+                row[Aggregator.column_name(dto)] = Aggregator.result(AggregateFunc(dto.func), rows, state)
+            result.append(row)
+        return result
+
+    @staticmethod
+    def result(func: AggregateFunc, rows: int, state: list | None):
+        """
+        Значение агрегатной функции по состоянию поля [количество, сумма, минимум, максимум].
+
+        :param func: Агрегатная функция.
+        :param rows: Количество строк группы (для count без поля).
+        :param state: Состояние поля или None, если поле не задано.
+        """
+        if state is None:
+            return rows
+        count, total, minimum, maximum = state
+        if func == AggregateFunc.COUNT:
+            return count
+        if func == AggregateFunc.SUM:
+            return total
+        if func == AggregateFunc.MIN:
+            return minimum
+        if func == AggregateFunc.MAX:
+            return maximum
+        return total / count if count else None
+
+    @staticmethod
+    def validate(aggregates: list[AggregateDto]):
+        """
+        Проверить агрегатные функции.
+
+        :raises OperationException: Если функция не поддерживается или для неё не задано поле.
+        """
+        for dto in aggregates:
+            try:
+                func = AggregateFunc(dto.func)
+            except ValueError:
+                raise OperationException(f"Неверная агрегатная функция: {dto.func}")
+            if func != AggregateFunc.COUNT and not dto.field_name:
+                raise OperationException(f"Не задано поле для агрегатной функции: {dto.func}")
+
+    @staticmethod
+    def fields(aggregates: list[AggregateDto]) -> list[str]:
+        """Различные поля агрегации в порядке первого упоминания"""
+        return list(dict.fromkeys(dto.field_name for dto in aggregates if dto.field_name))
+
+    @staticmethod
+    def column_name(dto: AggregateDto) -> str:
+        """Имя столбца агрегата в строке результата"""
+        if dto.name:
+            return dto.name
+        return f"{dto.func}_{dto.field_name}" if dto.field_name else dto.func
+
+    @staticmethod
+    def page(rows: list[dict], sorts: SortingDto = None, offset: int = 0, limit: int = None) -> list[dict]:
+        """
+        Отсортировать строки результата по именам столбцов и выбрать страницу.
+
+        :raises OperationException: Если столбца сортировки нет в строках результата.
+        """
+        if sorts:
+            try:
+                rows = Sorter.sort(rows, sorts, itemgetter)
+            except KeyError as e:
+                raise OperationException(f"Неверный столбец сортировки: {e}")
+        stop = None if limit is None else offset + limit
+        return list(islice(rows, offset, stop))
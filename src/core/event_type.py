@@ -0,0 +1,17 @@
+from enum import StrEnum
+
+
+class EventType(StrEnum):
+    """
+    Перечисление (Enum) типов событий, которые рассылает ObserveService.
+    Использует StrEnum, чтобы значениями элементов были строки (строковые константы).
+    """
+
+    # В репозиторий добавлена модель (params: {"key": ключ RepoKeys, "model": модель})
+    ADD_MODEL = 'add_model'
+    # Из репозитория удалена модель (params: {"key": ключ RepoKeys, "model": модель})
+    DELETE_MODEL = 'delete_model'
+    # Изменена единица измерения (коэффициент пересчёта или базовая единица, params: {"model": модель})
+    CHANGE_UNIT = 'change_unit'
+    # Изменено наименование модели, созданной ранее (params: {"model": модель})
+    CHANGE_NAME = 'change_name'
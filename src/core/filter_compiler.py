@@ -0,0 +1,131 @@
+import re
+from operator import attrgetter
+from typing import Callable
+
+from src.core.like_pattern import LikePattern
+from src.core.logical_op import LogicalOp
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.models.validators.exceptions import OperationException
+
+
+class FilterCompiler:
+    """
+    Компилятор списка FilterDto в один предикат.
+    Для каждого фильтра заранее строится attrgetter по пути поля (вложенные поля через точку)
+    и выбирается функция оператора, поэтому при проверке элемента не выполняется ни разбор
+    имени поля, ни поиск оператора. Шаблоны операторов like и ilike компилируются один раз (LikePattern).
+    Фильтры объединяются логическим И с ранним выходом.
+
+    Деревья фильтров (FilterExpressionDto) компилируются в предикат с сокращённым вычислением:
+    И прекращает проверку на первом ложном условии, ИЛИ - на первом истинном.
+    """
+
+    # Операторы сопоставления с шаблоном -> признак сравнения без учёта регистра
+    _pattern_ops = {"like": False, "ilike": True}
+
+    @staticmethod
+    def compile(dtos: list[FilterDto | FilterExpressionDto], operators: dict[str, Callable]) -> Callable[[object], bool]:
+        """
+        Построить предикат, истинный для элементов, прошедших все фильтры.
+
+        :param dtos: Список фильтров и деревьев фильтров (проверяются в порядке списка).
+        :param operators: Словарь {оператор: функция(значение поля, значение фильтра)}.
+        :return: Функция от элемента, возвращающая bool.
+        :raises OperationException: Если оператор фильтра или логическая операция не поддерживается.
+        """
+        if any(isinstance(dto, FilterExpressionDto) for dto in dtos):
+            return FilterCompiler.__all([FilterCompiler.compile_expression(dto, operators)
+                                         if isinstance(dto, FilterExpressionDto) else FilterCompiler.compile([dto], operators)
+                                         for dto in dtos])
+
+        plan = tuple(FilterCompiler.__compile_one(dto, operators) for dto in dtos)
+
+        if not plan:
+            return lambda item: True
+        if len(plan) == 1:
+            getter, func, value = plan[0]
+            return lambda item: func(getter(item), value)
+
+        def predicate(item) -> bool:
+            for getter, func, value in plan:
+                if not func(getter(item), value):
+                    return False
+            return True
+
+        return predicate
+
+    @staticmethod
+    def compile_expression(expression: FilterExpressionDto, operators: dict[str, Callable]) -> Callable[[object], bool]:
+        """
+        Построить предикат по дереву фильтров. Условия узла проверяются в порядке: фильтры, затем вложенные узлы.
+
+        :param expression: Корень дерева фильтров.
+        :param operators: Словарь {оператор: функция(значение поля, значение фильтра)}.
+        :return: Функция от элемента, возвращающая bool.
+        :raises OperationException: Если оператор фильтра или логическая операция не поддерживается.
+        """
+        op = FilterCompiler.logical_op(expression)
+        nested = [FilterCompiler.compile_expression(item, operators) for item in expression.expressions]
+
+        if op == LogicalOp.OR:
+            return FilterCompiler.__any([FilterCompiler.compile([dto], operators) for dto in expression.filters] + nested)
+
+        checks = ([FilterCompiler.compile(expression.filters, operators)] if expression.filters else []) + nested
+        predicate = FilterCompiler.__all(checks)
+        if op == LogicalOp.NOT:
+            return lambda item: not predicate(item)
+        return predicate
+
+    @staticmethod
+    def logical_op(expression: FilterExpressionDto) -> LogicalOp:
+        """
+        Логическая операция узла дерева фильтров.
+
+        :raises OperationException: Если операция не поддерживается.
+        """
+        try:
+            return LogicalOp(expression.op)
+        except ValueError:
+            raise OperationException(f"Неверная логическая операция фильтрации: {expression.op}")
+
+    @staticmethod
+    def __all(checks: list[Callable]) -> Callable[[object], bool]:
+        """Предикат И с выходом на первом ложном условии"""
+        if len(checks) == 1:
+            return checks[0]
+
+        def predicate(item) -> bool:
+            for check in checks:
+                if not check(item):
+                    return False
+            return True
+
+        return predicate
+
+    @staticmethod
+    def __any(checks: list[Callable]) -> Callable[[object], bool]:
+        """Предикат ИЛИ с выходом на первом истинном условии"""
+        if len(checks) == 1:
+            return checks[0]
+
+        def predicate(item) -> bool:
+            for check in checks:
+                if check(item):
+                    return True
+            return False
+
+        return predicate
+
+    @staticmethod
+    def __compile_one(dto: FilterDto, operators: dict[str, Callable]) -> tuple:
+        """Шаг плана: (получение поля, функция оператора, значение фильтра)"""
+        if dto.op not in operators:
+            raise OperationException(f"Неверный оператор фильтрации: {dto.op}")
+        if dto.op in FilterCompiler._pattern_ops and isinstance(dto.value, str):
+            try:
+                check, argument = LikePattern.compile(dto.value, FilterCompiler._pattern_ops[dto.op])
+            except re.error as e:
+                raise OperationException(f"Неверный шаблон фильтрации '{dto.value}': {e}")
+            return attrgetter(dto.field_name), check, argument
+        return attrgetter(dto.field_name), operators[dto.op], dto.value
@@ -0,0 +1,367 @@
+import re
+from dataclasses import replace
+from itertools import islice
+from operator import attrgetter
+from typing import Callable, Iterator
+
+from src.core.filter_compiler import FilterCompiler
+from src.core.index_expression import IndexExpression
+from src.core.indexed_list import IndexedList
+from src.core.like_pattern import LikePattern
+from src.core.logical_op import LogicalOp
+from src.core.sorted_list import SortedList
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.models.abstract_model import AbstractModel
+
+
+class FilterPlan:
+    """
+    План фильтрации набора данных, построенный FilterPlanner.
+    Шаги выполняются в порядке:
+    1. срез SortedList по границам двоичного поиска (фильтры сравнения по полю упорядочивания);
+    2. отбор по вторичным индексам (фильтры и деревья фильтров, все условия которых выполняются по индексам)
+       с пересечением результатов по id (вместо среза, если он меньше);
+    3. остальные фильтры и деревья фильтров одним скомпилированным предикатом в порядке возрастания стоимости.
+    """
+
+    def __init__(self, data: list, bounds: tuple[int, int] | None, lookups: list[tuple],
+                 predicates: list[FilterDto | FilterExpressionDto], steps: list[dict]):
+        """
+        :param data: Исходный набор данных.
+        :param bounds: Границы среза SortedList [начало, конец) или None.
+        :param lookups: Отборы по индексам (количество, IndexExpression, фильтр или дерево фильтров).
+        :param predicates: Фильтры и деревья фильтров предиката в порядке проверки.
+        :param steps: Описание шагов для explain.
+        """
+        self.__data = data
+        self.__bounds = bounds
+        self.__lookups = lookups
+        self.__predicates = predicates
+        self.__steps = steps
+
+    @property
+    def predicates(self) -> list[FilterDto | FilterExpressionDto]:
+        return self.__predicates
+
+    def explain(self) -> dict:
+        """
+        Описание выбранного плана: количество строк набора и шаги с оценками
+        (способ доступа, доля прошедших строк, стоимость проверки, оценка количества строк после шага).
+        """
+        return {"rows": len(self.__data), "steps": self.__steps}
+
+    def execute(self, operators: dict[str, Callable]) -> list:
+        """
+        Выполнить план.
+
+        :param operators: Словарь {оператор: функция(значение поля, значение фильтра)}.
+        :return: Отфильтрованные данные в исходном порядке (SortedList, если исходные данные упорядочены).
+        """
+        data = self.__data
+        if self.__lookups:
+            data = self.__select()
+        elif self.__bounds is not None:
+            low, high = self.__bounds
+            data = SortedList(data[low:high], data.field)
+
+        if self.__predicates:
+            predicate = FilterCompiler.compile(self.__predicates, operators)
+            result = [item for item in data if predicate(item)]
+            # Фильтрация сохраняет порядок элементов
+            data = SortedList(result, data.field) if isinstance(data, SortedList) else result
+        return data
+
+    def iterate(self, operators: dict[str, Callable]) -> Iterator:
+        """
+        Выполнить план лениво: срез не копируется, предикат проверяется по мере чтения итератора.
+
+        :param operators: Словарь {оператор: функция(значение поля, значение фильтра)}.
+        :return: Итератор по отфильтрованным данным в исходном порядке.
+        """
+        data = self.__data
+        if self.__lookups:
+            data = self.__select()
+        elif self.__bounds is not None:
+            data = islice(data, *self.__bounds)
+
+        if self.__predicates:
+            return filter(FilterCompiler.compile(self.__predicates, operators), data)
+        return iter(data)
+
+    def __select(self) -> list:
+        """Элементы, прошедшие фильтры по индексам, в порядке исходных данных"""
+        models = self.__lookups[0][1].select()
+        if len(self.__lookups) > 1:
+            # Пересечение множеств id выполняется без вызова предиката для каждого элемента
+            ids = set.intersection(*(other.ids() for _, other, _ in self.__lookups[1:]))
+            models = [model for model in models if model.id in ids]
+        if isinstance(self.__data, SortedList):
+            # Индекс хранит модели в порядке добавления, поэтому устойчивая сортировка восстанавливает порядок SortedList
+            models.sort(key=attrgetter(self.__data.field))
+            return SortedList(models, self.__data.field)
+        return models
+
+
+class FilterPlanner:
+    """
+    Планировщик фильтрации для Prototype.filter_mul.
+    Выбирает способ доступа (срез SortedList, вторичные индексы, просмотр) по оценке количества строк
+    и упорядочивает фильтры предиката: сначала дешёвые и отбрасывающие больше строк, регулярные выражения последними.
+    Доля прошедших строк берётся из индексов (точно), статистики полей репозитория (ModelStatistics) или по умолчанию.
+
+    Дерево фильтров (FilterExpressionDto) разбирается так: условия узлов И верхнего уровня планируются как обычные
+    фильтры, остальные узлы - отбором по индексам (объединение и пересечение множеств id), если все их условия
+    индексированы, иначе предикатом с сокращённым вычислением. Условия внутри узлов упорядочиваются по стоимости:
+    для И - сначала дешёвые и отбрасывающие больше строк, для ИЛИ - дешёвые и пропускающие больше строк.
+    """
+
+    # Операторы сравнения, которые для поля упорядочивания SortedList выполняются двоичным поиском
+    _range_ops = {"<", "<=", ">", ">=", "=="}
+
+    # Операторы фильтра по модели, для которых используется индекс по её id
+    _model_ops = {"==", "in", "notin"}
+
+    # Наибольшая доля элементов, при которой отбор по индексу быстрее просмотра (выборку нужно упорядочить)
+    _index_max_share = 0.5
+
+    # Во сколько раз выборка индекса может превышать наиболее избирательную, чтобы участвовать в пересечении по id
+    _index_intersect_ratio = 8
+
+    # Стоимость проверки фильтра относительно сравнения значений
+    _op_costs = {"in": 2.0, "notin": 2.0, "contains": 2.0, "notcontains": 2.0, "like": 20.0, "ilike": 25.0}
+
+    # Стоимость шаблона like/ilike, который выполняется строковыми методами
+    _literal_pattern_cost = 2.0
+
+    # Доля прошедших строк, если её не удалось оценить
+    _default_selectivity = {"==": 0.1, "!=": 0.9, "notin": 0.9, "notcontains": 0.9}
+
+    @staticmethod
+    def plan(data: list, dtos: list[FilterDto], expression: FilterExpressionDto = None) -> FilterPlan:
+        """
+        Построить план фильтрации data по фильтрам dtos и дереву фильтров expression (логическое И).
+        """
+        rows = len(data)
+        steps = []
+        dtos = list(dtos)
+        expressions = []
+        if expression is not None:
+            FilterPlanner.__flatten(expression, dtos, expressions)
+        selectivities = {id(dto): FilterPlanner.__selectivity(data, dto) for dto in dtos}
+        costs = {id(dto): FilterPlanner.__cost(dto) for dto in dtos}
+        # Узлы дерева с условиями, упорядоченными по стоимости
+        ordered = {}
+        for item in expressions:
+            ordered[id(item)], selectivities[id(item)], costs[id(item)] = FilterPlanner.__estimate(data, item)
+
+        # 1. Срез упорядоченного списка по полю упорядочивания
+        bounds = None
+        sliced = []
+        if isinstance(data, SortedList):
+            low, high = 0, rows
+            for dto in dtos:
+                if dto.field_name == data.field and dto.op in FilterPlanner._range_ops:
+                    dto_low, dto_high = data.bounds(dto.op, dto.value)
+                    low, high = max(low, dto_low), min(high, dto_high)
+                    selectivities[id(dto)] = (dto_high - dto_low) / rows if rows else 0.0
+                    sliced.append(dto)
+            if sliced:
+                bounds = (low, max(low, high))
+        remaining = bounds[1] - bounds[0] if bounds else rows
+
+        # 2. Отбор по индексам, если он меньше среза
+        lookups = FilterPlanner.__index_lookups(data, [*dtos, *expressions], remaining)
+        if lookups:
+            used = {id(lookup[2]) for lookup in lookups}
+            remaining = lookups[0][0]
+            for number, (count, _, item) in enumerate(lookups):
+                if number > 0:
+                    remaining = remaining * count / rows if rows else 0
+                steps.append(FilterPlanner.__step(item, "index" if number == 0 else "index_intersect",
+                                                  count / rows if rows else 0.0, 0.0, remaining))
+            predicates = [item for item in [*dtos, *expressions] if id(item) not in used]
+        else:
+            for dto in sliced:
+                steps.append(FilterPlanner.__step(dto, "range", selectivities[id(dto)], 0.0, remaining))
+            predicates = [item for item in [*dtos, *expressions] if all(item is not dto for dto in sliced)]
+
+        # 3. Предикат: порядок по стоимости отброшенной строки (стоимость / доля отбрасываемых строк)
+        predicates.sort(key=lambda item: costs[id(item)] / max(1.0 - selectivities[id(item)], 1e-9))
+        for item in predicates:
+            remaining *= selectivities[id(item)]
+            steps.append(FilterPlanner.__step(item, "predicate", selectivities[id(item)], costs[id(item)], remaining))
+        predicates = [ordered.get(id(item), item) for item in predicates]
+
+        return FilterPlan(data, bounds, lookups, predicates, steps)
+
+    @staticmethod
+    def __step(item: FilterDto | FilterExpressionDto, access: str, selectivity: float, cost: float,
+               remaining: float) -> dict:
+        """Описание шага плана (для дерева фильтров value - запись дерева)"""
+        expression = isinstance(item, FilterExpressionDto)
+        return {
+            "field_name": None if expression else item.field_name,
+            "op": item.op,
+            "value": FilterPlanner.__describe(item) if expression else item.value,
+            "access": access,
+            "selectivity": round(selectivity, 4),
+            "cost": round(cost, 4),
+            "estimated_rows": round(remaining),
+        }
+
+    @staticmethod
+    def __describe(expression: FilterExpressionDto) -> str:
+        """Запись дерева фильтров, например '(group.id == 1 or unit.id == 2)'"""
+        parts = [f"{dto.field_name} {dto.op} {dto.value}" for dto in expression.filters]
+        parts += [FilterPlanner.__describe(item) for item in expression.expressions]
+        if expression.op == LogicalOp.NOT:
+            return f"not ({' and '.join(parts)})"
+        return f"({f' {expression.op} '.join(parts)})"
+
+    @staticmethod
+    def __flatten(expression: FilterExpressionDto, dtos: list[FilterDto], expressions: list[FilterExpressionDto]):
+        """Разложить узлы И дерева фильтров в список фильтров, остальные узлы - в список деревьев"""
+        if FilterCompiler.logical_op(expression) != LogicalOp.AND:
+            expressions.append(expression)
+            return
+        dtos.extend(expression.filters)
+        for item in expression.expressions:
+            FilterPlanner.__flatten(item, dtos, expressions)
+
+    @staticmethod
+    def __estimate(data: list, expression: FilterExpressionDto) -> tuple[FilterExpressionDto, float, float]:
+        """
+        Упорядочить условия узла дерева фильтров по стоимости и оценить узел.
+
+        :return: Кортеж (узел с упорядоченными условиями, доля прошедших строк, ожидаемая стоимость проверки).
+        """
+        op = FilterCompiler.logical_op(expression)
+        filters = [(dto, FilterPlanner.__selectivity(data, dto), FilterPlanner.__cost(dto)) for dto in expression.filters]
+        nested = [FilterPlanner.__estimate(data, item) for item in expression.expressions]
+
+        if op == LogicalOp.OR:
+            # Проверка ИЛИ заканчивается на первом истинном условии
+            def rank(entry: tuple) -> float:
+                return entry[2] / max(entry[1], 1e-9)
+        else:
+            def rank(entry: tuple) -> float:
+                return entry[2] / max(1.0 - entry[1], 1e-9)
+
+        filters.sort(key=rank)
+        nested.sort(key=rank)
+
+        # Стоимость условия учитывается с вероятностью, что до него дойдёт проверка
+        cost, reached = 0.0, 1.0
+        for _, selectivity, item_cost in filters + nested:
+            cost += reached * item_cost
+            reached *= (1.0 - selectivity) if op == LogicalOp.OR else selectivity
+        selectivity = reached if op == LogicalOp.AND else 1.0 - reached
+
+        ordered = replace(expression, filters=[entry[0] for entry in filters], expressions=[entry[0] for entry in nested])
+        return ordered, selectivity, cost
+
+    @staticmethod
+    def __cost(dto: FilterDto) -> float:
+        """Стоимость проверки фильтра одним элементом"""
+        if dto.op in ("like", "ilike") and isinstance(dto.value, str):
+            try:
+                if LikePattern.is_literal(dto.value):
+                    return FilterPlanner._literal_pattern_cost
+            except re.error:
+                pass
+        return FilterPlanner._op_costs.get(dto.op, 1.0)
+
+    @staticmethod
+    def __selectivity(data: list, dto: FilterDto) -> float:
+        """Оценка доли элементов, проходящих фильтр"""
+        if isinstance(data, IndexedList):
+            lookup = FilterPlanner.__index_for(data, dto)
+            if lookup is not None:
+                index, value = lookup
+                return index.count(dto.op, value) / len(data) if data else 0.0
+            if data.statistics is not None:
+                statistics = data.statistics.field(dto.field_name)
+                selectivity = statistics.selectivity(dto.op, dto.value) if statistics is not None else None
+                if selectivity is not None:
+                    return selectivity
+        return FilterPlanner._default_selectivity.get(dto.op, 0.5)
+
+    @staticmethod
+    def __index_lookups(data: list, items: list[FilterDto | FilterExpressionDto], limit: int) -> list[tuple]:
+        """
+        Фильтры и деревья фильтров, выполнимые по индексам и оставляющие не больше _index_max_share
+        от limit элементов, по возрастанию количества. Первый (наиболее избирательный) задаёт кандидатов,
+        остальные пересекаются с ним по id, если их выборка не больше чем в _index_intersect_ratio раз
+        превышает выборку первого.
+
+        :return: Список кортежей (количество, IndexExpression, фильтр или дерево фильтров).
+        """
+        if not isinstance(data, IndexedList) or not data.indexes:
+            return []
+
+        lookups = []
+        for item in items:
+            if isinstance(item, FilterExpressionDto):
+                expression = FilterPlanner.__resolve(data, item)
+            else:
+                lookup = FilterPlanner.__index_for(data, item)
+                expression = None if lookup is None else IndexExpression(LogicalOp.AND, [(lookup[0], item.op, lookup[1])])
+            if expression is None:
+                continue
+            count = expression.count()
+            if count <= limit * FilterPlanner._index_max_share:
+                lookups.append((count, expression, item))
+
+        lookups.sort(key=lambda lookup: lookup[0])
+        return [lookup for lookup in lookups if lookup[0] <= lookups[0][0] * FilterPlanner._index_intersect_ratio]
+
+    @staticmethod
+    def __resolve(data: IndexedList, expression: FilterExpressionDto) -> IndexExpression | None:
+        """
+        Отбор по индексам для узла дерева фильтров или None, если не все условия узла индексированы.
+        """
+        op = FilterCompiler.logical_op(expression)
+        if op == LogicalOp.NOT or not (expression.filters or expression.expressions):
+            return None
+        lookups = []
+        for dto in expression.filters:
+            lookup = FilterPlanner.__index_for(data, dto)
+            if lookup is None:
+                return None
+            lookups.append((lookup[0], dto.op, lookup[1]))
+        children = []
+        for item in expression.expressions:
+            child = FilterPlanner.__resolve(data, item)
+            if child is None:
+                return None
+            children.append(child)
+        return IndexExpression(op, lookups, children)
+
+    @staticmethod
+    def __index_for(data: IndexedList, dto: FilterDto) -> tuple | None:
+        """
+        Индекс, по которому выполняется фильтр, и значение фильтра для него, или None.
+        """
+        index, value = data.index_for(dto.field_name), dto.value
+        if index is None and dto.op in FilterPlanner._model_ops:
+            # Фильтр по модели: модели сравниваются по id, поэтому используется индекс по полю id
+            index, value = data.index_for(f"{dto.field_name}.id"), FilterPlanner.__model_ids(dto.op, dto.value)
+        if index is None or value is None or not index.supports(dto.op, value):
+            return None
+        return index, value
+
+    @staticmethod
+    def __model_ids(op: str, value):
+        """Значение фильтра по модели в виде id (None, если значение - не модели)"""
+        if op == "==":
+            return value.id if isinstance(value, AbstractModel) else None
+        if isinstance(value, str):
+            return None
+        try:
+            items = list(value)
+        except TypeError:
+            return None
+        if not all(isinstance(item, AbstractModel) for item in items):
+            return None
+        return [item.id for item in items]
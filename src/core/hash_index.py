@@ -0,0 +1,84 @@
+from src.core.abstract_index import AbstractIndex
+
+
+class HashIndex(AbstractIndex):
+    """
+    Вторичный хеш-индекс моделей по значению поля.
+    Для каждого значения хранится словарь {id модели: модель}, поэтому отбор по ==, in и notin
+    выполняется без просмотра всех моделей.
+    """
+
+    operators = {"==", "in", "notin"}
+
+    def __init__(self, field: str):
+        """
+        :param field: Имя индексируемого поля (например, 'product.id').
+        """
+        super().__init__(field)
+        # Значение поля -> {id модели: модель}
+        self.__buckets: dict = {}
+        # id модели -> значение поля
+        self.__values: dict[str, object] = {}
+
+    def add(self, model):
+        try:
+            value = self._getter(model)
+            bucket = self.__buckets.setdefault(value, {})
+        except (AttributeError, TypeError):
+            # Значение поля не получено или не хешируется
+            self._missing.add(model.id)
+            return
+        bucket[model.id] = model
+        self.__values[model.id] = value
+        self._register(model)
+
+    def remove(self, model):
+        self._missing.discard(model.id)
+        if model.id not in self.__values:
+            return
+        value = self.__values.pop(model.id)
+        del self._positions[model.id]
+        bucket = self.__buckets[value]
+        del bucket[model.id]
+        if not bucket:
+            del self.__buckets[value]
+
+    def supports(self, op: str, value) -> bool:
+        if not self.complete:
+            return False
+        try:
+            if op == "==":
+                hash(value)
+                return True
+            if op in ("in", "notin") and not isinstance(value, str):
+                for item in value:
+                    hash(item)
+                return True
+        except TypeError:
+            pass
+        return False
+
+    def count(self, op: str, value) -> int:
+        if op == "==":
+            return len(self.__buckets.get(value, ()))
+        matched = sum(len(self.__buckets.get(item, ())) for item in set(value))
+        return matched if op == "in" else len(self.__values) - matched
+
+    def select(self, op: str, value) -> list:
+        buckets = self.__matched(op, value)
+        if len(buckets) == 1:
+            # Словарь значения уже упорядочен по добавлению
+            return list(buckets[0].values())
+        return self.in_order([model for bucket in buckets for model in bucket.values()])
+
+    def ids(self, op: str, value) -> set[str]:
+        return set().union(*(bucket.keys() for bucket in self.__matched(op, value)))
+
+    def __matched(self, op: str, value) -> list[dict]:
+        """Словари моделей значений, удовлетворяющих фильтру"""
+        if op == "==":
+            return [self.__buckets.get(value, {})]
+        values = set(value)
+        if op == "in":
+            return [self.__buckets[item] for item in values if item in self.__buckets]
+        return [bucket for key, bucket in self.__buckets.items() if key not in values]
@@ -0,0 +1,82 @@
+from src.core.abstract_index import AbstractIndex
+from src.core.logical_op import LogicalOp
+
+
+class IndexExpression:
+    """
+    Отбор по вторичным индексам для фильтра или логического выражения над фильтрами:
+    И - пересечение множеств id, ИЛИ - объединение. Все условия выражения выполняются по индексам,
+    поэтому результат точный и предикат для отобранных моделей не проверяется.
+    """
+
+    def __init__(self, op: LogicalOp, lookups: list[tuple[AbstractIndex, str, object]] = (),
+                 children: list["IndexExpression"] = ()):
+        """
+        :param op: Логическая операция (AND или OR).
+        :param lookups: Отборы по индексам (индекс, оператор, значение для индекса).
+        :param children: Вложенные выражения.
+        """
+        self.__op = op
+        self.__lookups = list(lookups)
+        self.__children = list(children)
+
+    def count(self) -> int:
+        """
+        Верхняя оценка количества моделей (точное количество для одного отбора).
+        """
+        counts = [index.count(op, value) for index, op, value in self.__lookups]
+        counts += [child.count() for child in self.__children]
+        if self.__op == LogicalOp.OR:
+            return sum(counts)
+        return min(counts)
+
+    def ids(self) -> set[str]:
+        """
+        Множество id моделей, удовлетворяющих выражению.
+        """
+        sets = [index.ids(op, value) for index, op, value in self.__lookups]
+        sets += [child.ids() for child in self.__children]
+        if self.__op == LogicalOp.OR:
+            return set().union(*sets)
+        # Пересечение начинается с наименьшего множества
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def select(self) -> list:
+        """
+        Модели, удовлетворяющие выражению, в порядке добавления в индексы.
+        """
+        if len(self.__lookups) == 1 and not self.__children:
+            index, op, value = self.__lookups[0]
+            return index.select(op, value)
+
+        ids = self.ids()
+        models = {}
+        for model in self.__candidates():
+            if model.id in ids:
+                models[model.id] = model
+        return self.__first_index().in_order(list(models.values()))
+
+    def __candidates(self):
+        """Модели, среди которых находятся удовлетворяющие выражению (для И - из наименьшего отбора)"""
+        if self.__op == LogicalOp.OR:
+            for index, op, value in self.__lookups:
+                yield from index.select(op, value)
+            for child in self.__children:
+                yield from child.__candidates()
+            return
+
+        smallest = min([(index.count(op, value), number) for number, (index, op, value) in enumerate(self.__lookups)]
+                       + [(child.count(), len(self.__lookups) + number) for number, child in enumerate(self.__children)])
+        number = smallest[1]
+        if number < len(self.__lookups):
+            index, op, value = self.__lookups[number]
+            yield from index.select(op, value)
+        else:
+            yield from self.__children[number - len(self.__lookups)].__candidates()
+
+    def __first_index(self) -> AbstractIndex:
+        """Индекс, задающий порядок моделей (у индексов одного набора порядок добавления общий)"""
+        if self.__lookups:
+            return self.__lookups[0][0]
+        return self.__children[0].__first_index()
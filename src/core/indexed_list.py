@@ -0,0 +1,27 @@
+from src.core.abstract_index import AbstractIndex
+from src.core.model_statistics import ModelStatistics
+
+
+class IndexedList(list):
+    """
+    Список моделей вместе со вторичными индексами (HashIndex, RangeIndex) и статистикой полей набора,
+    из которого он получен. Prototype использует индексы для отбора без просмотра списка,
+    а статистику - для выбора порядка фильтров (FilterPlanner).
+
+    Индексы описывают исходный набор (например, модели репозитория), а не копию списка:
+    после изменения списка или набора индексы к нему не применяются.
+    """
+
+    def __init__(self, iterable=(), indexes: dict[str, AbstractIndex] = None, statistics: ModelStatistics = None):
+        super().__init__(iterable)
+        self.indexes = indexes or {}
+        self.statistics = statistics
+
+    def index_for(self, field: str) -> AbstractIndex | None:
+        """
+        Индекс по полю, согласованный со списком, или None.
+        """
+        index = self.indexes.get(field)
+        if index is None or len(index) != len(self):
+            return None
+        return index
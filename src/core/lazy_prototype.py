@@ -0,0 +1,113 @@
+from itertools import islice
+from typing import Callable, Iterator
+
+from src.core.filter_compiler import FilterCompiler
+from src.core.filter_planner import FilterPlanner
+from src.core.sorter import Sorter
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.dto.sorting_dto import SortingDto
+from src.models.validators.functions import validate_val
+
+
+class LazyPrototype:
+    """
+    Ленивый конвейер Prototype: фильтры связываются итераторами без копирования списка,
+    сортировка и постраничный отбор (offset, limit) выполняются при чтении результата.
+    Сортировка выполняется Sorter; если задан limit, она заменяется частичной (heapq):
+    упорядочиваются только offset + limit элементов.
+
+    Операции применяются в порядке: фильтры -> сортировка -> offset -> limit, независимо от порядка вызова.
+    Результат читается один раз (data или итерация).
+    """
+
+    def __init__(self, data: list, operators: dict[str, Callable]):
+        """
+        :param data: Исходный список (SortedList и IndexedList используются планировщиком фильтров).
+        :param operators: Словарь {оператор: функция(значение поля, значение фильтра)}.
+        """
+        self.__source = data
+        self.__operators = operators
+        self.__items: Iterator = None
+        self.__sorts: SortingDto = None
+        self.__offset = 0
+        self.__limit: int = None
+
+    def filter(self, dto: FilterDto) -> "LazyPrototype":
+        """
+        Добавить фильтр в конвейер.
+        """
+        if not dto:
+            return self
+        return self.filter_mul([dto])
+
+    def filter_mul(self, dtos: list[FilterDto], expression: FilterExpressionDto = None) -> "LazyPrototype":
+        """
+        Добавить фильтры и дерево фильтров в конвейер (логическое И). Первые фильтры выполняются по плану
+        FilterPlanner над исходным списком (срезы, индексы), последующие - предикатом над итератором.
+        """
+        if not dtos and expression is None:
+            return self
+        if self.__items is None:
+            self.__items = FilterPlanner.plan(self.__source, dtos, expression).iterate(self.__operators)
+        else:
+            items = [*dtos, expression] if expression is not None else dtos
+            self.__items = filter(FilterCompiler.compile(items, self.__operators), self.__items)
+        return self
+
+    def filter_expr(self, expression: FilterExpressionDto) -> "LazyPrototype":
+        """
+        Добавить в конвейер дерево фильтров (узлы and, or, not).
+        """
+        return self.filter_mul([], expression)
+
+    def sort(self, dto: SortingDto) -> "LazyPrototype":
+        """
+        Задать сортировку результата (выполняется при чтении).
+        """
+        if dto and (dto.field_names or dto.fields):
+            self.__sorts = dto
+        return self
+
+    def offset(self, value: int) -> "LazyPrototype":
+        """
+        Пропустить первые value элементов результата.
+        """
+        validate_val(value, int, check_func=lambda x: x >= 0)
+        self.__offset = value
+        return self
+
+    def limit(self, value: int | None) -> "LazyPrototype":
+        """
+        Ограничить количество элементов результата (None - без ограничения).
+        """
+        if value is not None:
+            validate_val(value, int, check_func=lambda x: x >= 0)
+        self.__limit = value
+        return self
+
+    def top_k(self, dto: SortingDto, k: int) -> list:
+        """
+        Первые k элементов в порядке сортировки dto (частичная сортировка кучей).
+        """
+        return self.sort(dto).offset(0).limit(k).data
+
+    @property
+    def data(self) -> list:
+        """
+        Выполнить конвейер и получить результат.
+        """
+        return list(self)
+
+    def __iter__(self) -> Iterator:
+        # Без фильтров сортируется исходный список (Sorter использует порядок SortedList и RangeIndex)
+        items = self.__items if self.__items is not None else self.__source
+        stop = None if self.__limit is None else self.__offset + self.__limit
+
+        if self.__sorts is not None:
+            if stop is not None:
+                items = Sorter.smallest(items, self.__sorts, stop)
+            else:
+                items = Sorter.sort(items, self.__sorts)
+
+        return islice(items, self.__offset, stop)
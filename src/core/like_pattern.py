@@ -0,0 +1,119 @@
+import re
+from functools import lru_cache
+from typing import Callable
+
+# Символы, имеющие специальное значение в регулярных выражениях
+_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def _equals(s: str, literal: str) -> bool:
+    return s == literal
+
+
+def _prefix(s: str, literal: str) -> bool:
+    # '.' не совпадает с переводом строки, поэтому 'lit.*' не совпадает со строками, содержащими '\n'
+    return s.startswith(literal) and "\n" not in s
+
+
+def _suffix(s: str, literal: str) -> bool:
+    return s.endswith(literal) and "\n" not in s
+
+
+def _substring(s: str, literal: str) -> bool:
+    return literal in s and "\n" not in s
+
+
+def _regex(s: str, pattern: re.Pattern) -> bool:
+    return pattern.fullmatch(s) is not None
+
+
+class LikePattern:
+    """
+    Сопоставление строки с регулярным выражением (полное совпадение) для операторов like и ilike.
+    Шаблон компилируется один раз. Шаблоны вида 'текст', 'текст.*', '.*текст' и '.*текст.*' без других
+    специальных символов выполняются строковыми методами (==, startswith, endswith, in) без регулярного выражения.
+
+    Без учёта регистра (ilike) регулярное выражение компилируется с re.IGNORECASE,
+    а строковые методы сравнивают значения, приведённые str.lower().
+    """
+
+    # Вид литерального шаблона -> проверка (строка, текст шаблона)
+    _literal_checks = {
+        (False, False): _equals,
+        (False, True): _prefix,
+        (True, False): _suffix,
+        (True, True): _substring,
+    }
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def compile(pattern: str, ignore_case: bool = False) -> tuple[Callable[[str, object], bool], object]:
+        """
+        Скомпилировать шаблон.
+
+        :param pattern: Регулярное выражение.
+        :param ignore_case: Сопоставлять без учёта регистра.
+        :return: Кортеж (функция(строка, аргумент) -> bool, аргумент).
+        """
+        parsed = LikePattern.__parse_literal(pattern)
+        if parsed is None:
+            flags = re.IGNORECASE if ignore_case else 0
+            return _regex, re.compile(pattern, flags)
+
+        literal, leading, trailing = parsed
+        check = LikePattern._literal_checks[(leading, trailing)]
+        if ignore_case:
+            lowered = literal.lower()
+            return (lambda s, value: check(s.lower(), value)), lowered
+        return check, literal
+
+    @staticmethod
+    def is_literal(pattern: str) -> bool:
+        """
+        Проверяет, что шаблон выполняется строковыми методами (без регулярного выражения).
+        """
+        return LikePattern.compile(pattern)[0] is not _regex
+
+    @staticmethod
+    def match(s: str, pattern: str, ignore_case: bool = False) -> bool:
+        """
+        Проверить полное совпадение строки с шаблоном (скомпилированный шаблон берётся из кеша).
+        """
+        check, argument = LikePattern.compile(pattern, ignore_case)
+        return check(s, argument)
+
+    @staticmethod
+    def __parse_literal(pattern: str) -> tuple[str, bool, bool] | None:
+        """
+        Разобрать шаблон вида [.*]текст[.*].
+
+        :return: Кортеж (текст, есть ли '.*' в начале, есть ли '.*' в конце) или None,
+                 если шаблон не литеральный.
+        """
+        leading = pattern.startswith(".*")
+        body = pattern[2:] if leading else pattern
+        trailing = body.endswith(".*") and not body.endswith("\\.*")
+        body = body[:-2] if trailing else body
+
+        literal = []
+        escaped = False
+        for char in body:
+            if escaped:
+                # Экранированный специальный символ - литерал; \d, \w и т.п. - классы символов
+                if char not in _SPECIAL:
+                    return None
+                literal.append(char)
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char in _SPECIAL:
+                return None
+            else:
+                literal.append(char)
+        if escaped:
+            return None
+
+        text = "".join(literal)
+        if "\n" in text:
+            return None
+        return text, leading, trailing
@@ -0,0 +1,14 @@
+from enum import StrEnum
+
+
+class LogicalOp(StrEnum):
+    """
+    Перечисление (Enum) логических операций узла дерева фильтров (FilterExpressionDto).
+    """
+
+    # Все условия узла выполняются
+    AND = 'and'
+    # Выполняется хотя бы одно условие узла
+    OR = 'or'
+    # Условия узла не выполняются одновременно (отрицание AND)
+    NOT = 'not'
@@ -0,0 +1,100 @@
+from itertools import islice
+from operator import attrgetter
+
+
+class FieldStatistics:
+    """
+    Статистика значений поля по выборке моделей: количество строк, оценка количества
+    различных значений, минимум и максимум (если значения сравниваются).
+    """
+
+    def __init__(self, rows: int, sample: list):
+        """
+        :param rows: Количество моделей в наборе.
+        :param sample: Значения поля у равномерной выборки моделей.
+        """
+        self.rows = rows
+        sample_distinct = len(set(sample)) if sample else 0
+        if len(sample) >= rows or sample_distinct < len(sample) / 2:
+            # Выборка - весь набор или значения повторяются: различные значения уже встретились
+            self.distinct = max(sample_distinct, 1)
+        else:
+            # Значения почти не повторяются: количество различных растёт вместе с набором
+            self.distinct = max(sample_distinct * rows // max(len(sample), 1), 1)
+        try:
+            self.min = min(sample) if sample else None
+            self.max = max(sample) if sample else None
+        except TypeError:
+            self.min = self.max = None
+
+    def selectivity(self, op: str, value) -> float | None:
+        """
+        Оценка доли моделей, у которых поле удовлетворяет условию `поле op value`.
+
+        :return: Доля от 0 до 1 или None, если оценка для оператора не строится.
+        """
+        if op == "==":
+            return 1 / self.distinct
+        if op == "!=":
+            return 1 - 1 / self.distinct
+        if op in ("in", "notin") and not isinstance(value, str):
+            try:
+                share = min(len(value) / self.distinct, 1.0)
+            except TypeError:
+                return None
+            return share if op == "in" else 1 - share
+        if op in ("<", "<=", ">", ">=") and self.min is not None:
+            try:
+                if self.max == self.min:
+                    below = 1.0 if value > self.min else 0.0
+                else:
+                    below = (value - self.min) / (self.max - self.min)
+            except TypeError:
+                return None
+            below = min(max(below, 0.0), 1.0)
+            return below if op in ("<", "<=") else 1 - below
+        return None
+
+
+class ModelStatistics:
+    """
+    Статистика полей набора моделей (словарь репозитория {id: модель}) для планировщика фильтров.
+    Статистика поля строится по равномерной выборке при первом запросе и пересчитывается,
+    когда количество изменений набора превышает refresh_share от его размера.
+    """
+
+    def __init__(self, models: dict, sample_size: int = 1000, refresh_share: float = 0.1):
+        """
+        :param models: Словарь моделей {id: модель}, по которому собирается статистика.
+        :param sample_size: Размер выборки для оценки статистики поля.
+        :param refresh_share: Доля изменённых моделей, после которой статистика пересчитывается.
+        """
+        self.__models = models
+        self.__sample_size = sample_size
+        self.__refresh_share = refresh_share
+        # Имя поля -> (статистика, счётчик изменений на момент расчёта)
+        self.__fields: dict[str, tuple[FieldStatistics | None, int]] = {}
+        self.__changes = 0
+
+    def changed(self):
+        """Отметить изменение набора (добавление или удаление модели)"""
+        self.__changes += 1
+
+    def field(self, field_name: str) -> FieldStatistics | None:
+        """
+        Статистика поля (вложенные поля через точку) или None, если поле не удалось прочитать.
+        """
+        entry = self.__fields.get(field_name)
+        if entry is not None and self.__changes - entry[1] <= len(self.__models) * self.__refresh_share:
+            return entry[0]
+
+        rows = len(self.__models)
+        step = max(rows // self.__sample_size, 1)
+        getter = attrgetter(field_name)
+        try:
+            sample = [getter(model) for model in islice(self.__models.values(), 0, None, step)]
+            statistics = FieldStatistics(rows, sample)
+        except (AttributeError, TypeError):
+            statistics = None
+        self.__fields[field_name] = (statistics, self.__changes)
+        return statistics
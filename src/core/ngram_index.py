@@ -0,0 +1,211 @@
+import heapq
+from bisect import bisect_left, insort
+from operator import attrgetter
+
+
+def _tail_key(entry: tuple) -> tuple:
+    """Ключ упорядочивания позиции слова: (текст с начала слова, текст)"""
+    text, start, _ = entry
+    return text[start:], text
+
+
+class NgramIndex:
+    """
+    Текстовый индекс моделей по строковым полям (например, name и full_name) для поиска по подстроке.
+
+    Совпадения ранжируются ключом (вид, номер поля, текст с места совпадения, текст), где вид:
+    0 - полное совпадение, 1 - начало текста, 2 - начало слова, 3 - подстрока внутри слова.
+    Виды 0-2 выбираются из упорядоченных списков начал слов (двоичный поиск по запросу),
+    поэтому первые limit совпадений находятся без ранжирования всех подходящих строк.
+    Вид 3 ищется, только если совпадений видов 0-2 меньше limit: кандидаты - пересечение множеств
+    n-грамм запроса (по умолчанию триграмм), в тексте каждого кандидата ищется запрос (str.find, без шаблона like),
+    следующее по важности поле просматривается, только если совпадений всё ещё меньше limit. Время поиска вида 3
+    растёт с количеством кандидатов; запросы короче n внутри слова не ищутся.
+    Текст нормализуется: нижний регистр, 'ё' -> 'е'.
+    """
+
+    def __init__(self, fields: list[str], n: int = 3):
+        """
+        :param fields: Индексируемые строковые поля в порядке важности.
+        :param n: Длина n-граммы.
+        """
+        self.__fields = list(fields)
+        self.__getters = [attrgetter(field) for field in fields]
+        self.__n = n
+        # id модели -> модель и нормализованные тексты полей
+        self.__models: dict[str, object] = {}
+        self.__texts: dict[str, tuple[str, ...]] = {}
+        # n-грамма -> id моделей
+        self.__grams: dict[str, set[str]] = {}
+        # (начало текста или слова внутри текста, номер поля) -> позиции (текст, начало слова, id) по _tail_key
+        self.__starts: dict[tuple[bool, int], list[tuple]] = {(first, number): [] for first in (True, False)
+                                                              for number in range(len(fields))}
+
+    def __len__(self) -> int:
+        return len(self.__models)
+
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self.__models
+
+    @property
+    def fields(self) -> list[str]:
+        return self.__fields
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Нормализованный текст для индексации и поиска"""
+        return text.lower().replace("ё", "е")
+
+    def add(self, model):
+        """
+        Добавить модель в индекс (значения None и пустые строки не индексируются).
+        """
+        if model.id in self.__models:
+            self.remove(model)
+        for key, entry in self.__register(model):
+            insort(self.__starts[key], entry, key=_tail_key)
+
+    def extend(self, models):
+        """
+        Добавить в индекс несколько моделей (списки начал слов сортируются один раз).
+        """
+        for model in models:
+            if model.id in self.__models:
+                self.remove(model)
+            for key, entry in self.__register(model):
+                self.__starts[key].append(entry)
+        for entries in self.__starts.values():
+            entries.sort(key=_tail_key)
+
+    def remove(self, model):
+        """
+        Удалить модель из индекса (по текстам на момент добавления).
+        """
+        texts = self.__texts.pop(model.id, None)
+        if texts is None:
+            return
+        del self.__models[model.id]
+        for gram in self.__grams_of(texts):
+            ids = self.__grams[gram]
+            ids.discard(model.id)
+            if not ids:
+                del self.__grams[gram]
+        for key, entry in self.__entries(model.id, texts):
+            entries = self.__starts[key]
+            position = bisect_left(entries, _tail_key(entry), key=_tail_key)
+            while entries[position] != entry:
+                position += 1
+            del entries[position]
+
+    def update(self, model):
+        """
+        Переиндексировать модель после изменения полей (если она есть в индексе).
+        """
+        if model.id in self.__models:
+            self.add(model)
+
+    def matches(self, query: str, limit: int = 20) -> list[tuple[tuple, object]]:
+        """
+        Лучшие совпадения с запросом вместе с ключом ранжирования (для объединения результатов нескольких индексов).
+
+        :param query: Строка поиска.
+        :param limit: Наибольшее количество совпадений.
+        :return: Список кортежей (ключ ранжирования, модель) по возрастанию ключа.
+        """
+        query = self.normalize(query.strip())
+        if not query or limit <= 0:
+            return []
+
+        found: dict[str, tuple] = {}
+        # Полные совпадения, начала текстов, начала слов: каждый список просматривается в порядке ключа
+        for kind, first in ((0, True), (1, True), (2, False)):
+            for number in range(len(self.__fields)):
+                for text, start, model_id in self.__prefixed(self.__starts[(first, number)], query):
+                    if len(found) >= limit:
+                        break
+                    if kind == 0 and text != query:
+                        break
+                    if model_id not in found:
+                        found[model_id] = (kind, number, text[start:], text)
+
+        if len(found) < limit and len(query) >= self.__n:
+            self.__inner_matches(query, limit, found)
+
+        return [(rank, self.__models[model_id]) for model_id, rank in found.items()]
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        Модели, поля которых содержат запрос, в порядке ранжирования.
+
+        :param query: Строка поиска.
+        :param limit: Наибольшее количество моделей.
+        """
+        return [model for _, model in self.matches(query, limit)]
+
+    def __register(self, model) -> list[tuple]:
+        """Запомнить модель и её n-граммы; позиции начал слов для списков"""
+        texts = tuple(self.normalize(getter(model) or "") for getter in self.__getters)
+        self.__models[model.id] = model
+        self.__texts[model.id] = texts
+        for gram in self.__grams_of(texts):
+            self.__grams.setdefault(gram, set()).add(model.id)
+        return self.__entries(model.id, texts)
+
+    @staticmethod
+    def __entries(model_id: str, texts: tuple[str, ...]) -> list[tuple]:
+        """Позиции начал текстов и слов: (ключ списка, (текст, начало слова, id))"""
+        entries = []
+        for number, text in enumerate(texts):
+            if not text:
+                continue
+            entries.append(((True, number), (text, 0, model_id)))
+            for start in range(1, len(text)):
+                if text[start - 1] == " " and text[start] != " ":
+                    entries.append(((False, number), (text, start, model_id)))
+        return entries
+
+    @staticmethod
+    def __prefixed(entries: list[tuple], query: str):
+        """Позиции, текст которых с начала слова начинается с запроса, в порядке _tail_key"""
+        for position in range(bisect_left(entries, (query,), key=_tail_key), len(entries)):
+            entry = entries[position]
+            if not entry[0].startswith(query, entry[1]):
+                return
+            yield entry
+
+    def __candidates(self, query: str) -> set[str]:
+        """id моделей, среди которых находятся все совпадения запроса внутри слов"""
+        postings = []
+        for gram in self.__grams_of((query,)):
+            ids = self.__grams.get(gram)
+            if ids is None:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def __inner_matches(self, query: str, limit: int, found: dict[str, tuple]):
+        """
+        Дополнить found лучшими совпадениями внутри слов. Поля просматриваются по порядку важности:
+        совпадение в более важном поле всегда выше, поэтому следующее поле просматривается,
+        только если совпадений ещё меньше limit.
+        """
+        texts = self.__texts
+        candidates = [model_id for model_id in self.__candidates(query) if model_id not in found]
+        for number in range(len(self.__fields)):
+            if not candidates or len(found) >= limit:
+                return
+            hits = []
+            for model_id in candidates:
+                text = texts[model_id][number]
+                start = text.find(query)
+                if start >= 0:
+                    hits.append((text[start:], text, model_id))
+            for tail, text, model_id in heapq.nsmallest(limit - len(found), hits):
+                found[model_id] = (3, number, tail, text)
+            candidates = [model_id for model_id in candidates if model_id not in found]
+
+    def __grams_of(self, texts: tuple[str, ...]) -> set[str]:
+        """n-граммы текстов"""
+        n = self.__n
+        return {text[start:start + n] for text in texts for start in range(len(text) - n + 1)}
@@ -0,0 +1,40 @@
+from src.core.abstract_listener import AbstractListener
+from src.core.event_type import EventType
+from src.models.validators.functions import validate_val
+
+
+class ObserveService:
+    """
+    Сервис рассылки событий (паттерн Observer).
+    Хранит список слушателей и передаёт каждому из них все события приложения.
+    """
+    _listeners: list[AbstractListener] = []
+
+    @staticmethod
+    def add(listener: AbstractListener):
+        """
+        Зарегистрировать слушателя. Повторная регистрация игнорируется.
+
+        :param listener: Объект, наследующий AbstractListener.
+        """
+        validate_val(listener, AbstractListener)
+        if all(item is not listener for item in ObserveService._listeners):
+            ObserveService._listeners.append(listener)
+
+    @staticmethod
+    def delete(listener: AbstractListener):
+        """
+        Удалить слушателя из рассылки.
+        """
+        ObserveService._listeners = [item for item in ObserveService._listeners if item is not listener]
+
+    @staticmethod
+    def create_event(event: EventType, params=None):
+        """
+        Разослать событие всем зарегистрированным слушателям.
+
+        :param event: Тип события из перечисления EventType.
+        :param params: Параметры события.
+        """
+        for listener in list(ObserveService._listeners):
+            listener.handle(event, params)
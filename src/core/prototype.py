@@ -1,8 +1,11 @@
 import operator
-import re
 
-from src.core.functions import get_nested_attr
+from src.core.filter_planner import FilterPlan, FilterPlanner
+from src.core.lazy_prototype import LazyPrototype
+from src.core.like_pattern import LikePattern
+from src.core.sorter import Sorter
 from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
 from src.dto.sorting_dto import SortingDto
 from src.models.validators.functions import validate_val
 
@@ -25,14 +28,15 @@ class Prototype:
         ">": operator.gt,  # Больше
         ">=": operator.ge,  # Больше или равно
         # Дополнительно:
-        "in": operator.contains,  # Проверяет, содержится ли левый операнд в правом итерируемом объекте (x in iterable)
+        "in": lambda x, y: x in y,  # Проверяет, содержится ли левый операнд в правом итерируемом объекте (x in iterable)
         "notin": lambda x, y: x not in y,  # Проверяет, не содержится ли левый операнд в правом
         "contains": lambda x, y: y in x,  # Проверяет, содержится ли правый операнд в левом (iterable contains y)
         "notcontains": lambda x, y: y not in x,  # Проверяет, не содержится ли правый операнд в левом
         "and": operator.and_,  # Побитовое И
         "or": operator.or_,  # Побитовое ИЛИ
         "xor": operator.xor,  # Побитовое исключающее ИЛИ
-        "like": lambda s, pattern: bool(re.fullmatch(pattern, s)) # Сравнение строки с регулярным выражением (полное совпадение)
+        "like": lambda s, pattern: LikePattern.match(s, pattern),  # Сравнение строки с регулярным выражением (полное совпадение)
+        "ilike": lambda s, pattern: LikePattern.match(s, pattern, True),  # То же без учёта регистра
     }
 
     # Набор данных
@@ -47,7 +51,9 @@ class Prototype:
         """
         Конструктор класса. Инициализирует Прототип заданным списком данных.
 
-        :param data: Список элементов, с которым будет работать Прототип.
+        :param data: Список элементов, с которым будет работать Прототип. Если это SortedList,
+                     фильтры сравнения по его полю выполняются двоичным поиском. Если это IndexedList,
+                     фильтры по индексированным полям выполняются по индексам.
         """
         validate_val(data, list)
         self._data = data
@@ -64,6 +70,15 @@ class Prototype:
         instance = Prototype(inner_data)
         return instance
 
+    def lazy(self) -> LazyPrototype:
+        """
+        Ленивый конвейер над текущим набором данных: фильтры без копирования списка,
+        постраничный отбор (offset, limit) и частичная сортировка (top_k).
+
+        :return: Новый экземпляр LazyPrototype.
+        """
+        return LazyPrototype(self._data, self._operator_to_func)
+
     # Универсальная функция фильтрации с поддержкой вложенных структур
     def filter(self, dto: FilterDto) -> "Prototype":
         """
@@ -75,34 +90,57 @@ class Prototype:
         """
         if not dto:
             return self
-        # Фильтрация с использованием соответствующей функции оператора и получения вложенного атрибута
-        result = filter(lambda item: self._operator_to_func[dto.op](get_nested_attr(item, dto.field_name.split(".")), dto.value), self.data)
-        return self.clone(list(result))
+        return self.filter_mul([dto])
 
-    def filter_mul(self, dtos: list[FilterDto]) -> "Prototype":
+    def filter_mul(self, dtos: list[FilterDto], expression: FilterExpressionDto = None) -> "Prototype":
         """
-        Последовательно применяет несколько критериев фильтрации к набору данных.
-        Каждый последующий фильтр применяется к результату предыдущего (логическое И).
+        Применяет несколько критериев фильтрации к набору данных (логическое И) по плану FilterPlanner:
+        фильтры сравнения по полю упорядоченного SortedList выполняются двоичным поиском,
+        фильтры по индексированным полям IndexedList (HashIndex: ==, in, notin; RangeIndex: <, <=, >, >=, ==) -
+        по индексам, если они оставляют меньше элементов. Остальные фильтры компилируются FilterCompiler
+        в один предикат и проверяются за один проход в порядке возрастания стоимости.
 
         :param dtos: Список объектов FilterDto, каждый из которых представляет критерий фильтрации.
+        :param expression: Дерево фильтров (узлы and, or, not), применяемое вместе с dtos.
         :return: Новый экземпляр Prototype с данными, прошедшими все фильтры.
         """
-        result = self
-        for dto in dtos:
-            result = result.filter(dto)
-        return result
+        if not dtos and expression is None:
+            return self
+        return self.clone(self.plan(dtos, expression).execute(self._operator_to_func))
+
+    def filter_expr(self, expression: FilterExpressionDto) -> "Prototype":
+        """
+        Фильтрует текущий набор данных по дереву фильтров (узлы and, or, not над FilterDto).
+        Узлы or, все условия которых индексированы, выполняются объединением выборок индексов,
+        остальные - предикатом с сокращённым вычислением.
+
+        :param expression: Корень дерева фильтров.
+        :return: Новый экземпляр Prototype с данными, удовлетворяющими дереву.
+        """
+        return self.filter_mul([], expression)
+
+    def plan(self, dtos: list[FilterDto], expression: FilterExpressionDto = None) -> FilterPlan:
+        """
+        План фильтрации набора данных (для выполнения и для explain).
+
+        :param dtos: Список объектов FilterDto.
+        :param expression: Дерево фильтров, применяемое вместе с dtos.
+        :return: Объект FilterPlan.
+        """
+        return FilterPlanner.plan(self._data, dtos, expression)
 
     def sort(self, dto: SortingDto):
         """
-        Сортирует текущий набор данных на основе заданных критериев сортировки.
-        Поддерживает сортировку по нескольким полям и по вложенным атрибутам.
+        Сортирует текущий набор данных на основе заданных критериев сортировки (Sorter).
+        Поддерживает сортировку по нескольким полям и по вложенным атрибутам, направление
+        и положение значений None для каждого поля. Сортировка по одному полю упорядоченного SortedList
+        или полного RangeIndex берёт готовый порядок.
 
         :param dto: Объект SortingDto, содержащий список имен полей для сортировки
-                    и флаг направления (descending).
+                    и флаг направления (descending) или поля сортировки (fields).
         :return: Новый экземпляр Prototype, содержащий отсортированные данные.
                  Возвращает себя, если DTO отсутствует.
         """
         if not dto:
             return self
-        # Сортировка с использованием списка ключей (для многоуровневой сортировки)
-        return self.clone(sorted(self._data, key=lambda item: [get_nested_attr(item, field.split(".")) for field in dto.field_names], reverse=dto.descending))
\ No newline at end of file
+        return self.clone(Sorter.sort(self._data, dto))
@@ -0,0 +1,134 @@
+from bisect import bisect_left, bisect_right
+
+from src.core.abstract_index import AbstractIndex
+
+
+class RangeIndex(AbstractIndex):
+    """
+    Вторичный упорядоченный индекс моделей по значению поля (числа, даты).
+    Хранит отсортированный массив значений и параллельные массивы моделей, их id и порядковых номеров,
+    поэтому отбор по <, <=, >, >=, == сводится к двоичному поиску границ и срезу.
+    """
+
+    operators = {"<", "<=", ">", ">=", "=="}
+
+    def __init__(self, field: str):
+        """
+        :param field: Имя индексируемого поля (например, 'value').
+        """
+        super().__init__(field)
+        # Отсортированные значения поля и параллельные им модели, id и порядковые номера добавления
+        self.__keys: list = []
+        self.__models: list = []
+        self.__ids: list[str] = []
+        self.__orders: list[int] = []
+
+    def add(self, model):
+        try:
+            value = self._getter(model)
+            # Модели с равным значением хранятся в порядке добавления
+            position = bisect_right(self.__keys, value)
+        except (AttributeError, TypeError):
+            # Значение поля не получено или не сравнивается с остальными
+            self._missing.add(model.id)
+            return
+        self.__keys.insert(position, value)
+        self.__models.insert(position, model)
+        self.__ids.insert(position, model.id)
+        self._register(model)
+        self.__orders.insert(position, self._positions[model.id])
+
+    def extend(self, models):
+        """
+        Добавить несколько моделей одной сортировкой (add вставляет в массивы по одной модели).
+        """
+        entries = list(zip(self.__keys, self.__orders, self.__models))
+        for model in models:
+            try:
+                entries.append((self._getter(model), self.__next_order(model), model))
+            except AttributeError:
+                self._missing.add(model.id)
+        try:
+            # Равные значения упорядочиваются по порядковому номеру добавления
+            entries.sort(key=lambda entry: (entry[0], entry[1]))
+        except TypeError:
+            # Значения не сравниваются: модели добавляются по одной, несравнимые попадают в _missing
+            for _, _, model in entries[len(self.__keys):]:
+                del self._positions[model.id]
+                self.add(model)
+            return
+        self.__keys = [entry[0] for entry in entries]
+        self.__orders = [entry[1] for entry in entries]
+        self.__models = [entry[2] for entry in entries]
+        self.__ids = [model.id for model in self.__models]
+
+    def __next_order(self, model) -> int:
+        """Зарегистрировать модель и вернуть её порядковый номер"""
+        self._register(model)
+        return self._positions[model.id]
+
+    def remove(self, model):
+        self._missing.discard(model.id)
+        if self._positions.pop(model.id, None) is None:
+            return
+        try:
+            low, high = self.__bounds("==", self._getter(model))
+        except (AttributeError, TypeError):
+            low = high = 0
+        for position in range(low, high):
+            if self.__ids[position] == model.id:
+                break
+        else:
+            # Поле изменилось после добавления: модель ищется по всему индексу
+            position = self.__ids.index(model.id)
+        del self.__keys[position]
+        del self.__models[position]
+        del self.__ids[position]
+        del self.__orders[position]
+
+    def supports(self, op: str, value) -> bool:
+        if not self.complete or op not in self.operators:
+            return False
+        try:
+            self.__bounds(op, value)
+        except TypeError:
+            return False
+        return True
+
+    def count(self, op: str, value) -> int:
+        low, high = self.__bounds(op, value)
+        return high - low
+
+    def select(self, op: str, value) -> list:
+        low, high = self.__bounds(op, value)
+        # Позиции среза сортируются по порядковому номеру без вызова функции Python для каждой модели
+        positions = sorted(range(low, high), key=self.__orders.__getitem__)
+        return list(map(self.__models.__getitem__, positions))
+
+    def ordered(self, descending: bool = False) -> list:
+        """
+        Модели индекса в порядке значения поля (модели с равным значением - в порядке добавления).
+
+        :param descending: По убыванию значения.
+        """
+        if not descending:
+            return list(self.__models)
+        # Устойчивая сортировка позиций по убыванию сохраняет порядок добавления равных значений
+        positions = sorted(range(len(self.__keys)), key=self.__keys.__getitem__, reverse=True)
+        return list(map(self.__models.__getitem__, positions))
+
+    def ids(self, op: str, value) -> set[str]:
+        low, high = self.__bounds(op, value)
+        return set(self.__ids[low:high])
+
+    def __bounds(self, op: str, value) -> tuple[int, int]:
+        """Границы среза [начало, конец) значений, удовлетворяющих условию `значение op value`"""
+        if op == "<":
+            return 0, bisect_left(self.__keys, value)
+        if op == "<=":
+            return 0, bisect_right(self.__keys, value)
+        if op == ">":
+            return bisect_right(self.__keys, value), len(self.__keys)
+        if op == ">=":
+            return bisect_left(self.__keys, value), len(self.__keys)
+        return bisect_left(self.__keys, value), bisect_right(self.__keys, value)
@@ -1,7 +1,11 @@
-class Singleton(type):
+from abc import ABCMeta
+
+
+class Singleton(ABCMeta):
     """
     Метакласс для реализации паттерна Singleton.
     Гарантирует, что у класса будет только один экземпляр.
+    Наследуется от ABCMeta, чтобы синглтоны могли реализовывать абстрактные классы (например, AbstractListener).
     """
     _instances = {}
 
@@ -0,0 +1,72 @@
+from bisect import bisect_left, bisect_right, insort
+
+from src.core.functions import get_nested_attr
+from src.core.abstract_index import AbstractIndex
+from src.core.indexed_list import IndexedList
+from src.core.model_statistics import ModelStatistics
+
+
+class SortedList(IndexedList):
+    """
+    Список, упорядоченный по возрастанию поля field (вложенные поля через точку).
+    Prototype использует признак упорядоченности для фильтрации по этому полю двоичным поиском.
+
+    Порядок поддерживается методами insert_sorted и remove_sorted; остальные методы list
+    его не проверяют. Изменение поля у элемента после вставки нарушает порядок.
+    """
+
+    def __init__(self, iterable=(), field: str = "", indexes: dict[str, AbstractIndex] = None,
+                 statistics: ModelStatistics = None):
+        super().__init__(iterable, indexes, statistics)
+        self.field = field
+        self.__path = field.split(".")
+
+    def key(self, item):
+        """Значение поля упорядочивания элемента"""
+        return get_nested_attr(item, self.__path)
+
+    def insert_sorted(self, item):
+        """
+        Вставить элемент с сохранением порядка (после элементов с равным значением поля).
+        """
+        insort(self, item, key=self.key)
+
+    def remove_sorted(self, item):
+        """
+        Удалить элемент (по идентичности), найдя его двоичным поиском.
+
+        :raises ValueError: Если элемента нет в списке.
+        """
+        value = self.key(item)
+        low = bisect_left(self, value, key=self.key)
+        high = bisect_right(self, value, lo=low, key=self.key)
+        for index in range(low, high):
+            if self[index] is item:
+                del self[index]
+                return
+        raise ValueError(f"Элемент {item} не найден")
+
+    def bounds(self, op: str, value) -> tuple[int, int]:
+        """
+        Границы среза [начало, конец) элементов, у которых поле удовлетворяет условию `поле op value`.
+
+        :param op: Оператор сравнения: <, <=, >, >=, ==.
+        """
+        if op == "<":
+            return 0, bisect_left(self, value, key=self.key)
+        if op == "<=":
+            return 0, bisect_right(self, value, key=self.key)
+        if op == ">":
+            return bisect_right(self, value, key=self.key), len(self)
+        if op == ">=":
+            return bisect_left(self, value, key=self.key), len(self)
+        if op == "==":
+            return bisect_left(self, value, key=self.key), bisect_right(self, value, key=self.key)
+        raise ValueError(f"Оператор {op} не поддерживается")
+
+    def slice(self, op: str, value) -> "SortedList":
+        """
+        Элементы, у которых поле удовлетворяет условию `поле op value` (новый SortedList).
+        """
+        low, high = self.bounds(op, value)
+        return SortedList(self[low:high], self.field)
@@ -0,0 +1,124 @@
+import heapq
+from operator import attrgetter
+from typing import Callable, Iterable
+
+from src.core.indexed_list import IndexedList
+from src.core.range_index import RangeIndex
+from src.core.sorted_list import SortedList
+from src.dto.sort_field_dto import SortFieldDto
+from src.dto.sorting_dto import SortingDto
+
+
+class Sorter:
+    """
+    Сортировка по SortingDto с ключами, вычисленными один раз для каждого элемента.
+
+    Функции получения значений полей (attrgetter) создаются один раз на сортировку.
+    Если у всех полей одно направление, выполняется одна сортировка по кортежу значений полей.
+    Иначе (или если среди значений есть None) выполняются устойчивые сортировки позиций элементов
+    по списку значений каждого поля, начиная с последнего поля. Значения None размещаются в начале
+    или в конце (SortFieldDto.nulls_first) независимо от направления.
+
+    Сортировка по одному полю берёт готовый порядок, если список упорядочен по этому полю (SortedList)
+    или по полю есть полный RangeIndex набора (IndexedList в порядке добавления моделей).
+    """
+
+    @staticmethod
+    def fields(dto: SortingDto) -> list[SortFieldDto]:
+        """Поля сортировки (field_names с общим направлением descending, если fields не заданы)"""
+        if dto.fields:
+            return dto.fields
+        return [SortFieldDto(field_name=name, descending=dto.descending) for name in dto.field_names]
+
+    @staticmethod
+    def sort(items: Iterable, dto: SortingDto, getter: Callable = attrgetter) -> list:
+        """
+        Отсортировать элементы (сортировка устойчивая).
+
+        :param items: Элементы (список, в том числе SortedList и IndexedList, или итератор).
+        :param dto: Сортировка.
+        :param getter: Фабрика функций получения значений по именам полей
+                       (attrgetter - поля моделей через точку, itemgetter - ключи словарей).
+        :return: Новый отсортированный список.
+        """
+        fields = Sorter.fields(dto)
+        ordered = Sorter.indexed(items, fields)
+        if ordered is not None:
+            return ordered
+
+        items = list(items)
+        if not fields:
+            return items
+        if Sorter.__uniform(fields):
+            try:
+                return sorted(items, key=getter(*[field.field_name for field in fields]), reverse=fields[0].descending)
+            except TypeError:
+                # Значение None сравнивается со значением поля: сортировка по каждому полю
+                pass
+        for field in reversed(fields):
+            items = Sorter.__sort_by(items, getter(field.field_name), field)
+        return items
+
+    @staticmethod
+    def smallest(items: Iterable, dto: SortingDto, count: int, getter: Callable = attrgetter) -> list:
+        """
+        Первые count элементов в порядке сортировки, совпадает с sort(...)[:count].
+        Если у всех полей одно направление, выполняется частичная сортировка кучей.
+        """
+        fields = Sorter.fields(dto)
+        ordered = Sorter.indexed(items, fields)
+        if ordered is not None:
+            return ordered[:count]
+
+        items = list(items)
+        if not fields:
+            return items[:count]
+        if Sorter.__uniform(fields):
+            key = getter(*[field.field_name for field in fields])
+            try:
+                # nsmallest/nlargest совпадают с sorted(...)[:count], в том числе для равных ключей
+                if fields[0].descending:
+                    return heapq.nlargest(count, items, key)
+                return heapq.nsmallest(count, items, key)
+            except TypeError:
+                pass
+        # Разные направления полей или значения None: ключ кучи сравнивался бы функцией Python,
+        # полная сортировка по спискам значений полей быстрее
+        return Sorter.sort(items, dto, getter)[:count]
+
+    @staticmethod
+    def indexed(items: Iterable, fields: list[SortFieldDto]) -> list | None:
+        """
+        Элементы в порядке сортировки по одному полю без сравнения элементов или None:
+        копия SortedList, упорядоченного по этому полю (по возрастанию), или порядок полного RangeIndex.
+        """
+        if len(fields) != 1 or not isinstance(items, IndexedList):
+            return None
+        field = fields[0]
+        if isinstance(items, SortedList):
+            # Равные значения RangeIndex упорядочены по добавлению, а не по полю SortedList
+            if items.field == field.field_name and not field.descending:
+                return list(items)
+            return None
+        index = items.index_for(field.field_name)
+        if isinstance(index, RangeIndex) and index.complete:
+            return index.ordered(field.descending)
+        return None
+
+    @staticmethod
+    def __uniform(fields: list[SortFieldDto]) -> bool:
+        """У всех полей одно направление"""
+        return all(field.descending == fields[0].descending for field in fields)
+
+    @staticmethod
+    def __sort_by(items: list, get: Callable, field: SortFieldDto) -> list:
+        """Устойчивая сортировка по одному полю: значения вычисляются один раз, сортируются позиции"""
+        keys = list(map(get, items))
+        try:
+            positions = sorted(range(len(keys)), key=keys.__getitem__, reverse=field.descending)
+        except TypeError:
+            present = [position for position, key in enumerate(keys) if key is not None]
+            missing = [position for position, key in enumerate(keys) if key is None]
+            present.sort(key=keys.__getitem__, reverse=field.descending)
+            positions = missing + present if field.nulls_first else present + missing
+        return list(map(items.__getitem__, positions))
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from src.dto.abstract_dto import AbstractDto
+
+
+# класс dto агрегатной функции: функция (sum, count, min, max, avg) над числовым полем
+# name - имя столбца результата (по умолчанию "<func>_<field_name>" или "count")
+@dataclass
+class AggregateDto(AbstractDto):
+    field_name: str = ""
+    func: str = "count"
+    name: str = ""
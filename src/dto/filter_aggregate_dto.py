@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+
+from src.dto.abstract_dto import AbstractDto
+from src.dto.aggregate_dto import AggregateDto
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.dto.sorting_dto import SortingDto
+
+
+# Пример (оборот и количество транзакций по складам и продуктам):
+# {
+#     "model": "transactions",
+#     "filters": [
+#         {"field_name": "value", "value": 0, "op": ">"}
+#     ],
+#     "group_by": ["storage", "product.name"],
+#     "aggregates": [
+#         {"field_name": "value", "func": "sum"},
+#         {"func": "count"}
+#     ],
+#     "sorts":
+#         {
+#             "field_names": ["sum_value"],
+#             "descending": true
+#         },
+#     "offset": 0,
+#     "limit": 10
+# }
+
+# класс dto запроса агрегации моделей: фильтры, группировка, агрегатные функции, сортировка и страница строк
+@dataclass
+class FilterAggregateDto(AbstractDto):
+    model: str = ""
+    filters: list[FilterDto] = field(default_factory=list)
+    # Дерево фильтров (and, or, not), применяется вместе с filters
+    where: FilterExpressionDto = None
+    # Пути полей группировки (вложенные поля через точку); пустой список - одна итоговая строка
+    group_by: list[str] = field(default_factory=list)
+    aggregates: list[AggregateDto] = field(default_factory=list)
+    # Сортировка строк результата по именам столбцов
+    sorts: SortingDto = None
+    # Постраничный отбор результата: пропустить offset строк и вернуть не больше limit (None - все)
+    offset: int = 0
+    limit: int = None
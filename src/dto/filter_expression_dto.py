@@ -0,0 +1,29 @@
+from dataclasses import dataclass, field
+
+from src.dto.abstract_dto import AbstractDto
+from src.dto.filter_dto import FilterDto
+
+
+# Пример (группа "Продукты питания" или единица измерения "кг", кроме продукта "Мука"):
+# {
+#     "op": "and",
+#     "filters": [
+#         {"field_name": "name", "value": "Мука", "op": "!="}
+#     ],
+#     "expressions": [
+#         {
+#             "op": "or",
+#             "filters": [
+#                 {"field_name": "group.name", "value": "Продукты питания"},
+#                 {"field_name": "unit.name", "value": "кг"}
+#             ]
+#         }
+#     ]
+# }
+
+# класс dto узла дерева фильтров: логическая операция (and, or, not) над фильтрами и вложенными узлами
+@dataclass
+class FilterExpressionDto(AbstractDto):
+    op: str = "and"
+    filters: list[FilterDto] = field(default_factory=list)
+    expressions: list["FilterExpressionDto"] = field(default_factory=list)
@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 
 from src.dto.abstract_dto import AbstractDto
 from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
 from src.dto.sorting_dto import SortingDto
 
 
@@ -14,11 +15,21 @@ from src.dto.sorting_dto import SortingDto
 #                 "value": "Продукты питания"
 #             }
 #         ],
+#     "where":
+#         {
+#             "op": "or",
+#             "filters": [
+#                 {"field_name": "unit.name", "value": "кг"},
+#                 {"field_name": "name", "value": "Мука.*", "op": "like"}
+#             ]
+#         },
 #     "sorts":
 #         {
 #             "field_names": ["name"],
 #             "descending": false
-#         }
+#         },
+#     "offset": 0,
+#     "limit": 20
 # }
 
 # класс dto для фильтрации и сортировки моделей
@@ -26,6 +37,11 @@ from src.dto.sorting_dto import SortingDto
 class FilterModelsDto(AbstractDto):
     model: str = ""
     filters: list[FilterDto] = field(default_factory=list)
+    # Дерево фильтров (and, or, not), применяется вместе с filters
+    where: FilterExpressionDto = None
     sorts: SortingDto = None
+    # Постраничный отбор результата: пропустить offset элементов и вернуть не больше limit (None - все)
+    offset: int = 0
+    limit: int = None
 
 
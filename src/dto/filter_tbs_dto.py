@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 
 from src.dto.abstract_dto import AbstractDto
 from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
 from src.dto.sorting_dto import SortingDto
 
 
@@ -16,6 +17,13 @@ from src.dto.sorting_dto import SortingDto
 #                 "value": "7dc27e96-e6ad-4e5e-8c56-84e00667e3d7"
 #             }
 #         ],
+#     "transaction_where":
+#         {
+#             "op": "not",
+#             "filters": [
+#                 {"field_name": "product.name", "value": "Мука"}
+#             ]
+#         },
 #     "result_filters":
 #         [
 #             {
@@ -28,7 +36,10 @@ from src.dto.sorting_dto import SortingDto
 #         {
 #             "field_names": ["end_balance"],
 #             "descending": false
-#         }
+#         },
+#     "group_by": ["product.group", "storage"],
+#     "offset": 0,
+#     "limit": 50
 # }
 
 
@@ -39,6 +50,14 @@ class FilterTbsDto(AbstractDto):
     end_date: str = ""
     transaction_filters: list[FilterDto] = field(default_factory=list)
     result_filters: list[FilterDto] = field(default_factory=list)
+    # Деревья фильтров (and, or, not), применяются вместе с transaction_filters и result_filters
+    transaction_where: FilterExpressionDto = None
+    result_where: FilterExpressionDto = None
     result_sorts: SortingDto = None
+    # Измерения группировки (product.group, storage); пустой список - ведомость по продуктам
+    group_by: list[str] = field(default_factory=list)
+    # Постраничный отбор результата: пропустить offset элементов и вернуть не больше limit (None - все)
+    offset: int = 0
+    limit: int = None
 
 
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+
+from src.dto.abstract_dto import AbstractDto
+from src.dto.cached_id import CachedId
+
+
+# класс dto для контрольных точек остатков
+@dataclass
+class RemainCheckpointDto(AbstractDto):
+    # Дата контрольной точки (остаток на начало этой даты)
+    period: str = ""
+
+    # Значение остатка
+    value: float = 0.0
+
+    # Ссылка на единицу измерения
+    unit: CachedId = None
+
+    # Ссылка на продукт
+    product: CachedId = None
+
+    # Ссылка на хранилище
+    storage: CachedId = None
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from src.dto.abstract_dto import AbstractDto
+
+
+# класс dto поля сортировки: путь поля (вложенные поля через точку), направление
+# и положение значений None (nulls_first - в начале, иначе в конце, независимо от направления)
+@dataclass
+class SortFieldDto(AbstractDto):
+    field_name: str = ""
+    descending: bool = False
+    nulls_first: bool = False
@@ -1,11 +1,21 @@
 from dataclasses import dataclass, field
 
 from src.dto.abstract_dto import AbstractDto
+from src.dto.sort_field_dto import SortFieldDto
 
 
+# Пример (по убыванию количества, затем по наименованию продукта; None - в начале):
+# {
+#     "fields": [
+#         {"field_name": "value", "descending": true, "nulls_first": true},
+#         {"field_name": "product.name"}
+#     ]
+# }
+
 # класс dto для сортировки
 @dataclass
 class SortingDto(AbstractDto):
     field_names: list[str] = field(default_factory=list)
     descending: bool = False
-
+    # Поля со своим направлением и положением None; если заданы, field_names и descending не используются
+    fields: list[SortFieldDto] = field(default_factory=list)
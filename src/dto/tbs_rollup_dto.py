@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+from src.dto.abstract_dto import AbstractDto
+from src.dto.cached_id import CachedId
+
+
+# класс dto для итоговой строки сгруппированной сальдовой ведомости
+@dataclass
+class TurnoverRollupItemDto(AbstractDto):
+    storage: CachedId = None
+    group: CachedId = None
+    unit: CachedId = None
+    products_count: int = 0
+    start_balance: float = 0.0
+    inflows: float = 0.0
+    outflows: float = 0.0
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from src.dto.tbs_dto import TurnoverBalanceItemDto
+
+
+# класс dto для элемента временного ряда оборотов
+@dataclass
+class TurnoverSeriesItemDto(TurnoverBalanceItemDto):
+    # Начало интервала (включительно)
+    period_start: str = ""
+    # Конец интервала (не включительно)
+    period_end: str = ""
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+
+from src.core.abstract_listener import AbstractListener
+from src.core.event_type import EventType
+from src.logics.balance_series import BalanceSeries
+from src.logics.unit_normalizer import UnitNormalizer
+from src.models.transaction import TransactionModel
+from src.repository import RepoKeys
+
+
+class BalanceIndex(AbstractListener):
+    """
+    Индекс накопленных дневных оборотов по парам (склад, продукт).
+    Для каждой пары хранится BalanceSeries в корневых единицах измерения, поэтому
+    начальное сальдо, поступления и расходы за любой интервал дат вычисляются
+    двоичным поиском без просмотра транзакций. Обороты сгруппированы по складам,
+    запрос с ограничением по складам и продуктам просматривает только их пары.
+
+    Синхронизируется с репозиторием, если зарегистрирован в ObserveService:
+    EventType.ADD_MODEL / DELETE_MODEL для транзакций и EventType.CHANGE_UNIT (полная перестройка).
+    """
+
+    def __init__(self, transactions: list[TransactionModel] = None):
+        self.__clear()
+        for trans in transactions or []:
+            self.add(trans)
+
+    @property
+    def storages(self) -> dict:
+        return self.__storages
+
+    @property
+    def products(self) -> dict:
+        return self.__products
+
+    @property
+    def conflicts(self) -> set[str]:
+        return self.__conflicts
+
+    def series(self, storage_id: str, product_id: str) -> BalanceSeries | None:
+        """Обороты пары (склад, продукт) или None, если по ней нет транзакций"""
+        return self.__series.get(storage_id, {}).get(product_id)
+
+    def add(self, transaction: TransactionModel):
+        """
+        Учесть транзакцию в индексе.
+        """
+        factor, base_unit = UnitNormalizer().normalize(transaction.unit)
+        value = transaction.value * factor
+        key = (transaction.storage.id, transaction.product.id)
+        day = transaction.period.toordinal()
+
+        storage_series = self.__series.setdefault(key[0], {})
+        series = storage_series.get(key[1])
+        if series is None:
+            series = storage_series[key[1]] = BalanceSeries(base_unit)
+            self.__storages.setdefault(transaction.storage.id, transaction.storage)
+            self.__products.setdefault(transaction.product.id, transaction.product)
+        if self.__product_units.setdefault(key[1], base_unit) != base_unit:
+            self.__conflicts.add(key[1])
+
+        series.add(day, value)
+        self.__entries[transaction.id] = (transaction, key, day, value)
+
+        time = transaction.period - datetime.combine(transaction.period.date(), datetime.min.time())
+        self.__min_time = time if self.__min_time is None else min(self.__min_time, time)
+        self.__max_time = time if self.__max_time is None else max(self.__max_time, time)
+
+    def remove(self, transaction_id: str):
+        """
+        Исключить транзакцию из индекса.
+        """
+        entry = self.__entries.pop(transaction_id, None)
+        if entry is None:
+            return
+        _, (storage_id, product_id), day, value = entry
+        self.__series[storage_id][product_id].add(day, -value, -1)
+
+    def rebuild(self):
+        """
+        Перестроить индекс по всем учтённым транзакциям (например, после изменения единиц измерения).
+        """
+        transactions = [entry[0] for entry in self.__entries.values()]
+        self.__clear()
+        for trans in transactions:
+            self.add(trans)
+
+    def handle(self, event: EventType, params):
+        """
+        Синхронизация с репозиторием и единицами измерения.
+        """
+        if event == EventType.CHANGE_UNIT:
+            self.rebuild()
+        elif event in (EventType.ADD_MODEL, EventType.DELETE_MODEL) and params["key"] == RepoKeys.TRANSACTIONS:
+            if event == EventType.ADD_MODEL:
+                self.add(params["model"])
+            else:
+                self.remove(params["model"].id)
+
+    def is_day_aligned(self, start: datetime, end: datetime, block_date: datetime = None) -> bool:
+        """
+        Проверяет, что границы периода не делят ни один день с транзакциями:
+        все транзакции дня start (и block_date) не раньше границы, все транзакции дня end - не позже.
+        Только в этом случае дневные обороты дают точный результат.
+        """
+        if self.__min_time is None:
+            return True
+
+        def time_of(value: datetime) -> timedelta:
+            return value - datetime.combine(value.date(), datetime.min.time())
+
+        lower_bounds = [start] + ([block_date] if block_date else [])
+        return all(time_of(bound) <= self.__min_time for bound in lower_bounds) \
+            and time_of(end) >= self.__max_time
+
+    def query(self, start: datetime, end: datetime, block_date: datetime = None,
+              storage_ids: set[str] = None, product_ids: set[str] = None) -> dict[tuple[str, str], tuple]:
+        """
+        Обороты по парам (склад, продукт), по которым есть транзакции в интервале [block_date, end].
+
+        :param start: Дата начала периода.
+        :param end: Дата окончания периода.
+        :param block_date: Дата блокировки (более ранние транзакции не учитываются).
+        :param storage_ids: Ограничение по складам (None - все склады).
+        :param product_ids: Ограничение по продуктам (None - все продукты).
+        :return: Словарь {(id склада, id продукта): (начальное сальдо, поступления, расходы)}.
+        """
+        first_day = block_date.toordinal() if block_date else 0
+        # Транзакции раньше даты блокировки уже учтены в остатках, обороты считаются с неё
+        start_day = max(start.toordinal(), first_day)
+        end_day = end.toordinal()
+
+        result = {}
+        storages = self.__series if storage_ids is None else \
+            {storage_id: self.__series[storage_id] for storage_id in storage_ids if storage_id in self.__series}
+        for storage_id, storage_series in storages.items():
+            if product_ids is None:
+                pairs = storage_series.items()
+            else:
+                pairs = [(product_id, storage_series[product_id]) for product_id in product_ids
+                         if product_id in storage_series]
+            for product_id, series in pairs:
+                before_inflows, before_outflows, before_count = series.totals(first_day, start_day - 1)
+                inflows, outflows, count = series.totals(start_day, end_day)
+                if before_count + count > 0:
+                    result[(storage_id, product_id)] = (before_inflows + before_outflows, inflows, outflows)
+        return result
+
+    def __clear(self):
+        """Очистить индекс"""
+        # id склада -> {id продукта: обороты пары}
+        self.__series: dict[str, dict[str, BalanceSeries]] = {}
+        # Склады и продукты в порядке первого появления
+        self.__storages: dict = {}
+        self.__products: dict = {}
+        # id транзакции -> (транзакция, ключ пары, день, значение в корневой единице)
+        self.__entries: dict[str, tuple] = {}
+        # Корневая единица продукта и продукты, у которых встретились разные корневые единицы
+        self.__product_units: dict = {}
+        self.__conflicts: set[str] = set()
+        # Диапазон времени внутри дня среди проиндексированных транзакций
+        self.__min_time: timedelta = None
+        self.__max_time: timedelta = None
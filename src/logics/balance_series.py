@@ -0,0 +1,93 @@
+from bisect import bisect_left, bisect_right
+
+from src.models.measurement_unit import MeasurementUnitModel
+
+
+class BalanceSeries:
+    """
+    Дневные обороты одной пары (склад, продукт) с префиксными суммами.
+    Дни хранятся отсортированными (порядковый номер даты), для каждого дня - сумма поступлений,
+    сумма расходов и количество транзакций. Префиксные суммы позволяют получить обороты
+    за любой интервал дней двумя двоичными поисками.
+
+    Добавление в последний день (обычный случай - транзакции приходят по времени) обновляет
+    префиксные суммы за O(1); добавление в более ранний день пересчитывает их при следующем запросе.
+    """
+
+    # Корневая единица измерения, в которой хранятся значения
+    unit: MeasurementUnitModel
+
+    def __init__(self, unit: MeasurementUnitModel):
+        self.unit = unit
+        self.__days: list[int] = []
+        self.__inflows: list[float] = []
+        self.__outflows: list[float] = []
+        self.__counts: list[int] = []
+        # Префиксные суммы (включительно) и количество актуальных элементов в них
+        self.__cum_inflows: list[float] = []
+        self.__cum_outflows: list[float] = []
+        self.__cum_counts: list[int] = []
+        self.__valid = 0
+
+    @property
+    def days(self) -> list[int]:
+        return self.__days
+
+    def add(self, day: int, value: float, count: int = 1):
+        """
+        Учесть значение в заданном дне.
+
+        :param day: Порядковый номер даты (date.toordinal()).
+        :param value: Значение в корневой единице (для удаления транзакции - значение со знаком минус).
+        :param count: Изменение количества транзакций (1 - добавление, -1 - удаление).
+        """
+        index = bisect_left(self.__days, day)
+        if index == len(self.__days) or self.__days[index] != day:
+            self.__days.insert(index, day)
+            self.__inflows.insert(index, 0.0)
+            self.__outflows.insert(index, 0.0)
+            self.__counts.insert(index, 0)
+            # Префиксные суммы после вставленного дня стали неактуальны
+            del self.__cum_inflows[index:]
+            del self.__cum_outflows[index:]
+            del self.__cum_counts[index:]
+
+        # Знак определяется исходной транзакцией: при удалении count < 0
+        if value * count > 0:
+            self.__inflows[index] += value
+        elif value * count < 0:
+            self.__outflows[index] += value
+        self.__counts[index] += count
+
+        self.__valid = min(self.__valid, index)
+        if index == len(self.__days) - 1:
+            self.__update_prefix()
+
+    def totals(self, first_day: int, last_day: int) -> tuple[float, float, int]:
+        """
+        Обороты за интервал дней [first_day, last_day].
+
+        :return: Кортеж (поступления, расходы, количество транзакций).
+        """
+        self.__update_prefix()
+        low = bisect_left(self.__days, first_day)
+        high = bisect_right(self.__days, last_day)
+        if low >= high:
+            return 0.0, 0.0, 0
+
+        def interval(cumulative: list):
+            return cumulative[high - 1] - (cumulative[low - 1] if low > 0 else 0)
+
+        return interval(self.__cum_inflows), interval(self.__cum_outflows), interval(self.__cum_counts)
+
+    def __update_prefix(self):
+        """Досчитать префиксные суммы, начиная с первого неактуального дня"""
+        del self.__cum_inflows[self.__valid:]
+        del self.__cum_outflows[self.__valid:]
+        del self.__cum_counts[self.__valid:]
+        for index in range(self.__valid, len(self.__days)):
+            previous = index - 1
+            self.__cum_inflows.append(self.__inflows[index] + (self.__cum_inflows[previous] if index else 0.0))
+            self.__cum_outflows.append(self.__outflows[index] + (self.__cum_outflows[previous] if index else 0.0))
+            self.__cum_counts.append(self.__counts[index] + (self.__cum_counts[previous] if index else 0))
+        self.__valid = len(self.__days)
@@ -1,15 +1,30 @@
-from src.core.functions import get_fields
+from typing import Type
+
 from src.logics.converters.abstract_converter import AbstractConverter
 
 """Конвертер моделей и произвольных классов"""
 class ModelConverter(AbstractConverter):
 
+    # Класс -> публичные поля (вычисляются один раз для класса)
+    _fields: dict[type, tuple[str, ...]] = {}
+
+    @staticmethod
+    def fields(t: Type) -> tuple[str, ...]:
+        """
+        Публичные поля класса: свойства и атрибуты класса, которые не начинаются с '_' и не вызываются
+        (как get_fields для объекта, но без getattr для каждого атрибута каждого объекта).
+        """
+        fields = ModelConverter._fields.get(t)
+        if fields is None:
+            fields = ModelConverter._fields[t] = tuple(
+                key for key in dir(t) if not key.startswith("_") and not callable(getattr(t, key)))
+        return fields
+
     """Переопределённый метод convert"""
     def convert(self, obj) -> dict:
 
         result = dict()
-        fields = get_fields(obj)
-        for field in fields:
+        for field in ModelConverter.fields(type(obj)):
             value = getattr(obj, field)
             from src.logics.factory_converters import FactoryConverters
             result[field] = FactoryConverters.convert(value)
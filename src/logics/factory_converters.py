@@ -2,7 +2,7 @@
 from collections.abc import Iterable
 from datetime import datetime
 from types import NoneType
-from typing import Type
+from typing import Callable, Type
 
 from src.logics.converters.abstract_converter import AbstractConverter
 from src.logics.converters.basic_converter import BasicConverter
@@ -21,16 +21,28 @@ class FactoryConverters:
     (наследника AbstractConverter) на основе типа входного объекта.
     Используется для стандартизированного преобразования различных типов данных
     (модели, даты, списки, базовые типы) в словарь или другую форму для дальнейшей сериализации (например, в JSON).
+
+    Метод convert использует функции конвертации, скомпилированные один раз для каждого конкретного типа:
+    для класса модели список публичных полей вычисляется один раз (ModelConverter.fields) и по нему
+    генерируется функция, читающая поля напрямую; значения базовых типов переносятся без вызова конвертера.
     """
+    # Базовые типы, значения которых не преобразуются
+    _basic_types = (bool, int, float, str, NoneType)
+
     # Определяем словарь, который сопоставляет базовые типы с соответствующими конвертерами.
     _type_to_converter = {
-        (bool, int, float, str, NoneType): BasicConverter,
+        _basic_types: BasicConverter,
         datetime: DatetimeConverter,
         (AbstractModel, TurnoverBalanceItem): ModelConverter,
         dict: DictConverter,
         Iterable: IterableConverter,
     }
 
+    # Тип -> экземпляр конвертера и тип -> скомпилированная функция конвертации (для convert и convert_references)
+    _converters: dict[type, AbstractConverter] = {}
+    _serializers: dict[type, Callable] = {}
+    _reference_serializers: dict[type, Callable] = {}
+
     @staticmethod
     def get_converter(t: Type) -> AbstractConverter:
         """
@@ -38,11 +50,16 @@ class FactoryConverters:
 
         Метод итерирует по зарегистрированным типам и проверяет, является ли
         заданный тип `t` подклассом одного из зарегистрированных типов (или совпадает с ним).
+        Экземпляр конвертера создаётся один раз для типа.
 
         :param t: Тип объекта, для которого требуется конвертер.
         :return: Экземпляр соответствующего класса-конвертера (наследника AbstractConverter).
         :raises ArgumentException: Если подходящий конвертер для типа не найден.
         """
+        converter = FactoryConverters._converters.get(t)
+        if converter is not None:
+            return converter
+
         # Итерируем по ключам словаря (типам или кортежам типов)
         for types, converter_class in FactoryConverters._type_to_converter.items():
             # Превращаем types в кортеж, если это не кортеж (например, datetime)
@@ -51,19 +68,121 @@ class FactoryConverters:
 
             # Проверяем, является ли t подклассом любого из типов в кортеже 'types'.
             if issubclass(t, types):
-                return converter_class()
+                converter = FactoryConverters._converters[t] = converter_class()
+                return converter
 
         # Если конвертер не найден
         raise ArgumentException(f"Не удалось создать конвертер для типа:'{t.__name__}'")
 
+    @staticmethod
+    def serializer(t: Type) -> Callable:
+        """
+        Возвращает функцию конвертации объектов типа `t`, скомпилированную при первом обращении к типу.
+
+        :param t: Тип объекта.
+        :return: Функция (объект) -> результат конвертации, совпадающий с convert конвертера типа.
+        :raises ArgumentException: Если подходящий конвертер для типа не найден.
+        """
+        serializer = FactoryConverters._serializers.get(t)
+        if serializer is None:
+            serializer = FactoryConverters._serializers[t] = FactoryConverters.__compile(t)
+        return serializer
+
+    @staticmethod
+    def __compile(t: Type, references: bool = False) -> Callable:
+        """
+        Специализированная функция конвертации для типа по его конвертеру.
+        Для моделей, словарей и списков функция генерируется из исходного текста: для модели поля
+        читаются напрямую (без getattr по имени), значения базовых типов переносятся без вызова конвертера.
+
+        :param references: Функция для режима ссылок (convert_references): принимает (объект, refs, nested).
+        """
+        converter = FactoryConverters.get_converter(t)
+        if references:
+            convert = FactoryConverters.__convert_reference
+            # Аргументы функции и вызова для значений: поля моделей - вложенные значения, элементы - как контейнер
+            args, field_args, item_args = ", refs, nested", ", refs, True", ", refs, nested"
+        else:
+            convert = FactoryConverters.convert
+            args = field_args = item_args = ""
+
+        if isinstance(converter, ModelConverter):
+            names = ModelConverter.fields(t)
+            lines = [f"def convert_obj(obj{args}):"]
+            lines += [f"    v{number} = obj.{name}" for number, name in enumerate(names)]
+            items = ", ".join(f"{name!r}: v{number} if type(v{number}) in basic else convert(v{number}{field_args})"
+                              for number, name in enumerate(names))
+            lines.append(f"    return {{{items}}}")
+        elif isinstance(converter, DictConverter):
+            lines = [f"def convert_obj(obj{args}):",
+                     f"    return {{key: value if type(value) in basic else convert(value{item_args})"
+                     f" for key, value in obj.items()}}"]
+        elif isinstance(converter, IterableConverter):
+            lines = [f"def convert_obj(obj{args}):",
+                     f"    return [item if type(item) in basic else convert(item{item_args}) for item in obj]"]
+        elif references:
+            return lambda obj, refs, nested: converter.convert(obj)
+        else:
+            return converter.convert
+
+        namespace = {"basic": frozenset(FactoryConverters._basic_types), "convert": convert}
+        exec("\n".join(lines), namespace)
+        return namespace["convert_obj"]
+
+    @staticmethod
+    def convert_references(obj) -> dict:
+        """
+        Конвертация с таблицей ссылок. Модель, вложенная в поле другой модели (в том числе в списке),
+        заменяется ссылкой {"id": ...} (форма CachedId) и конвертируется один раз в таблицу refs,
+        где её вложенные модели тоже заменены ссылками. Модели вне полей моделей (сам объект,
+        элементы списков и словарей) выводятся полностью.
+
+        :param obj: Объект любого типа для конвертации.
+        :return: Словарь {"data": результат конвертации, "refs": {id: модель}}.
+        """
+        refs = {}
+        data = FactoryConverters.convert_referenced(obj, refs)
+        return {"data": data, "refs": refs}
+
+    @staticmethod
+    def convert_referenced(obj, refs: dict):
+        """
+        Конвертация в режиме ссылок с пополнением переданной таблицы refs (для конвертации по частям).
+
+        :param obj: Объект любого типа для конвертации.
+        :param refs: Таблица ссылок {id: модель}, общая для всех частей.
+        :return: Результат конвертации obj.
+        """
+        return FactoryConverters.__convert_reference(obj, refs, False)
+
+    @staticmethod
+    def __convert_reference(obj, refs: dict, nested: bool):
+        """Конвертация значения в режиме ссылок (nested - значение находится в поле модели)"""
+        if nested and isinstance(obj, AbstractModel):
+            key = obj.id
+            if key not in refs:
+                # Место в таблице занимается до конвертации, поэтому циклические ссылки не раскрываются повторно
+                refs[key] = None
+                refs[key] = FactoryConverters.__convert_reference(obj, refs, False)
+            return {"id": key}
+
+        serializer = FactoryConverters._reference_serializers.get(type(obj))
+        if serializer is None:
+            serializer = FactoryConverters._reference_serializers[type(obj)] = \
+                FactoryConverters.__compile(type(obj), True)
+        return serializer(obj, refs, nested)
+
     @staticmethod
     def convert(obj):
         """
         Основной метод конвертации.
 
-        Получает конвертер, соответствующий типу объекта `obj`, и вызывает его метод `convert()`.
+        Получает функцию конвертации, скомпилированную для типа объекта `obj` (serializer), и вызывает её.
 
         :param obj: Объект любого типа для конвертации.
         :return: Результат работы метода `convert` выбранного конвертера (обычно словарь).
         """
-        return FactoryConverters.get_converter(type(obj)).convert(obj)
\ No newline at end of file
+        serializer = FactoryConverters._serializers.get(type(obj))
+        if serializer is None:
+            serializer = FactoryConverters.serializer(type(obj))
+        return serializer(obj)
\ No newline at end of file
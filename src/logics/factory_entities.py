@@ -1,7 +1,9 @@
 from src.logics.responses.abstract_response import AbstractResponse
 from src.logics.responses.csv_response import CsvResponse
+from src.logics.responses.json_refs_response import JsonRefsResponse
 from src.logics.responses.json_response import JsonResponse
 from src.logics.responses.markdown_response import MarkdownResponse
+from src.logics.responses.ndjson_response import NdjsonResponse
 from src.logics.responses.response_format import ResponseFormat
 from src.models.validators.exceptions import OperationException
 
@@ -14,7 +16,9 @@ class FactoryEntities:
     _match = {
         ResponseFormat.CSV: CsvResponse,
         ResponseFormat.JSON: JsonResponse,
+        ResponseFormat.JSON_REFS: JsonRefsResponse,
         ResponseFormat.MARKDOWN: MarkdownResponse,
+        ResponseFormat.NDJSON: NdjsonResponse,
     }
 
     def create(self, r_format: ResponseFormat) -> type[AbstractResponse]:
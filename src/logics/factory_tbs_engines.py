@@ -0,0 +1,34 @@
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.tbs_engines.hash_tbs_engine import HashTbsEngine
+from src.logics.tbs_engines.parallel_tbs_engine import ParallelTbsEngine
+from src.logics.tbs_engines.prefix_index_tbs_engine import PrefixIndexTbsEngine
+from src.logics.tbs_engines.prototype_tbs_engine import PrototypeTbsEngine
+from src.logics.tbs_engines.tbs_engine_type import TbsEngineType
+from src.logics.tbs_engines.vectorized_tbs_engine import VectorizedTbsEngine
+from src.models.validators.exceptions import OperationException
+
+
+class FactoryTbsEngines:
+    """
+    Фабрика, предназначенная для получения класса движка расчёта оборотно-сальдовой ведомости.
+    Использует перечисление TbsEngineType для сопоставления с конкретными классами движков.
+    """
+    _match = {
+        TbsEngineType.PROTOTYPE: PrototypeTbsEngine,
+        TbsEngineType.HASH: HashTbsEngine,
+        TbsEngineType.VECTORIZED: VectorizedTbsEngine,
+        TbsEngineType.INDEX: PrefixIndexTbsEngine,
+        TbsEngineType.PARALLEL: ParallelTbsEngine,
+    }
+
+    def create(self, engine_type: TbsEngineType) -> type[AbstractTbsEngine]:
+        """
+        Возвращает класс (не экземпляр) движка расчёта ведомости.
+
+        :param engine_type: Требуемый движок из перечисления TbsEngineType.
+        :return: Класс, наследующий AbstractTbsEngine.
+        :raises OperationException: Если запрошенный движок не поддерживается (отсутствует в _match).
+        """
+        if engine_type not in self._match:
+            raise OperationException("Движок расчёта неверный")
+        return self._match[engine_type]
@@ -0,0 +1,75 @@
+import heapq
+
+from src.core.abstract_listener import AbstractListener
+from src.core.event_type import EventType
+from src.core.ngram_index import NgramIndex
+from src.repository import RepoKeys, Repository
+
+
+class NameSearch(AbstractListener):
+    """
+    Поиск по наименованиям продуктов, групп номенклатуры и рецептов (поиск при наборе текста).
+    Для каждого ключа репозитория хранится NgramIndex по полям наименования.
+
+    Полные совпадения, начала наименований и начала слов находятся без просмотра всех совпадений
+    (доли миллисекунды на 100 тыс. наименований). Подстроки внутри слов ищутся, только если таких
+    совпадений меньше limit, и ранжируются все кандидаты из пересечения триграмм запроса: для запроса,
+    который встречается только внутри слов многих наименований (например, "ука" в "мука" - около 20%
+    каталога), время поиска растёт с количеством кандидатов (около 25 мс на 100 тыс. против 60 мс просмотра).
+
+    Синхронизируется с репозиторием, если зарегистрирован в ObserveService:
+    EventType.ADD_MODEL / DELETE_MODEL для индексируемых ключей и EventType.CHANGE_NAME
+    (переиндексация модели после изменения наименования).
+    """
+
+    # Ключ репозитория -> индексируемые поля в порядке важности
+    _fields = {
+        RepoKeys.PRODUCTS: ["name", "full_name"],
+        RepoKeys.PRODUCT_GROUPS: ["name"],
+        RepoKeys.RECIPES: ["name"],
+    }
+
+    def __init__(self, repository: Repository = None):
+        """
+        :param repository: Репозиторий, модели которого индексируются при создании (None - пустой индекс).
+        """
+        self.__indexes = {key: NgramIndex(fields) for key, fields in self._fields.items()}
+        if repository is not None:
+            for key, index in self.__indexes.items():
+                index.extend(repository.data.get(key, {}).values())
+
+    @property
+    def keys(self) -> list[RepoKeys]:
+        return list(self.__indexes.keys())
+
+    def index(self, key: RepoKeys) -> NgramIndex | None:
+        """Индекс наименований по ключу репозитория или None"""
+        return self.__indexes.get(key)
+
+    def search(self, query: str, keys: list[RepoKeys] = None, limit: int = 20) -> list:
+        """
+        Модели, наименования которых содержат запрос, в порядке ранжирования по всем индексам.
+
+        :param query: Строка поиска.
+        :param keys: Ключи репозитория, по которым выполняется поиск (None - все индексируемые).
+        :param limit: Наибольшее количество моделей.
+        """
+        matches = []
+        for key in keys or self.keys:
+            matches.extend(self.__indexes[key].matches(query, limit))
+        return [model for _, model in heapq.nsmallest(limit, matches, key=lambda match: match[0])]
+
+    def handle(self, event: EventType, params):
+        """
+        Синхронизация с репозиторием и изменениями наименований.
+        """
+        if event == EventType.CHANGE_NAME:
+            model = params["model"]
+            for index in self.__indexes.values():
+                index.update(model)
+        elif event in (EventType.ADD_MODEL, EventType.DELETE_MODEL) and params["key"] in self.__indexes:
+            index = self.__indexes[params["key"]]
+            if event == EventType.ADD_MODEL:
+                index.add(params["model"])
+            else:
+                index.remove(params["model"])
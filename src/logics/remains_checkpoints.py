@@ -0,0 +1,224 @@
+from datetime import datetime
+
+from src.core.abstract_listener import AbstractListener
+from src.core.event_type import EventType
+from src.logics.unit_normalizer import UnitNormalizer
+from src.models.product_remain import ProductRemainModel
+from src.models.remain_checkpoint import RemainCheckpointModel
+from src.models.transaction import TransactionModel
+from src.models.validators.exceptions import OperationException
+from src.repository import RepoKeys, Repository
+
+
+class RemainsCheckpoints(AbstractListener):
+    """
+    Помесячные контрольные точки остатков по парам (склад, продукт).
+    Контрольная точка месяца - остаток на начало первого дня месяца: остатки на дату блокировки
+    плюс транзакции от даты блокировки до начала месяца (в корневых единицах измерения).
+
+    Остаток на произвольную дату берётся из ближайшей более ранней контрольной точки,
+    к которой применяются только транзакции месяца этой даты. Недостающие контрольные точки
+    создаются при запросе и сохраняются в репозитории (RepoKeys.REMAINS_CHECKPOINTS).
+
+    Синхронизируется с репозиторием, если зарегистрирован в ObserveService:
+    - добавление/удаление транзакции корректирует контрольные точки после её даты;
+    - изменение остатков на дату блокировки или единицы измерения сбрасывает контрольные точки.
+    """
+
+    def __init__(self, transactions: list[TransactionModel] = None,
+                 checkpoints: list[RemainCheckpointModel] = None, block_date: datetime = None):
+        """
+        :param transactions: Все транзакции.
+        :param checkpoints: Ранее сохранённые контрольные точки (рассчитаны для block_date).
+        :param block_date: Дата блокировки, для которой рассчитаны checkpoints.
+        """
+        self.__block_date = block_date
+        # Номер месяца -> {id транзакции: транзакция}
+        self.__months: dict[int, dict[str, TransactionModel]] = {}
+        # Номер месяца -> {(id склада, id продукта): контрольная точка}
+        self.__checkpoints: dict[int, dict[tuple[str, str], RemainCheckpointModel]] = {}
+
+        for trans in transactions or []:
+            self.__months.setdefault(self.month_of(trans.period), {})[trans.id] = trans
+        for checkpoint in checkpoints or []:
+            key = (checkpoint.storage.id, checkpoint.product.id)
+            self.__checkpoints.setdefault(self.month_of(checkpoint.period), {})[key] = checkpoint
+
+    @property
+    def checkpoints(self) -> dict[int, dict[tuple[str, str], RemainCheckpointModel]]:
+        return self.__checkpoints
+
+    @staticmethod
+    def month_of(value: datetime) -> int:
+        """Порядковый номер месяца даты"""
+        return value.year * 12 + value.month - 1
+
+    @staticmethod
+    def month_start(month: int) -> datetime:
+        """Первый день месяца по его порядковому номеру"""
+        return datetime(month // 12, month % 12 + 1, 1)
+
+    def remains(self, target: datetime, block_date: datetime = None,
+                product_remains: list[ProductRemainModel] = []) -> list[ProductRemainModel]:
+        """
+        Остатки по парам (склад, продукт) на дату target включительно.
+
+        :param target: Дата, на которую рассчитываются остатки.
+        :param block_date: Дата блокировки (более ранние транзакции учтены в product_remains).
+        :param product_remains: Остатки на дату блокировки.
+        :return: Список остатков в корневых единицах измерения.
+        """
+        if block_date != self.__block_date:
+            self.clear()
+            self.__block_date = block_date
+
+        if block_date is not None:
+            base_month = self.month_of(block_date)
+        elif self.__months:
+            base_month = min(self.__months)
+        else:
+            base_month = self.month_of(target)
+
+        month = self.month_of(target)
+        if block_date is not None and target < block_date:
+            state = self.__base_state(product_remains)
+        elif month <= base_month:
+            state = self.__base_state(product_remains)
+            self.__apply(state, self.__months.get(base_month, {}).values(), block_date, target)
+        else:
+            state = self.__copy_state(self.__checkpoint(month, base_month, product_remains))
+            self.__apply(state, self.__months.get(month, {}).values(), None, target)
+
+        return [ProductRemainModel.create(value, unit, product, storage)
+                for value, unit, product, storage in state.values()]
+
+    def clear(self):
+        """
+        Удалить все контрольные точки (в том числе из репозитория).
+        """
+        repo = Repository()
+        checkpoints = self.__checkpoints
+        self.__checkpoints = {}
+        for month_checkpoints in checkpoints.values():
+            for checkpoint in month_checkpoints.values():
+                if checkpoint.id in repo.data[RepoKeys.REMAINS_CHECKPOINTS]:
+                    repo.delete(RepoKeys.REMAINS_CHECKPOINTS, checkpoint.id)
+
+    def handle(self, event: EventType, params):
+        """
+        Синхронизация с репозиторием и единицами измерения.
+        """
+        if event == EventType.CHANGE_UNIT:
+            self.clear()
+        elif event in (EventType.ADD_MODEL, EventType.DELETE_MODEL):
+            if params["key"] == RepoKeys.PRODUCT_REMAINS:
+                self.clear()
+            elif params["key"] == RepoKeys.TRANSACTIONS:
+                trans: TransactionModel = params["model"]
+                bucket = self.__months.setdefault(self.month_of(trans.period), {})
+                if event == EventType.ADD_MODEL:
+                    bucket[trans.id] = trans
+                    self.__shift(trans, 1.0)
+                elif bucket.pop(trans.id, None) is not None:
+                    self.__shift(trans, -1.0)
+
+    def __shift(self, transaction: TransactionModel, sign: float):
+        """Скорректировать контрольные точки после даты транзакции на её значение"""
+        if self.__block_date is not None and transaction.period < self.__block_date:
+            return
+        factor, base_unit = UnitNormalizer().normalize(transaction.unit)
+        value = transaction.value * factor * sign
+        key = (transaction.storage.id, transaction.product.id)
+        repo = Repository()
+        for month, month_checkpoints in self.__checkpoints.items():
+            if self.month_start(month) <= transaction.period:
+                continue
+            checkpoint = month_checkpoints.get(key)
+            if checkpoint is None:
+                checkpoint = month_checkpoints[key] = RemainCheckpointModel.create(
+                    self.month_start(month), 0.0, base_unit, transaction.product, transaction.storage)
+            elif checkpoint.id in repo.data[RepoKeys.REMAINS_CHECKPOINTS]:
+                # Индексы репозитория по полю value перестраиваются удалением и повторным добавлением
+                repo.delete(RepoKeys.REMAINS_CHECKPOINTS, checkpoint.id)
+            checkpoint.value += value
+            repo.add(RepoKeys.REMAINS_CHECKPOINTS, checkpoint)
+
+    def __checkpoint(self, month: int, base_month: int,
+                     product_remains: list[ProductRemainModel]) -> dict[tuple[str, str], RemainCheckpointModel]:
+        """
+        Контрольная точка месяца month (month > base_month). Недостающие контрольные точки
+        от ближайшей более ранней до month рассчитываются и сохраняются.
+        """
+        if month in self.__checkpoints:
+            return self.__checkpoints[month]
+
+        known = [known_month for known_month in self.__checkpoints if base_month < known_month < month]
+        if known:
+            current = max(known)
+            state = self.__copy_state(self.__checkpoints[current])
+        else:
+            # Остатки на дату блокировки и транзакции месяца блокировки после неё
+            current = base_month + 1
+            state = self.__base_state(product_remains)
+            self.__apply(state, self.__months.get(base_month, {}).values(), self.__block_date, None)
+            self.__save(current, state)
+
+        while current < month:
+            self.__apply(state, self.__months.get(current, {}).values(), None, None)
+            current += 1
+            self.__save(current, state)
+
+        return self.__checkpoints[month]
+
+    def __save(self, month: int, state: dict):
+        """Сохранить состояние как контрольную точку месяца"""
+        repo = Repository()
+        period = self.month_start(month)
+        month_checkpoints = self.__checkpoints[month] = {}
+        for key, (value, unit, product, storage) in state.items():
+            checkpoint = month_checkpoints[key] = RemainCheckpointModel.create(period, value, unit, product, storage)
+            repo.add(RepoKeys.REMAINS_CHECKPOINTS, checkpoint)
+
+    @staticmethod
+    def __base_state(product_remains: list[ProductRemainModel]) -> dict[tuple[str, str], list]:
+        """Состояние из остатков на дату блокировки (остатки без склада не относятся ни к одной паре)"""
+        state = {}
+        for remain in product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            if key in state:
+                state[key][0] += remain.value
+            else:
+                state[key] = [remain.value, remain.unit, remain.product, remain.storage]
+        return state
+
+    @staticmethod
+    def __copy_state(checkpoints: dict[tuple[str, str], RemainCheckpointModel]) -> dict[tuple[str, str], list]:
+        """Состояние из контрольных точек месяца"""
+        return {key: [checkpoint.value, checkpoint.unit, checkpoint.product, checkpoint.storage]
+                for key, checkpoint in checkpoints.items()}
+
+    @staticmethod
+    def __apply(state: dict, transactions, lower: datetime | None, upper: datetime | None):
+        """
+        Добавить к состоянию транзакции с датой в интервале [lower, upper].
+        Как и при расчёте ведомости, остатки пары учитываются в корневой единице её транзакций.
+        """
+        normalizer = UnitNormalizer()
+        product_to_base_unit = dict()
+        for trans in transactions:
+            if (lower is not None and trans.period < lower) or (upper is not None and trans.period > upper):
+                continue
+            factor, base_unit = normalizer.normalize(trans.unit)
+            pid = trans.product.id
+            if product_to_base_unit.setdefault(pid, base_unit) != base_unit:
+                raise OperationException(f"Разные единицы измерения {base_unit} и {product_to_base_unit[pid]} для {trans.product}")
+
+            key = (trans.storage.id, pid)
+            item = state.get(key)
+            if item is None:
+                state[key] = [trans.value * factor, base_unit, trans.product, trans.storage]
+            else:
+                item[0] += trans.value * factor
+                item[1] = base_unit
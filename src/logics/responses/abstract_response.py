@@ -1,4 +1,5 @@
 from abc import ABC
+from typing import Iterator
 
 from src.models.validators.functions import validate_val
 
@@ -10,6 +11,11 @@ class AbstractResponse(ABC):
     Наследуется от ABC для обеспечения абстрактности.
     """
 
+    # Тип содержимого ответа (None - по умолчанию Flask)
+    mimetype: str = None
+    # Ответ всегда передаётся потоком (stream), независимо от количества элементов
+    streaming: bool = False
+
     @classmethod
     def build(cls, data: list) -> str:
         """
@@ -24,4 +30,29 @@ class AbstractResponse(ABC):
 
         return ""
 
+    @classmethod
+    def stream(cls, data) -> Iterator[str]:
+        """
+        Построение тела HTTP-ответа по частям (для потоковой передачи ответа с большим количеством элементов).
+        По умолчанию тело строится целиком методом build и передаётся одной частью.
+
+        Части передаются после возврата из обработчика запроса, поэтому наследники до возврата итератора
+        снимают копию списков и словарей данных (_snapshot): изменения репозитория во время передачи
+        ответ не затрагивают.
 
+        :param data: Данные, которые необходимо включить в ответ.
+        :return: Итератор строк, которые вместе составляют результат build.
+        """
+        return iter([cls.build(data)])
+
+    @staticmethod
+    def _snapshot(value):
+        """
+        Копия словарей (с вложенными словарями и списками) и списков данных для потоковой передачи.
+        Модели не копируются, списки копируются без просмотра элементов.
+        """
+        if isinstance(value, dict):
+            return {key: AbstractResponse._snapshot(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return list(value)
+        return value
@@ -1,31 +1,133 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Callable, Iterator, get_type_hints
 
-from src.core.functions import get_fields
+from src.logics.converters.model_converter import ModelConverter
+from src.logics.factory_converters import FactoryConverters
 from src.logics.responses.abstract_response import AbstractResponse
+from src.models.abstract_model import AbstractModel
+
+# Типы значений, которые модуль csv выводит без преобразования (None - пустая ячейка)
+_PLAIN = frozenset((str, int, float, bool, type(None)))
 
 
 class CsvResponse(AbstractResponse):
-    """Класс для формирования ответа в формате CSV"""
+    """
+    Класс для формирования ответа в формате CSV (модуль csv: разделитель ';', кавычки при необходимости).
+
+    Столбцы вычисляются один раз для класса первого элемента: поля вложенных моделей
+    (по аннотации возвращаемого типа свойства) разворачиваются в столбцы через точку
+    (product.name, unit.name) до глубины _max_depth, более глубокие модели выводятся столбцом id
+    (product.unit.base_unit.id). Даты выводятся как в JSON, списки - JSON строкой.
+    """
+
+    mimetype = "text/csv"
+
+    _delimiter = ";"
+    # Количество уровней разворачиваемых вложенных моделей
+    _max_depth = 2
+    # Количество строк в одной части при потоковой передаче
+    _chunk_items = 1000
+    # Класс -> (имена столбцов, функция получения значений ячеек строки)
+    _plans: dict[type, tuple[list[str], Callable]] = {}
 
     #метод формирования запроса
     @classmethod
     def build(cls, data: list):
         super().build(data)
+        return "".join(cls.__stream_rows(data, cls._chunk_items))
+
+    @classmethod
+    def stream(cls, data: list, chunk_items: int = None) -> Iterator[str]:
+        """
+        Сформировать ответ по частям: заголовок и строки пачками по chunk_items (csv.writer пишет пачку в буфер).
+        """
+        return cls.__stream_rows(cls._snapshot(data), chunk_items or cls._chunk_items)
+
+    @classmethod
+    def __stream_rows(cls, data: list, chunk_items: int) -> Iterator[str]:
+        """Части ответа по списку моделей"""
         if not data:
-            return ""
-
-        # Шапка
-        result = []
-        fields = get_fields(data[0])
-        result.append(list(fields.keys()))
-
-        # Данные
-        for item in data:
-            temp = []
-            for field in fields:
-                temp.append(str(getattr(item, field)))
-            result.append(temp)
-
-        text = ""
-        for row in result:
-            text+=";".join(row)+'\n'
-        return text
+            return
+        columns, row = cls.plan(type(data[0]))
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=cls._delimiter, lineterminator="\n")
+        writer.writerow(columns)
+        for start in range(0, len(data), chunk_items):
+            writer.writerows([row(item) for item in data[start:start + chunk_items]])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    @classmethod
+    def plan(cls, t: type) -> tuple[list[str], Callable]:
+        """
+        Имена столбцов и функция получения значений ячеек строки для класса.
+        Функция генерируется из исходного текста (как в FactoryConverters): поля вложенных моделей читаются
+        напрямую один раз на строку, значения базовых типов переносятся без преобразования.
+        """
+        result = cls._plans.get(t)
+        if result is None:
+            if issubclass(t, AbstractModel):
+                columns, lines, values = [], ["def row(item):"], []
+                cls.__compile(t, "item", "", 0, columns, lines, values)
+                cells = "".join(f"{value} if type({value}) in plain else cell({value}), " for value in values)
+                lines.append(f"    return ({cells})")
+                namespace = {"plain": _PLAIN, "cell": cls._cell}
+                exec("\n".join(lines), namespace)
+                result = (columns, namespace["row"])
+            else:
+                # Элементы, не являющиеся моделями, выводятся одним столбцом
+                result = (["value"], lambda item: (cls._cell(item),))
+            cls._plans[t] = result
+        return result
+
+    @classmethod
+    def __compile(cls, t: type, owner: str, prefix: str, depth: int,
+                  columns: list[str], lines: list[str], values: list[str]):
+        """
+        Добавить столбцы полей класса t и строки чтения их значений из переменной owner
+        (для вложенной модели, которая может быть не задана, значения - None).
+        """
+        nullable = owner != "item"
+        for field in ModelConverter.fields(t):
+            model_type = cls.__model_type(t, field)
+            variable = f"v{len(lines)}"
+            read = f"{owner}.{field} if {owner} is not None else None" if nullable else f"{owner}.{field}"
+            lines.append(f"    {variable} = {read}")
+            if model_type is None:
+                columns.append(prefix + field)
+                values.append(variable)
+            elif depth >= cls._max_depth:
+                columns.append(f"{prefix}{field}.id")
+                values.append(variable)
+            else:
+                cls.__compile(model_type, variable, f"{prefix}{field}.", depth + 1, columns, lines, values)
+
+    @staticmethod
+    def __model_type(t: type, field: str) -> type | None:
+        """Класс модели, возвращаемый свойством field (по аннотации), или None"""
+        attribute = getattr(t, field, None)
+        if not isinstance(attribute, property):
+            return None
+        try:
+            result = get_type_hints(attribute.fget).get("return")
+        except Exception:
+            return None
+        if isinstance(result, type) and issubclass(result, AbstractModel):
+            return result
+        return None
+
+    @staticmethod
+    def _cell(value):
+        """Значение ячейки: базовые типы без изменений (None - пустая ячейка), модель - id"""
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        if isinstance(value, AbstractModel):
+            return value.id
+        if isinstance(value, datetime):
+            return FactoryConverters.convert(value)
+        return json.dumps(FactoryConverters.convert(value), ensure_ascii=False)
@@ -0,0 +1,34 @@
+import json
+from typing import Iterator
+
+from src.logics.factory_converters import FactoryConverters
+from src.logics.responses.json_response import JsonResponse
+
+
+class JsonRefsResponse(JsonResponse):
+    """
+    Класс для формирования ответа в формате JSON с таблицей ссылок:
+    {"data": данные, "refs": {id: модель}}. Модели, вложенные в модели, выводятся один раз в refs,
+    а в данных и других моделях заменяются ссылкой {"id": ...}.
+    """
+
+    #метод формирования запроса
+    @classmethod
+    def build(cls, data):
+        return json.dumps(FactoryConverters.convert_references(data), ensure_ascii=False)
+
+    @classmethod
+    def stream(cls, data, chunk_items: int = None) -> Iterator[str]:
+        """
+        Сформировать ответ по частям: данные выводятся поэлементно, таблица ссылок - после данных.
+        """
+        return cls.__stream_refs(cls._snapshot(data), chunk_items or cls._chunk_items)
+
+    @classmethod
+    def __stream_refs(cls, data, chunk_items: int) -> Iterator[str]:
+        """Части ответа по копии данных"""
+        refs = {}
+        yield '{"data": '
+        yield from cls._stream_value(data, lambda item: FactoryConverters.convert_referenced(item, refs),
+                                     chunk_items)
+        yield f', "refs": {json.dumps(refs, ensure_ascii=False)}}}'
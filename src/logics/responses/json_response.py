@@ -1,4 +1,5 @@
 import json
+from typing import Callable, Iterator
 
 from src.logics.factory_converters import FactoryConverters
 from src.logics.responses.abstract_response import AbstractResponse
@@ -7,8 +8,38 @@ from src.logics.responses.abstract_response import AbstractResponse
 class JsonResponse(AbstractResponse):
     """Класс для формирования ответа в формате JSON"""
 
+    # Количество элементов списка, которые конвертируются и сериализуются вместе при потоковой передаче
+    _chunk_items = 1000
+
     #метод формирования запроса
     @classmethod
     def build(cls, data):
         return json.dumps(FactoryConverters.convert(data), ensure_ascii=False)
 
+    @classmethod
+    def stream(cls, data, chunk_items: int = None) -> Iterator[str]:
+        """
+        Сформировать ответ по частям без построения всего результата в памяти: списки и словари
+        со строковыми ключами (например, repository.data) выводятся поэлементно, элементы списков
+        конвертируются и сериализуются пачками по chunk_items. Склеенные части совпадают с build.
+        """
+        return cls._stream_value(cls._snapshot(data), FactoryConverters.convert, chunk_items or cls._chunk_items)
+
+    @classmethod
+    def _stream_value(cls, value, convert: Callable, chunk_items: int) -> Iterator[str]:
+        """Части JSON значения; convert - функция конвертации элементов"""
+        if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+            yield "{"
+            for number, (key, item) in enumerate(value.items()):
+                yield f"{', ' if number else ''}{json.dumps(key, ensure_ascii=False)}: "
+                yield from cls._stream_value(item, convert, chunk_items)
+            yield "}"
+        elif isinstance(value, list):
+            yield "["
+            for start in range(0, len(value), chunk_items):
+                # Пачка сериализуется одним вызовом json.dumps, квадратные скобки отбрасываются
+                chunk = json.dumps([convert(item) for item in value[start:start + chunk_items]], ensure_ascii=False)
+                yield f"{', ' if start else ''}{chunk[1:-1]}"
+            yield "]"
+        else:
+            yield json.dumps(convert(value), ensure_ascii=False)
@@ -0,0 +1,64 @@
+import json
+from typing import Iterator
+
+from src.logics.factory_converters import FactoryConverters
+from src.logics.responses.abstract_response import AbstractResponse
+from src.models.abstract_model import AbstractModel
+
+
+class NdjsonResponse(AbstractResponse):
+    """
+    Класс для формирования ответа в формате NDJSON: по одному JSON объекту в строке.
+    Элементы списка выводятся отдельными строками; словарь, все значения которого - модели, списки или словари,
+    выводится строками моделей и элементов списков и словарей (например, остатки {id: модель}
+    или repository.data: {ключ: {id: модель}}); остальные данные - одной строкой.
+    """
+
+    mimetype = "application/x-ndjson"
+    streaming = True
+
+    # Количество строк в одной части при потоковой передаче
+    _chunk_items = 1000
+    # json.dumps с параметрами создаёт кодировщик при каждом вызове, для строк он создаётся один раз
+    _encoder = json.JSONEncoder(ensure_ascii=False)
+
+    #метод формирования запроса
+    @classmethod
+    def build(cls, data):
+        return "".join(cls.__stream_lines(data, cls._chunk_items))
+
+    @classmethod
+    def stream(cls, data, chunk_items: int = None) -> Iterator[str]:
+        """
+        Сформировать ответ по частям из chunk_items строк: каждый элемент конвертируется и сериализуется
+        при передаче, весь документ в памяти не строится.
+        """
+        return cls.__stream_lines(cls._snapshot(data), chunk_items or cls._chunk_items)
+
+    @classmethod
+    def __stream_lines(cls, data, chunk_items: int) -> Iterator[str]:
+        """Части ответа: строки пачками по chunk_items"""
+        encode = cls._encoder.encode
+        lines = []
+        for item in cls._records(data):
+            lines.append(encode(FactoryConverters.convert(item)))
+            if len(lines) == chunk_items:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    @classmethod
+    def _records(cls, value) -> Iterator:
+        """Объекты строк ответа"""
+        if isinstance(value, list):
+            yield from value
+        elif isinstance(value, dict) and value \
+                and all(isinstance(item, (AbstractModel, list, dict)) for item in value.values()):
+            for item in value.values():
+                if isinstance(item, AbstractModel):
+                    yield item
+                else:
+                    yield from item if isinstance(item, list) else item.values()
+        else:
+            yield value
@@ -10,4 +10,8 @@ class ResponseFormat(StrEnum):
     CSV = 'csv'
     EXCEL = 'excel'
     JSON = 'json'
+    # JSON с таблицей ссылок на вложенные модели
+    JSON_REFS = 'json_refs'
     MARKDOWN = 'markdown'
+    # JSON объект в каждой строке (newline-delimited JSON)
+    NDJSON = 'ndjson'
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from datetime import datetime
+
+from src.core.abstract_listener import AbstractListener
+from src.core.event_type import EventType
+from src.core.prototype import Prototype
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.models.abstract_model import AbstractModel
+from src.models.transaction import TransactionModel
+from src.repository import RepoKeys
+
+
+class TbsCache(AbstractListener):
+    """
+    LRU кеш результатов расчёта оборотно-сальдовой ведомости.
+    Ключ - каноническая форма FilterTbsDto (фильтры, сортировки и группировка, без дат из строк запроса)
+    вместе с датами периода и датой блокировки.
+
+    Сбрасывается по событиям ObserveService:
+    - добавление/удаление транзакции удаляет только записи, в расчёт которых попадает транзакция
+      (по дате и фильтрам транзакций записи);
+    - изменение остатков, продуктов или единиц измерения очищает кеш целиком.
+    Смена даты блокировки меняет ключ, а записи со старой датой вытесняются по LRU.
+    """
+
+    # Ключи репозитория, изменение которых влияет на все записи
+    _global_keys = {RepoKeys.PRODUCT_REMAINS, RepoKeys.PRODUCTS, RepoKeys.MEASUREMENT_UNITS}
+
+    def __init__(self, max_size: int = 128):
+        """
+        :param max_size: Максимальное количество записей в кеше.
+        """
+        self.__max_size = max_size
+        # Ключ -> (dto, дата окончания, дата блокировки, результат)
+        self.__entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def size(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def stats(self) -> dict:
+        """Счётчики кеша"""
+        return {"size": self.size, "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def make_key(dto: FilterTbsDto, start: datetime, end: datetime, block_date: datetime = None,
+                 include_zero_values: bool = True) -> tuple:
+        """
+        Каноническая форма параметров расчёта ведомости.
+        """
+        def filters_key(filters: list[FilterDto]) -> tuple:
+            return tuple((item.field_name, item.op, TbsCache.__canonical(item.value)) for item in filters)
+
+        def expression_key(expression: FilterExpressionDto | None) -> tuple | None:
+            if expression is None:
+                return None
+            return (expression.op, filters_key(expression.filters),
+                    tuple(expression_key(item) for item in expression.expressions))
+
+        sorts = dto.result_sorts
+        sorts_key = (tuple(sorts.field_names), sorts.descending,
+                     tuple((item.field_name, item.descending, item.nulls_first) for item in sorts.fields)) \
+            if sorts is not None else None
+        return (filters_key(dto.transaction_filters), filters_key(dto.result_filters),
+                expression_key(dto.transaction_where), expression_key(dto.result_where), sorts_key,
+                tuple(dto.group_by), start, end, block_date, include_zero_values)
+
+    def get(self, key: tuple) -> list | None:
+        """
+        Получить результат по ключу (копию списка) или None, если его нет в кеше.
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        self.__entries.move_to_end(key)
+        return list(entry[3])
+
+    def put(self, key: tuple, dto: FilterTbsDto, end: datetime, block_date: datetime,
+            result: list):
+        """
+        Сохранить результат расчёта, вытеснив давно не использованные записи.
+        """
+        self.__entries[key] = (dto, end, block_date, list(result))
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        """Очистить кеш (счётчики сохраняются)"""
+        self.__entries.clear()
+
+    def invalidate(self, transaction: TransactionModel):
+        """
+        Удалить записи, в расчёт которых попадает транзакция.
+        """
+        for key in list(self.__entries.keys()):
+            dto, end, block_date, _ = self.__entries[key]
+            if transaction.period > end or (block_date and transaction.period < block_date):
+                continue
+            if Prototype([transaction]).filter_mul(dto.transaction_filters, dto.transaction_where).data:
+                del self.__entries[key]
+
+    def handle(self, event: EventType, params):
+        """
+        Сброс записей по изменениям репозитория и единиц измерения.
+        """
+        if event == EventType.CHANGE_UNIT:
+            self.clear()
+        elif event in (EventType.ADD_MODEL, EventType.DELETE_MODEL):
+            if params["key"] == RepoKeys.TRANSACTIONS:
+                self.invalidate(params["model"])
+            elif params["key"] in self._global_keys:
+                self.clear()
+
+    @staticmethod
+    def __canonical(value):
+        """Хешируемое представление значения фильтра"""
+        if isinstance(value, AbstractModel):
+            return type(value).__name__, value.id
+        if isinstance(value, (set, frozenset)):
+            return frozenset(TbsCache.__canonical(item) for item in value)
+        if isinstance(value, (list, tuple)):
+            return tuple(TbsCache.__canonical(item) for item in value)
+        if isinstance(value, dict):
+            return tuple(sorted((key, TbsCache.__canonical(item)) for key, item in value.items()))
+        return value
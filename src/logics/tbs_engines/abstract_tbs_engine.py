@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from src.core.prototype import Prototype
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.models.product_remain import ProductRemainModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.transaction import TransactionModel
+
+
+class AbstractTbsEngine(ABC):
+    """
+    Абстрактный базовый класс для алгоритмов (движков) расчёта оборотно-сальдовой ведомости.
+    Движок формирует элементы ведомости по парам (склад, продукт), по которым были движения.
+    Продукты без движений, фильтрация и сортировка результата выполняются в TurnoverBalanceSheet.
+    """
+
+    @abstractmethod
+    def calculate(self, all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto,
+                  start: datetime, end: datetime, block_date: datetime = None,
+                  product_remains: list[ProductRemainModel] = []) -> list[TurnoverBalanceItem]:
+        """
+        Рассчитать элементы ведомости по парам (склад, продукт).
+
+        :param all_transactions: Список всех транзакций.
+        :param all_products: Словарь всех продуктов {id: ProductModel}.
+        :param dto: Параметры фильтрации транзакций.
+        :param start: Дата начала периода.
+        :param end: Дата окончания периода.
+        :param block_date: Дата блокировки (транзакции до неё учтены в product_remains).
+        :param product_remains: Остатки на дату блокировки.
+        :return: Список элементов TurnoverBalanceItem.
+        """
+        pass
+
+    @staticmethod
+    def _select(all_transactions: list[TransactionModel], dto: FilterTbsDto, end: datetime,
+                block_date: datetime = None) -> list[TransactionModel]:
+        """
+        Отобрать транзакции, участвующие в расчёте: до даты окончания включительно,
+        прошедшие фильтры из dto и не раньше даты блокировки.
+        """
+        # Фильтры по дате и фильтры из dto применяются вместе, чтобы Prototype мог выбрать отбор по индексу
+        filters = [FilterDto(field_name="period", value=end, op="<="), *dto.transaction_filters]
+        if block_date:
+            filters.append(FilterDto(field_name="period", value=block_date, op=">="))
+
+        return Prototype(all_transactions).filter_mul(filters, dto.transaction_where).data.copy()
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.unit_normalizer import UnitNormalizer
+from src.models.product_remain import ProductRemainModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.transaction import TransactionModel
+from src.models.validators.exceptions import OperationException
+
+
+class HashTbsEngine(AbstractTbsEngine):
+    """
+    Алгоритм расчёта ведомости хеш-агрегацией.
+    Транзакции и остатки раскладываются по накопителям с ключом (id склада, id продукта)
+    за один проход, поэтому сложность O(транзакции + остатки + склады × продукты).
+    Результат совпадает с PrototypeTbsEngine.
+    """
+
+    def calculate(self, all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto,
+                  start: datetime, end: datetime, block_date: datetime = None,
+                  product_remains: list[ProductRemainModel] = []) -> list[TurnoverBalanceItem]:
+        data = self._select(all_transactions, dto, end, block_date)
+        if not data:
+            return []
+
+        # Склады и продукты в порядке первого появления
+        id_to_storage = dict()
+        product_to_base_unit = dict()
+        # (id склада, id продукта) -> [начальное сальдо, поступления, расходы]
+        totals: dict[tuple, list[float]] = dict()
+
+        normalizer = UnitNormalizer()
+        for trans in data:
+            # Пересчёт в базовую единицу без изменения модели транзакции
+            factor, base_unit = normalizer.normalize(trans.unit)
+            value = trans.value * factor
+
+            storage_id = trans.storage.id
+            id_to_storage[storage_id] = trans.storage
+
+            pid = trans.product.id
+            if pid not in product_to_base_unit:
+                product_to_base_unit[pid] = base_unit
+            if base_unit != product_to_base_unit[pid]:
+                raise OperationException(f"Разные единицы измерения {base_unit} и {product_to_base_unit[pid]} для {trans.product}")
+
+            key = (storage_id, pid)
+            accumulator = totals.get(key)
+            if accumulator is None:
+                accumulator = totals[key] = [0.0, 0.0, 0.0]
+
+            if trans.period < start:
+                accumulator[0] += value
+            elif value > 0:
+                accumulator[1] += value
+            elif value < 0:
+                accumulator[2] += value
+
+        # Остатки на дату блокировки (остатки без склада не относятся ни к одной паре)
+        remains_totals: dict[tuple, float] = dict()
+        for remain in product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            remains_totals[key] = remains_totals.get(key, 0.0) + remain.value
+
+        result = []
+        empty = (0.0, 0.0, 0.0)
+        for storage_id, storage in id_to_storage.items():
+            for product_id, base_unit in product_to_base_unit.items():
+                key = (storage_id, product_id)
+                start_balance, inflows, outflows = totals.get(key, empty)
+                item = TurnoverBalanceItem.create(storage, all_products[product_id], base_unit)
+                # Начальное сальдо
+                item.start_balance = start_balance + remains_totals.get(key, 0.0)
+                # Поступления
+                item.inflows = inflows
+                # Расходы
+                item.outflows = outflows
+                result.append(item)
+
+        return result
@@ -0,0 +1,226 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from src.core.prototype import Prototype
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.transaction_columns import TransactionColumns
+from src.logics.unit_normalizer import UnitNormalizer
+from src.models.product_remain import ProductRemainModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.transaction import TransactionModel
+from src.models.validators.exceptions import OperationException
+
+
+def _aggregate_partition(partition: tuple) -> dict[int, list]:
+    """
+    Агрегировать строки одного склада (выполняется в процессе-исполнителе).
+
+    :param partition: Кортеж (коды продуктов, коды единиц, значения, даты, коэффициенты единиц,
+                      коды корневых единиц, начало периода, конец периода, дата блокировки).
+                      Столбцы - списки или массивы NumPy (даты и границы периода - числа TransactionColumns).
+    :return: Словарь {код продукта: [начальное сальдо, поступления, расходы, код корневой единицы]}.
+    """
+    products, units, values, periods, factors, roots, start, end, block_date = partition
+    if isinstance(products, np.ndarray):
+        products, units, values, periods = products.tolist(), units.tolist(), values.tolist(), periods.tolist()
+    totals: dict[int, list] = {}
+    for product, unit, value, period in zip(products, units, values, periods):
+        if period > end or (block_date is not None and period < block_date):
+            continue
+        accumulator = totals.get(product)
+        if accumulator is None:
+            accumulator = totals[product] = [0.0, 0.0, 0.0, roots[unit]]
+        elif accumulator[3] != roots[unit]:
+            # Разные корневые единицы отмечаются кодом -1, ошибку формирует основной процесс
+            accumulator[3] = -1
+
+        value *= factors[unit]
+        if period < start:
+            accumulator[0] += value
+        elif value > 0:
+            accumulator[1] += value
+        elif value < 0:
+            accumulator[2] += value
+    return totals
+
+
+class ParallelTbsEngine(AbstractTbsEngine):
+    """
+    Алгоритм расчёта ведомости в нескольких процессах.
+    Транзакции разбиваются по складам в компактные столбцы (коды продуктов и единиц, значения, даты),
+    склады агрегируются в ProcessPoolExecutor, частичные итоги объединяются в основном процессе.
+
+    С колоночным хранилищем TransactionColumns отбор строк (маски) и разбиение по складам
+    (устойчивая сортировка кодов складов) выполняются в NumPy, исполнителям передаются срезы массивов,
+    поэтому основной процесс не просматривает транзакции в цикле Python. Без хранилища транзакции
+    разбиваются одним проходом по моделям, отбор по датам выполняется в исполнителях.
+
+    Небольшие наборы (меньше min_parallel_rows строк) и расчёт с одним исполнителем
+    выполняются в текущем процессе без пула.
+    Результат совпадает с HashTbsEngine.
+    """
+
+    # Минимальное количество транзакций, при котором используется пул процессов
+    min_parallel_rows: int = 50_000
+
+    def __init__(self, workers: int = None, columns: TransactionColumns = None):
+        """
+        :param workers: Количество процессов-исполнителей (по умолчанию - количество ядер).
+        :param columns: Синхронизированное с репозиторием хранилище. Если задано, список
+                        all_transactions при расчёте не используется.
+        """
+        self.__workers = workers or os.cpu_count() or 1
+        self.__columns = columns
+        self.__executor: ProcessPoolExecutor = None
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    def close(self):
+        """
+        Завершить процессы-исполнители.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def calculate(self, all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto,
+                  start: datetime, end: datetime, block_date: datetime = None,
+                  product_remains: list[ProductRemainModel] = []) -> list[TurnoverBalanceItem]:
+        if self.__columns is not None:
+            rows_count, id_to_storage, partitions, products, root_units, factors, roots = \
+                self.__partition_columns(self.__columns, dto, end, block_date)
+            bounds = tuple(TransactionColumns.to_timestamp(value) if value else None
+                           for value in (start, end, block_date))
+        else:
+            rows_count, id_to_storage, partitions, products, root_units, factors, roots = \
+                self.__partition_models(all_transactions, dto)
+            bounds = (start, end, block_date)
+
+        tasks = [(*columns, factors, roots, *bounds) for columns in partitions]
+        if self.__workers > 1 and rows_count >= self.min_parallel_rows and len(tasks) > 1:
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor(max_workers=self.__workers)
+            partials = list(self.__executor.map(_aggregate_partition, tasks))
+        else:
+            partials = [_aggregate_partition(task) for task in tasks]
+
+        # Корневые единицы продуктов по всем складам
+        product_to_root: dict[int, int] = {}
+        for partial in partials:
+            for product_code, accumulator in partial.items():
+                root = product_to_root.setdefault(product_code, accumulator[3])
+                if accumulator[3] == -1 or root != accumulator[3]:
+                    raise OperationException(f"Разные единицы измерения для {products[product_code]}")
+
+        # Остатки на дату блокировки (остатки без склада не относятся ни к одной паре)
+        remains_totals: dict[tuple, float] = dict()
+        for remain in product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            remains_totals[key] = remains_totals.get(key, 0.0) + remain.value
+
+        result = []
+        empty = (0.0, 0.0, 0.0)
+        for (storage_id, storage), partial in zip(id_to_storage.items(), partials):
+            if not partial:
+                continue
+            for product_code, root in product_to_root.items():
+                product = all_products[products[product_code].id]
+                start_balance, inflows, outflows = partial.get(product_code, empty)[:3]
+                item = TurnoverBalanceItem.create(storage, product, root_units[root])
+                # Начальное сальдо
+                item.start_balance = start_balance + remains_totals.get((storage_id, product.id), 0.0)
+                # Поступления
+                item.inflows = inflows
+                # Расходы
+                item.outflows = outflows
+                result.append(item)
+
+        return result
+
+    @staticmethod
+    def __partition_models(all_transactions: list[TransactionModel], dto: FilterTbsDto) -> tuple:
+        """
+        Разбиение транзакций по складам одним проходом по моделям.
+
+        :return: Кортеж (количество строк, {id склада: склад}, столбцы складов, продукты по кодам,
+                 корневые единицы по кодам, коэффициенты единиц, коды корневых единиц).
+        """
+        data = Prototype(all_transactions).filter_mul(dto.transaction_filters, dto.transaction_where).data \
+            if dto.transaction_filters or dto.transaction_where else all_transactions
+
+        # Справочники кодов продуктов и единиц измерения
+        product_codes: dict[str, int] = {}
+        products: list = []
+        unit_codes: dict[str, int] = {}
+        factors: list[float] = []
+        roots: list[int] = []
+        root_units: list = []
+        root_codes: dict[str, int] = {}
+        normalizer = UnitNormalizer()
+
+        # Склад -> (коды продуктов, коды единиц, значения, даты)
+        id_to_storage = dict()
+        partitions: dict[str, tuple[list, list, list, list]] = {}
+        for trans in data:
+            storage_id = trans.storage.id
+            partition = partitions.get(storage_id)
+            if partition is None:
+                partition = partitions[storage_id] = ([], [], [], [])
+                id_to_storage[storage_id] = trans.storage
+
+            product = trans.product
+            product_code = product_codes.get(product.id)
+            if product_code is None:
+                product_code = product_codes[product.id] = len(products)
+                products.append(product)
+
+            unit = trans.unit
+            unit_code = unit_codes.get(unit.id)
+            if unit_code is None:
+                unit_code = unit_codes[unit.id] = len(factors)
+                factor, base_unit = normalizer.normalize(unit)
+                if base_unit.id not in root_codes:
+                    root_codes[base_unit.id] = len(root_units)
+                    root_units.append(base_unit)
+                factors.append(factor)
+                roots.append(root_codes[base_unit.id])
+
+            partition[0].append(product_code)
+            partition[1].append(unit_code)
+            partition[2].append(trans.value)
+            partition[3].append(trans.period)
+
+        return len(data), id_to_storage, list(partitions.values()), products, root_units, factors, roots
+
+    @staticmethod
+    def __partition_columns(columns: TransactionColumns, dto: FilterTbsDto, end: datetime,
+                            block_date: datetime = None) -> tuple:
+        """
+        Разбиение строк колоночного хранилища по складам: отбор масками, устойчивая сортировка кодов складов
+        и срезы столбцов по границам складов (коды продуктов и единиц - коды хранилища).
+
+        :return: Кортеж как у __partition_models.
+        """
+        rows = columns.select(dto.transaction_filters, dto.transaction_where, end, block_date)
+        storage_codes = columns.storage[rows]
+        order = np.argsort(storage_codes, kind="stable")
+        rows, storage_codes = rows[order], storage_codes[order]
+        codes, firsts = np.unique(storage_codes, return_index=True)
+
+        id_to_storage = dict()
+        partitions = []
+        for code, part in zip(codes.tolist(), np.split(rows, firsts[1:])):
+            storage = columns.storages[code]
+            id_to_storage[storage.id] = storage
+            partitions.append((columns.product[part], columns.unit[part], columns.value[part], columns.period[part]))
+
+        return rows.size, id_to_storage, partitions, columns.products, columns.units, \
+            columns.unit_factors.tolist(), columns.unit_roots.tolist()
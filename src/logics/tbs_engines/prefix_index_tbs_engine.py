@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.balance_index import BalanceIndex
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.tbs_engines.hash_tbs_engine import HashTbsEngine
+from src.models.abstract_model import AbstractModel
+from src.models.product_remain import ProductRemainModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.transaction import TransactionModel
+
+
+class PrefixIndexTbsEngine(AbstractTbsEngine):
+    """
+    Алгоритм расчёта ведомости по индексу накопленных дневных оборотов BalanceIndex.
+    Начальное сальдо, поступления и расходы пары (склад, продукт) вычисляются двоичным поиском
+    по префиксным суммам, без просмотра транзакций.
+
+    Индекс хранит обороты по дням, поэтому расчёт передаётся HashTbsEngine, если:
+    - фильтры транзакций отличны от равенства storage, product (значение - модель) или storage.id, product.id (строка);
+    - границы периода делят день, в котором есть транзакции;
+    - у продукта встречаются разные корневые единицы измерения.
+    """
+
+    # Поля, фильтр по равенству которых поддерживается индексом
+    _storage_fields = {"storage": True, "storage.id": False}
+    _product_fields = {"product": True, "product.id": False}
+
+    def __init__(self, index: BalanceIndex = None):
+        """
+        :param index: Синхронизированный с репозиторием индекс. Если не задан, индекс
+                      строится из all_transactions при каждом расчёте.
+        """
+        self.__index = index
+
+    def calculate(self, all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto,
+                  start: datetime, end: datetime, block_date: datetime = None,
+                  product_remains: list[ProductRemainModel] = []) -> list[TurnoverBalanceItem]:
+        index = self.__index if self.__index is not None else BalanceIndex(all_transactions)
+
+        restrictions = self.__restrictions(dto)
+        if restrictions is None or not index.is_day_aligned(start, end, block_date):
+            return HashTbsEngine().calculate(all_transactions, all_products, dto, start, end, block_date, product_remains)
+
+        storage_ids, product_ids = restrictions
+        totals = index.query(start, end, block_date, storage_ids, product_ids)
+        if not totals:
+            return []
+
+        # Склады и продукты, по которым есть движения, и корневые единицы продуктов
+        id_to_storage = dict()
+        product_to_base_unit = dict()
+        for storage_id, product_id in totals:
+            id_to_storage.setdefault(storage_id, index.storages[storage_id])
+            product_to_base_unit.setdefault(product_id, index.series(storage_id, product_id).unit)
+
+        if index.conflicts.intersection(product_to_base_unit):
+            # Ошибку о разных единицах измерения сформирует полный расчёт
+            return HashTbsEngine().calculate(all_transactions, all_products, dto, start, end, block_date, product_remains)
+
+        # Остатки на дату блокировки (остатки без склада не относятся ни к одной паре)
+        remains_totals: dict[tuple, float] = dict()
+        for remain in product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            remains_totals[key] = remains_totals.get(key, 0.0) + remain.value
+
+        result = []
+        empty = (0.0, 0.0, 0.0)
+        for storage_id, storage in id_to_storage.items():
+            for product_id, base_unit in product_to_base_unit.items():
+                key = (storage_id, product_id)
+                start_balance, inflows, outflows = totals.get(key, empty)
+                item = TurnoverBalanceItem.create(storage, all_products[product_id], base_unit)
+                # Начальное сальдо
+                item.start_balance = start_balance + remains_totals.get(key, 0.0)
+                # Поступления
+                item.inflows = inflows
+                # Расходы
+                item.outflows = outflows
+                result.append(item)
+
+        return result
+
+    def __restrictions(self, dto: FilterTbsDto) -> tuple[set | None, set | None] | None:
+        """
+        Преобразовать фильтры транзакций в ограничения по id складов и продуктов.
+
+        :return: Кортеж (id складов, id продуктов), None в элементе - без ограничения.
+                 None, если среди фильтров есть неподдерживаемые индексом (в том числе дерево фильтров).
+        """
+        if dto.transaction_where is not None:
+            return None
+        storage_ids = None
+        product_ids = None
+        for filter_dto in dto.transaction_filters:
+            if filter_dto.op != "==":
+                return None
+            if filter_dto.field_name in self._storage_fields:
+                value = self.__filter_id(filter_dto, self._storage_fields[filter_dto.field_name])
+                if value is None:
+                    return None
+                storage_ids = {value} if storage_ids is None else storage_ids & {value}
+            elif filter_dto.field_name in self._product_fields:
+                value = self.__filter_id(filter_dto, self._product_fields[filter_dto.field_name])
+                if value is None:
+                    return None
+                product_ids = {value} if product_ids is None else product_ids & {value}
+            else:
+                return None
+        return storage_ids, product_ids
+
+    @staticmethod
+    def __filter_id(filter_dto, is_model: bool) -> str | None:
+        """
+        id из значения фильтра: модель для поля модели, строка для поля id.
+        Иначе None (например, id строкой в поле модели из JSON) - фильтр сравнивается как в HashTbsEngine.
+        """
+        if is_model:
+            return filter_dto.value.id if isinstance(filter_dto.value, AbstractModel) else None
+        return filter_dto.value if isinstance(filter_dto.value, str) else None
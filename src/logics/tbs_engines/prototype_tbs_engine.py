@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from src.core.prototype import Prototype
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.unit_normalizer import UnitNormalizer
+from src.models.product_remain import ProductRemainModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.transaction import TransactionModel
+from src.models.validators.exceptions import OperationException
+
+
+class PrototypeTbsEngine(AbstractTbsEngine):
+    """
+    Исходный алгоритм расчёта ведомости через Prototype.
+    Для каждой пары (склад, продукт) заново фильтрует все списки транзакций и остатков,
+    поэтому сложность O(склады × продукты × транзакции).
+    Оставлен для сравнения результатов с другими движками.
+    """
+
+    def calculate(self, all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto,
+                  start: datetime, end: datetime, block_date: datetime = None,
+                  product_remains: list[ProductRemainModel] = []) -> list[TurnoverBalanceItem]:
+        result = []
+
+        # Представление транзакций в базовых единицах (модели не изменяются)
+        data = UnitNormalizer().to_rows(self._select(all_transactions, dto, end, block_date))
+        unique_product_ids = set()
+        id_to_storage = dict()
+        product_to_base_unit = dict()
+
+        if data:
+            for trans in data:
+                base_unit = trans.unit
+                id_to_storage[trans.storage.id] = trans.storage
+
+                pid = trans.product.id
+                unique_product_ids.add(pid)
+                if pid not in product_to_base_unit:
+                    product_to_base_unit[pid] = base_unit
+                if base_unit != product_to_base_unit[pid]:
+                    raise OperationException(f"Разные единицы измерения {base_unit} и {product_to_base_unit[pid]} для {trans.product}")
+            transactions_prototype = Prototype(data)
+
+            start_balance_proto = transactions_prototype.filter(FilterDto(field_name="period", value=start, op="<"))
+            current_period_proto = transactions_prototype.filter(FilterDto(field_name="period", value=start, op=">="))
+            positive_values_proto = current_period_proto.filter(FilterDto(field_name="value", value=0, op=">"))
+            negative_values_proto = current_period_proto.filter(FilterDto(field_name="value", value=0, op="<"))
+            product_remains_proto = Prototype(product_remains)
+
+            for storage_id in id_to_storage:
+                storage = id_to_storage[storage_id]
+                filter_by_storage = FilterDto(field_name="storage", value=storage)
+                for product_id in unique_product_ids:
+                    product = all_products[product_id]
+                    filter_by_product = FilterDto(field_name="product", value=product)
+                    filters = [filter_by_storage, filter_by_product]
+                    start_values = start_balance_proto.filter_mul(filters).data
+                    positive_values = positive_values_proto.filter_mul(filters).data
+                    negative_values = negative_values_proto.filter_mul(filters).data
+                    remains = product_remains_proto.filter_mul(filters).data
+
+                    item = TurnoverBalanceItem.create(storage, product, product_to_base_unit[product_id])
+
+                    def sum_values(values):
+                        return float(sum(map(lambda x: x.value, values)))
+
+                    # Начальное сальдо
+                    item.start_balance = sum_values(start_values) + sum_values(remains)
+                    # Поступления
+                    item.inflows = sum_values(positive_values)
+                    # Расходы
+                    item.outflows = sum_values(negative_values)
+
+                    result.append(item)
+
+        return result
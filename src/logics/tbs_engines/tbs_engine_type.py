@@ -0,0 +1,14 @@
+from enum import StrEnum
+
+
+class TbsEngineType(StrEnum):
+    """
+    Перечисление (Enum), определяющее доступные алгоритмы расчёта оборотно-сальдовой ведомости.
+    Использует StrEnum, чтобы значениями элементов были строки (строковые константы).
+    """
+
+    PROTOTYPE = 'prototype'
+    HASH = 'hash'
+    VECTORIZED = 'vectorized'
+    INDEX = 'index'
+    PARALLEL = 'parallel'
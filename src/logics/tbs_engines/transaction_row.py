@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.product import ProductModel
+from src.models.storage import StorageModel
+
+
+class TransactionRow(NamedTuple):
+    """
+    Неизменяемое представление транзакции для одного расчёта ведомости.
+    Значение уже переведено в базовую единицу измерения, исходная TransactionModel не меняется.
+    Поддерживает доступ к полям по имени, поэтому может фильтроваться через Prototype.
+    """
+    period: datetime
+    value: float
+    unit: MeasurementUnitModel
+    product: ProductModel
+    storage: StorageModel
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import numpy as np
+
+from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.transaction_columns import TransactionColumns
+from src.models.product_remain import ProductRemainModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.transaction import TransactionModel
+from src.models.validators.exceptions import OperationException
+
+
+class VectorizedTbsEngine(AbstractTbsEngine):
+    """
+    Векторизованный алгоритм расчёта ведомости над колоночным хранилищем TransactionColumns.
+    Отбор транзакций выполняется булевыми масками, группировка по парам (склад, продукт) -
+    через np.bincount, поэтому проход по транзакциям выполняется внутри NumPy.
+    Результат совпадает с HashTbsEngine.
+    """
+
+    def __init__(self, columns: TransactionColumns = None):
+        """
+        :param columns: Синхронизированное с репозиторием хранилище. Если задано, список
+                        all_transactions при расчёте не используется. Если не задано,
+                        хранилище строится из all_transactions при каждом расчёте.
+        """
+        self.__columns = columns
+
+    def calculate(self, all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto,
+                  start: datetime, end: datetime, block_date: datetime = None,
+                  product_remains: list[ProductRemainModel] = []) -> list[TurnoverBalanceItem]:
+        columns = self.__columns if self.__columns is not None else TransactionColumns(all_transactions)
+        if columns.size == 0:
+            return []
+
+        # Отбор строк
+        rows = columns.select(dto.transaction_filters, dto.transaction_where, end, block_date)
+        if rows.size == 0:
+            return []
+
+        product_codes = columns.product[rows]
+        storage_codes = columns.storage[rows]
+        root_codes = columns.unit_roots[columns.unit[rows]]
+        values = columns.value[rows] * columns.factor[rows]
+        periods = columns.period[rows]
+
+        # У каждого продукта должна быть одна корневая единица
+        products_count = len(columns.products)
+        min_roots = np.full(products_count, np.iinfo(np.int32).max, dtype=np.int32)
+        max_roots = np.full(products_count, -1, dtype=np.int32)
+        np.minimum.at(min_roots, product_codes, root_codes)
+        np.maximum.at(max_roots, product_codes, root_codes)
+        conflicts = np.flatnonzero((max_roots >= 0) & (min_roots != max_roots))
+        if conflicts.size:
+            code = conflicts[0]
+            raise OperationException(f"Разные единицы измерения {columns.units[max_roots[code]]} и {columns.units[min_roots[code]]} для {columns.products[code]}")
+
+        # Плотная нумерация пар (склад, продукт)
+        unique_storages = np.unique(storage_codes)
+        unique_products = np.unique(product_codes)
+        pairs_count = unique_storages.size * unique_products.size
+        keys = np.searchsorted(unique_storages, storage_codes) * unique_products.size \
+               + np.searchsorted(unique_products, product_codes)
+
+        before = periods < TransactionColumns.to_timestamp(start)
+        inflows_mask = ~before & (values > 0)
+        outflows_mask = ~before & (values < 0)
+        start_totals = np.bincount(keys[before], weights=values[before], minlength=pairs_count)
+        inflows_totals = np.bincount(keys[inflows_mask], weights=values[inflows_mask], minlength=pairs_count)
+        outflows_totals = np.bincount(keys[outflows_mask], weights=values[outflows_mask], minlength=pairs_count)
+
+        # Остатки на дату блокировки (остатки без склада не относятся ни к одной паре)
+        remains_totals: dict[tuple, float] = dict()
+        for remain in product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            remains_totals[key] = remains_totals.get(key, 0.0) + remain.value
+
+        result = []
+        key = 0
+        for storage_code in unique_storages:
+            storage = columns.storages[storage_code]
+            for product_code in unique_products:
+                product = all_products[columns.products[product_code].id]
+                item = TurnoverBalanceItem.create(storage, product, columns.units[min_roots[product_code]])
+                # Начальное сальдо
+                item.start_balance = float(start_totals[key]) + remains_totals.get((storage.id, product.id), 0.0)
+                # Поступления
+                item.inflows = float(inflows_totals[key])
+                # Расходы
+                item.outflows = float(outflows_totals[key])
+                result.append(item)
+                key += 1
+
+        return result
@@ -0,0 +1,11 @@
+from enum import StrEnum
+
+
+class TbsGroupBy(StrEnum):
+    """
+    Перечисление (Enum), определяющее измерения группировки оборотно-сальдовой ведомости.
+    Значения совпадают с путями к полям элемента ведомости.
+    """
+
+    PRODUCT_GROUP = 'product.group'
+    STORAGE = 'storage'
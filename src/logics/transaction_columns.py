@@ -0,0 +1,417 @@
+import operator
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.core.abstract_listener import AbstractListener
+from src.core.aggregate_func import AggregateFunc
+from src.core.aggregator import Aggregator
+from src.core.event_type import EventType
+from src.core.filter_compiler import FilterCompiler
+from src.core.logical_op import LogicalOp
+from src.core.prototype import Prototype
+from src.dto.aggregate_dto import AggregateDto
+from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.logics.unit_normalizer import UnitNormalizer
+from src.models.abstract_model import AbstractModel
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.transaction import TransactionModel
+from src.repository import RepoKeys
+
+
+class TransactionColumns(AbstractListener):
+    """
+    Колоночное хранилище транзакций на основе массивов NumPy.
+    Каждое поле транзакции хранится в отдельном массиве:
+    - period: int64, микросекунды от 1970-01-01
+    - value: float64, значение в исходной единице измерения
+    - product, storage, unit: int32, коды моделей (индексы в справочниках products, storages, units)
+    - factor: float64, заранее вычисленный коэффициент пересчёта к корневой единице
+
+    Синхронизируется с репозиторием, если зарегистрирован в ObserveService:
+    EventType.ADD_MODEL / DELETE_MODEL для транзакций и EventType.CHANGE_UNIT.
+    """
+
+    # Начальная ёмкость массивов (при заполнении ёмкость удваивается)
+    _INITIAL_CAPACITY = 1024
+    # Начало отсчёта для перевода дат в число
+    _EPOCH = datetime(1970, 1, 1)
+
+    # Операторы сравнения, которые выполняются над столбцами period и value
+    _compare_ops = {
+        "==": operator.eq,
+        "!=": operator.ne,
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+    }
+
+    def __init__(self, transactions: list[TransactionModel] = None):
+        self.__size = 0
+        self.__capacity = 0
+        self.__period = np.empty(0, dtype=np.int64)
+        self.__value = np.empty(0, dtype=np.float64)
+        self.__product = np.empty(0, dtype=np.int32)
+        self.__storage = np.empty(0, dtype=np.int32)
+        self.__unit = np.empty(0, dtype=np.int32)
+        self.__factor = np.empty(0, dtype=np.float64)
+
+        # Транзакции по номеру строки и номер строки по id транзакции
+        self.__models: list[TransactionModel] = []
+        self.__rows: dict[str, int] = {}
+
+        # Справочники кодов: id модели -> код и код -> модель
+        self.__product_codes: dict[str, int] = {}
+        self.__products: list = []
+        self.__storage_codes: dict[str, int] = {}
+        self.__storages: list = []
+        self.__unit_codes: dict[str, int] = {}
+        self.__units: list[MeasurementUnitModel] = []
+        # Коэффициент к корневой единице и код корневой единицы по коду единицы
+        self.__unit_factors: list[float] = []
+        self.__unit_roots: list[int] = []
+
+        if transactions:
+            self.extend(transactions)
+
+    # --- Столбцы (только заполненная часть массивов) ---
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def period(self) -> np.ndarray:
+        return self.__period[:self.__size]
+
+    @property
+    def value(self) -> np.ndarray:
+        return self.__value[:self.__size]
+
+    @property
+    def product(self) -> np.ndarray:
+        return self.__product[:self.__size]
+
+    @property
+    def storage(self) -> np.ndarray:
+        return self.__storage[:self.__size]
+
+    @property
+    def unit(self) -> np.ndarray:
+        return self.__unit[:self.__size]
+
+    @property
+    def factor(self) -> np.ndarray:
+        return self.__factor[:self.__size]
+
+    # --- Справочники ---
+    @property
+    def models(self) -> list[TransactionModel]:
+        return self.__models
+
+    @property
+    def products(self) -> list:
+        return self.__products
+
+    @property
+    def storages(self) -> list:
+        return self.__storages
+
+    @property
+    def units(self) -> list[MeasurementUnitModel]:
+        return self.__units
+
+    @property
+    def unit_roots(self) -> np.ndarray:
+        """Код корневой единицы для каждого кода единицы измерения"""
+        return np.asarray(self.__unit_roots, dtype=np.int32)
+
+    @property
+    def unit_factors(self) -> np.ndarray:
+        """Коэффициент пересчёта к корневой единице для каждого кода единицы измерения"""
+        return np.asarray(self.__unit_factors, dtype=np.float64)
+
+    @staticmethod
+    def to_timestamp(value: datetime) -> int:
+        """
+        Перевести дату в число микросекунд от 1970-01-01 (без учёта часового пояса).
+        """
+        return (value - TransactionColumns._EPOCH) // timedelta(microseconds=1)
+
+    def product_code(self, product_id: str) -> int:
+        """Код продукта по id или -1, если продукт не встречается в транзакциях"""
+        return self.__product_codes.get(product_id, -1)
+
+    def storage_code(self, storage_id: str) -> int:
+        """Код склада по id или -1, если склад не встречается в транзакциях"""
+        return self.__storage_codes.get(storage_id, -1)
+
+    # --- Изменение данных ---
+    def extend(self, transactions: list[TransactionModel]):
+        """
+        Добавить список транзакций в конец хранилища.
+        """
+        count = len(transactions)
+        self.__ensure_capacity(self.__size + count)
+        start, end = self.__size, self.__size + count
+
+        self.__period[start:end] = [self.to_timestamp(trans.period) for trans in transactions]
+        self.__value[start:end] = [trans.value for trans in transactions]
+        self.__product[start:end] = [self.__code(self.__product_codes, self.__products, trans.product) for trans in transactions]
+        self.__storage[start:end] = [self.__code(self.__storage_codes, self.__storages, trans.storage) for trans in transactions]
+        unit_codes = [self.__unit_code(trans.unit) for trans in transactions]
+        self.__unit[start:end] = unit_codes
+        self.__factor[start:end] = [self.__unit_factors[code] for code in unit_codes]
+
+        for row, trans in enumerate(transactions, start):
+            self.__rows[trans.id] = row
+        self.__models.extend(transactions)
+        self.__size = end
+
+    def append(self, transaction: TransactionModel):
+        """
+        Добавить одну транзакцию (амортизированно O(1)).
+        """
+        self.extend([transaction])
+
+    def remove(self, transaction_id: str):
+        """
+        Удалить транзакцию по id за O(1): на её место переносится последняя строка.
+        """
+        row = self.__rows.pop(transaction_id, None)
+        if row is None:
+            return
+        last = self.__size - 1
+        if row != last:
+            for column in (self.__period, self.__value, self.__product, self.__storage, self.__unit, self.__factor):
+                column[row] = column[last]
+            moved = self.__models[last]
+            self.__models[row] = moved
+            self.__rows[moved.id] = row
+        self.__models.pop()
+        self.__size = last
+
+    def refresh_factors(self):
+        """
+        Пересчитать коэффициенты к корневым единицам (после изменения единиц измерения).
+        """
+        normalizer = UnitNormalizer()
+        for code, unit in enumerate(list(self.__units)):
+            factor, root = normalizer.normalize(unit)
+            self.__unit_factors[code] = factor
+            self.__unit_roots[code] = code if root.id == unit.id else self.__unit_code(root)
+        factors = np.asarray(self.__unit_factors, dtype=np.float64)
+        self.__factor[:self.__size] = factors[self.__unit[:self.__size]]
+
+    def handle(self, event: EventType, params):
+        """
+        Синхронизация с репозиторием и единицами измерения.
+        """
+        if event == EventType.CHANGE_UNIT:
+            self.refresh_factors()
+        elif event in (EventType.ADD_MODEL, EventType.DELETE_MODEL) and params["key"] == RepoKeys.TRANSACTIONS:
+            if event == EventType.ADD_MODEL:
+                self.append(params["model"])
+            else:
+                self.remove(params["model"].id)
+
+    # --- Фильтрация ---
+    def filter_mask(self, dto: FilterDto) -> np.ndarray:
+        """
+        Вычислить булеву маску строк, удовлетворяющих фильтру.
+        Сравнения по period/value и фильтры ==, !=, notin по product/storage/unit (и их id)
+        выполняются над столбцами; остальные фильтры вычисляются через Prototype по моделям.
+
+        :param dto: Фильтр FilterDto.
+        :return: Булев массив длины size.
+        """
+        field = dto.field_name
+        value = dto.value
+
+        if dto.op in self._compare_ops:
+            if field == "period" and isinstance(value, datetime):
+                return self._compare_ops[dto.op](self.period, self.to_timestamp(value))
+            if field == "value" and isinstance(value, (int, float)):
+                return self._compare_ops[dto.op](self.value, value)
+
+        code_columns = {
+            "product": (self.__product_codes, self.product),
+            "storage": (self.__storage_codes, self.storage),
+            "unit": (self.__unit_codes, self.unit),
+        }
+        name, _, attribute = field.partition(".")
+        if name in code_columns and attribute in ("", "id") and dto.op in ("==", "!=", "notin"):
+            codes, column = code_columns[name]
+
+            def to_code(item) -> int:
+                # Модель сравнивается только с моделью, id - только со строкой
+                if attribute == "id":
+                    return codes.get(item, -1) if isinstance(item, str) else -1
+                return codes.get(item.id, -1) if isinstance(item, AbstractModel) else -1
+
+            if dto.op == "notin":
+                return ~np.isin(column, [to_code(item) for item in value])
+            mask = column == to_code(value)
+            return mask if dto.op == "==" else ~mask
+
+        # Общий случай: фильтрация моделей
+        selected = {id(model) for model in Prototype(self.__models).filter(dto).data}
+        return np.fromiter((id(model) in selected for model in self.__models), dtype=bool, count=self.__size)
+
+    def aggregate(self, filters: list[FilterDto], expression: FilterExpressionDto | None, group_by: list[str],
+                  aggregates: list[AggregateDto]) -> list[dict] | None:
+        """
+        Агрегация транзакций над столбцами. Поддерживается группировка по product, storage, unit (и их id)
+        и агрегаты по полю value в исходной единице измерения.
+
+        Строки возвращаются в порядке первого появления группы среди транзакций, упорядоченных по дате
+        (при равных датах - по порядку строк хранилища), то есть как Aggregator.aggregate над транзакциями
+        репозитория (SortedList по period). Порядок может отличаться только для транзакций с равной датой
+        после удаления транзакций из хранилища (на место удалённой строки переносится последняя).
+
+        :param filters: Фильтры транзакций.
+        :param expression: Дерево фильтров транзакций или None.
+        :param group_by: Пути полей группировки.
+        :param aggregates: Агрегатные функции.
+        :return: Строки результата или None, если запрос не выполняется над столбцами.
+        """
+        Aggregator.validate(aggregates)
+        code_columns = {"product": (self.__products, self.product), "storage": (self.__storages, self.storage),
+                        "unit": (self.__units, self.unit)}
+        dimensions = [path.partition(".") for path in group_by]
+        if any(name not in code_columns or attribute not in ("", "id") for name, _, attribute in dimensions) \
+                or any(field not in ("", "value") for field in Aggregator.fields(aggregates)):
+            return None
+
+        mask = np.ones(self.__size, dtype=bool)
+        for dto in filters:
+            mask &= self.filter_mask(dto)
+        if expression is not None:
+            mask &= self.expression_mask(expression)
+        rows = np.flatnonzero(mask)
+
+        # Номер группы каждой строки по смешанному основанию кодов измерений
+        keys = np.zeros(rows.size, dtype=np.int64)
+        for name, _, _ in dimensions:
+            models, column = code_columns[name]
+            keys = keys * max(len(models), 1) + column[rows]
+        if group_by:
+            unique_keys, groups = np.unique(keys, return_inverse=True)
+            # Первая строка каждой группы в порядке (дата, номер строки)
+            by_period = np.lexsort((rows, self.period[rows]))
+            firsts = np.full(unique_keys.size, rows.size, dtype=np.int64)
+            np.minimum.at(firsts, groups[by_period], np.arange(rows.size))
+            order = np.argsort(firsts).tolist()
+        else:
+            unique_keys, groups = np.zeros(1, dtype=np.int64), np.zeros(rows.size, dtype=np.int64)
+            order = [0]
+        groups_count = unique_keys.size
+
+        values = self.value[rows]
+        counts = np.bincount(groups, minlength=groups_count)
+        totals = np.bincount(groups, weights=values, minlength=groups_count)
+        minimums = np.full(groups_count, np.inf)
+        maximums = np.full(groups_count, -np.inf)
+        np.minimum.at(minimums, groups, values)
+        np.maximum.at(maximums, groups, values)
+
+        result = []
+        group_keys = unique_keys.tolist()
+        for group in order:
+            key = group_keys[group]
+            row = {}
+            for path, (name, _, attribute) in reversed(list(zip(group_by, dimensions))):
+                models, _ = code_columns[name]
+                key, code = divmod(key, max(len(models), 1))
+                row[path] = models[code].id if attribute else models[code]
+            row = {path: row[path] for path in group_by}
+
+            count = int(counts[group])
+            state = [count, float(totals[group]), float(minimums[group]) if count else None,
+                     float(maximums[group]) if count else None]
+            for dto in aggregates:
+                row[Aggregator.column_name(dto)] = Aggregator.result(AggregateFunc(dto.func), count,
+                                                                      state if dto.field_name else None)
+            result.append(row)
+        return result
+
+    def expression_mask(self, expression: FilterExpressionDto) -> np.ndarray:
+        """
+        Вычислить булеву маску строк, удовлетворяющих дереву фильтров:
+        маски фильтров узла объединяются по & (and, not) или | (or).
+
+        :param expression: Корень дерева фильтров.
+        :return: Булев массив длины size.
+        """
+        op = FilterCompiler.logical_op(expression)
+        masks = [self.filter_mask(dto) for dto in expression.filters]
+        masks += [self.expression_mask(item) for item in expression.expressions]
+
+        if op == LogicalOp.OR:
+            return np.logical_or.reduce(masks) if masks else np.zeros(self.__size, dtype=bool)
+        mask = np.logical_and.reduce(masks) if masks else np.ones(self.__size, dtype=bool)
+        return ~mask if op == LogicalOp.NOT else mask
+
+    def select(self, filters: list[FilterDto], expression: FilterExpressionDto | None, end: datetime,
+               block_date: datetime = None) -> np.ndarray:
+        """
+        Номера строк транзакций для расчёта ведомости: дата не позже end (и не раньше block_date),
+        фильтры и дерево фильтров транзакций.
+        """
+        mask = self.period <= self.to_timestamp(end)
+        for dto in filters:
+            mask &= self.filter_mask(dto)
+        if expression is not None:
+            mask &= self.expression_mask(expression)
+        if block_date:
+            mask &= self.period >= self.to_timestamp(block_date)
+        return np.flatnonzero(mask)
+
+    # --- Внутренние методы ---
+    def __ensure_capacity(self, required: int):
+        """Увеличить ёмкость массивов (удвоением) до требуемой"""
+        if required <= self.__capacity:
+            return
+        capacity = max(self.__capacity, self._INITIAL_CAPACITY)
+        while capacity < required:
+            capacity *= 2
+
+        def grow(column: np.ndarray) -> np.ndarray:
+            result = np.empty(capacity, dtype=column.dtype)
+            result[:self.__size] = column[:self.__size]
+            return result
+
+        self.__period = grow(self.__period)
+        self.__value = grow(self.__value)
+        self.__product = grow(self.__product)
+        self.__storage = grow(self.__storage)
+        self.__unit = grow(self.__unit)
+        self.__factor = grow(self.__factor)
+        self.__capacity = capacity
+
+    @staticmethod
+    def __code(codes: dict, models: list, model: AbstractModel) -> int:
+        """Код модели в справочнике (новая модель получает следующий код)"""
+        code = codes.get(model.id)
+        if code is None:
+            code = len(models)
+            codes[model.id] = code
+            models.append(model)
+        return code
+
+    def __unit_code(self, unit: MeasurementUnitModel) -> int:
+        """Код единицы измерения; для новой единицы вычисляются коэффициент и корневая единица"""
+        code = self.__unit_codes.get(unit.id)
+        if code is not None:
+            return code
+
+        code = len(self.__units)
+        self.__unit_codes[unit.id] = code
+        self.__units.append(unit)
+        factor, root = UnitNormalizer().normalize(unit)
+        self.__unit_factors.append(factor)
+        self.__unit_roots.append(code)
+        if root.id != unit.id:
+            self.__unit_roots[code] = self.__unit_code(root)
+        return code
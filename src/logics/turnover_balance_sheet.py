@@ -1,11 +1,21 @@
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
+from operator import attrgetter
 
-from src.core.functions import measurement_unit_to_super_base
 from src.core.prototype import Prototype
 from src.dto.filter_dto import FilterDto
 from src.dto.filter_tbs_dto import FilterTbsDto
+from src.logics.remains_checkpoints import RemainsCheckpoints
+from src.logics.tbs_cache import TbsCache
+from src.logics.tbs_engines.abstract_tbs_engine import AbstractTbsEngine
+from src.logics.tbs_engines.hash_tbs_engine import HashTbsEngine
+from src.logics.tbs_group_by import TbsGroupBy
+from src.logics.turnover_period import TurnoverPeriod
+from src.logics.unit_normalizer import UnitNormalizer
 from src.models.product_remain import ProductRemainModel
 from src.models.tbs_item import TurnoverBalanceItem
+from src.models.tbs_rollup_item import TurnoverRollupItem
+from src.models.tbs_series_item import TurnoverSeriesItem
 from src.models.transaction import TransactionModel
 from src.models.validators.exceptions import OperationException
 from src.repository import Repository, RepoKeys
@@ -22,7 +32,9 @@ class TurnoverBalanceSheet:
         end = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59)
         turnover_balances: dict[str, TurnoverBalanceItem] = {}
 
-        for trans in all_transactions:
+        # Для упорядоченного по дате списка (SortedList) отбор по дате выполняется двоичным поиском
+        transactions = Prototype(all_transactions).filter(FilterDto(field_name="period", value=end, op="<")).data
+        for trans in transactions:
             if trans.storage == storage and trans.period < end:
                 pr_id = trans.product.id
                 if pr_id not in turnover_balances:
@@ -53,95 +65,236 @@ class TurnoverBalanceSheet:
 
 
     # Функция подсчёта сальдовой ведомости по продуктам с фильтрацией и сортировкой используя данные из dto
+    # engine - движок расчёта (по умолчанию HashTbsEngine)
+    # cache - кеш результатов (если не задан, ведомость всегда рассчитывается заново)
+    # dto.offset, dto.limit - страница результата после фильтрации и сортировки
     @staticmethod
-    def calculate(all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto, start: datetime, end: datetime, block_date: datetime = None, product_remains: list[ProductRemainModel]=[], include_zero_values=True):
-        result = []
+    def calculate(all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto, start: datetime, end: datetime, block_date: datetime = None, product_remains: list[ProductRemainModel]=[], include_zero_values=True, engine: AbstractTbsEngine = None, cache: TbsCache = None):
+        if cache is not None:
+            # В кеше хранится вся ведомость, страница (offset, limit) выбирается из неё
+            full_dto = replace(dto, offset=0, limit=None)
+            key = TbsCache.make_key(full_dto, start, end, block_date, include_zero_values)
+            result = cache.get(key)
+            if result is None:
+                result = TurnoverBalanceSheet.calculate(all_transactions, all_products, full_dto, start, end, block_date, product_remains, include_zero_values, engine)
+                cache.put(key, full_dto, end, block_date, result)
+            return Prototype(result).lazy().offset(dto.offset).limit(dto.limit).data
+
+        if engine is None:
+            engine = HashTbsEngine()
+
+        result = engine.calculate(all_transactions, all_products, dto, start, end, block_date, product_remains)
+
+        if dto.group_by:
+            # Итоговые строки по парам с движениями (продукты без движений в итоги ничего не добавляют)
+            rollup = TurnoverBalanceSheet.rollup(result, [TbsGroupBy(name) for name in dto.group_by])
+            return Prototype(rollup).lazy().filter_mul(dto.result_filters, dto.result_where).sort(dto.result_sorts) \
+                .offset(dto.offset).limit(dto.limit).data
+
+        if include_zero_values:
+            unique_product_ids = {item.product.id for item in result}
+            filtered_products = Prototype(list(all_products.values())).filter(FilterDto(field_name='id', value=unique_product_ids, op="notin")).data
+            for product in filtered_products:
+                result.append(TurnoverBalanceItem.create(None, product, product.unit))
 
-        transactions_prototype = Prototype(all_transactions)\
-            .filter(FilterDto(field_name="period", value=end, op="<="))\
-            .filter_mul(dto.transaction_filters)
+        # Для первой страницы (limit) сортируются только offset + limit строк
+        return Prototype(result).lazy().filter_mul(dto.result_filters, dto.result_where).sort(dto.result_sorts) \
+            .offset(dto.offset).limit(dto.limit).data
 
+    # Функция свёртки элементов ведомости в итоговые строки по измерениям group_by.
+    # Строки разделяются также по единице измерения, чтобы не складывать несопоставимые значения.
+    # products_count - количество продуктов с ненулевым сальдо или оборотами.
+    @staticmethod
+    def rollup(items: list[TurnoverBalanceItem], group_by: list[TbsGroupBy]) -> list[TurnoverRollupItem]:
+        by_storage = TbsGroupBy.STORAGE in group_by
+        by_group = TbsGroupBy.PRODUCT_GROUP in group_by
+
+        rows: dict[tuple, TurnoverRollupItem] = dict()
+        products: dict[tuple, set] = dict()
+        for item in items:
+            storage = item.storage if by_storage else None
+            group = item.product.group if by_group else None
+            key = (storage and storage.id, group and group.id, item.unit.id)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = TurnoverRollupItem.create(storage, group, item.unit)
+                products[key] = set()
+            row.start_balance += item.start_balance
+            row.inflows += item.inflows
+            row.outflows += item.outflows
+            # Нулевые пары (склад, продукт), дополняющие ведомость, в количество продуктов не входят
+            if item.start_balance or item.inflows or item.outflows:
+                products[key].add(item.product.id)
+
+        for key, row in rows.items():
+            row.products_count = len(products[key])
+        return list(rows.values())
+
+    # Функция подсчёта временного ряда оборотов по парам (склад, продукт) за один проход по транзакциям,
+    # отсортированным по дате. Интервалы ряда выравниваются по календарю (period), первый начинается со start.
+    @staticmethod
+    def calculate_series(all_transactions: list[TransactionModel], all_products: dict, dto: FilterTbsDto, start: datetime, end: datetime, period: TurnoverPeriod, block_date: datetime = None, product_remains: list[ProductRemainModel]=[]) -> list[TurnoverSeriesItem]:
+        filters = [FilterDto(field_name="period", value=end, op="<="), *dto.transaction_filters]
         if block_date:
-            transactions_prototype = transactions_prototype.filter(FilterDto(field_name="period", value=block_date, op=">="))
+            filters.append(FilterDto(field_name="period", value=block_date, op=">="))
+        data = sorted(Prototype(all_transactions).filter_mul(filters, dto.transaction_where).data, key=attrgetter("period"))
 
-        data = transactions_prototype.data.copy()
-        unique_product_ids = set()
+        # Границы интервалов: начало каждого интервала и конец последнего
+        bounds = [start]
+        while bounds[-1] <= end:
+            bounds.append(TurnoverBalanceSheet.__next_bound(bounds[-1], period))
+        buckets_count = len(bounds) - 1
+
+        # Пара (id склада, id продукта) -> сальдо до начала периода и [поступления, расходы] по интервалам
         id_to_storage = dict()
         product_to_base_unit = dict()
+        balances: dict[tuple, float] = dict()
+        turnovers: dict[tuple, list[list[float]]] = dict()
 
-        if data:
-            for trans in data:
-                factor, base_unit = measurement_unit_to_super_base(trans.unit)
-                trans.value *= factor
-                trans.unit = base_unit
-
-                id_to_storage[trans.storage.id] = trans.storage
-
-                pid = trans.product.id
-                unique_product_ids.add(pid)
-                if pid not in product_to_base_unit:
-                    product_to_base_unit[pid] = base_unit
-                if base_unit != product_to_base_unit[pid]:
-                    raise OperationException(f"Разные единицы измерения {base_unit} и {product_to_base_unit[pid]} для {trans.product}")
-            transactions_prototype = Prototype(data)
-
-            start_balance_proto = transactions_prototype.filter(FilterDto(field_name="period", value=start, op="<"))
-            current_period_proto = transactions_prototype.filter(FilterDto(field_name="period", value=start, op=">="))
-            positive_values_proto = current_period_proto.filter(FilterDto(field_name="value", value=0, op=">"))
-            negative_values_proto = current_period_proto.filter(FilterDto(field_name="value", value=0, op="<"))
-            product_remains_proto = Prototype(product_remains)
-
-            for storage_id in id_to_storage:
-                storage = id_to_storage[storage_id]
-                filter_by_storage = FilterDto(field_name="storage", value=storage)
-                for product_id in unique_product_ids:
-                    product = all_products[product_id]
-                    filter_by_product = FilterDto(field_name="product", value=product)
-                    filters = [filter_by_storage, filter_by_product]
-                    start_values = start_balance_proto.filter_mul(filters).data
-                    positive_values = positive_values_proto.filter_mul(filters).data
-                    negative_values = negative_values_proto.filter_mul(filters).data
-                    remains = product_remains_proto.filter_mul(filters).data
-
-                    item = TurnoverBalanceItem.create(storage, product, product_to_base_unit[product_id])
-
-                    def sum_values(values):
-                        return float(sum(map(lambda x: x.value, values)))
+        for remain in product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            balances[key] = balances.get(key, 0.0) + remain.value
 
-                    # Начальное сальдо
-                    item.start_balance = sum_values(start_values) + sum_values(remains)
-                    # Поступления
-                    item.inflows = sum_values(positive_values)
-                    # Расходы
-                    item.outflows = sum_values(negative_values)
+        # Пары с остатками на дату блокировки выводятся и без транзакций
+        remain_units = dict()
+        for remain in TurnoverBalanceSheet.__filter_remains(product_remains, dto):
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            id_to_storage.setdefault(key[0], remain.storage)
+            remain_units.setdefault(key[1], remain.unit)
+            if key not in turnovers:
+                turnovers[key] = [[0.0, 0.0] for _ in range(buckets_count)]
 
-                    result.append(item)
+        normalizer = UnitNormalizer()
+        bucket = 0
+        for trans in data:
+            factor, base_unit = normalizer.normalize(trans.unit)
+            value = trans.value * factor
 
-        if include_zero_values:
-            filtered_products = Prototype(list(all_products.values())).filter(FilterDto(field_name='id', value=unique_product_ids, op="notin")).data
-            for product in filtered_products:
-                result.append(TurnoverBalanceItem.create(None, product, product.unit))
+            pid = trans.product.id
+            if pid not in product_to_base_unit:
+                product_to_base_unit[pid] = base_unit
+            if base_unit != product_to_base_unit[pid]:
+                raise OperationException(f"Разные единицы измерения {base_unit} и {product_to_base_unit[pid]} для {trans.product}")
+
+            key = (trans.storage.id, pid)
+            id_to_storage[key[0]] = trans.storage
+            if key not in turnovers:
+                turnovers[key] = [[0.0, 0.0] for _ in range(buckets_count)]
+
+            if trans.period < start:
+                balances[key] = balances.get(key, 0.0) + value
+                continue
+            # Транзакции отсортированы, поэтому номер интервала только растёт
+            while trans.period >= bounds[bucket + 1]:
+                bucket += 1
+            if value > 0:
+                turnovers[key][bucket][0] += value
+            elif value < 0:
+                turnovers[key][bucket][1] += value
+
+        for product_id, unit in remain_units.items():
+            product_to_base_unit.setdefault(product_id, unit)
+
+        result = []
+        for key, pair_turnovers in turnovers.items():
+            storage_id, product_id = key
+            balance = balances.get(key, 0.0)
+            for index, (inflows, outflows) in enumerate(pair_turnovers):
+                item = TurnoverSeriesItem.create(id_to_storage[storage_id], all_products[product_id],
+                                                 product_to_base_unit[product_id], bounds[index], bounds[index + 1],
+                                                 balance, inflows, outflows)
+                balance = item.end_balance
+                result.append(item)
+
+        return Prototype(result).lazy().filter_mul(dto.result_filters, dto.result_where).sort(dto.result_sorts) \
+            .offset(dto.offset).limit(dto.limit).data
+
+    @staticmethod
+    def __filter_remains(product_remains: list[ProductRemainModel], dto: FilterTbsDto) -> list[ProductRemainModel]:
+        """
+        Остатки, удовлетворяющие фильтрам транзакций dto. Если фильтры ссылаются на поля,
+        которых у остатка нет (например, period), отобрать остатки нельзя - возвращается пустой список.
+        """
+        fields = [item.field_name for item in dto.transaction_filters]
+        expressions = [dto.transaction_where] if dto.transaction_where is not None else []
+        while expressions:
+            expression = expressions.pop()
+            fields.extend(item.field_name for item in expression.filters)
+            expressions.extend(expression.expressions)
+        if any(not hasattr(ProductRemainModel, name.split(".")[0]) for name in fields):
+            return []
+        return Prototype(product_remains).filter_mul(dto.transaction_filters, dto.transaction_where).data
 
-        return Prototype(result).filter_mul(dto.result_filters).sort(dto.result_sorts).data
+    @staticmethod
+    def __next_bound(value: datetime, period: TurnoverPeriod) -> datetime:
+        """Начало следующего календарного интервала после value"""
+        day = datetime(value.year, value.month, value.day)
+        if period == TurnoverPeriod.DAY:
+            return day + timedelta(days=1)
+        if period == TurnoverPeriod.WEEK:
+            return day + timedelta(days=7 - day.weekday())
+        if period == TurnoverPeriod.MONTH:
+            return datetime(day.year + day.month // 12, day.month % 12 + 1, 1)
+        raise OperationException(f"Неверный интервал временного ряда: {period}")
 
+    # Функция подсчёта остатков на дату new_block_date
+    # checkpoints - помесячные контрольные точки остатков (если не заданы, расчёт ведётся по всем транзакциям)
     @staticmethod
-    def calculate_remains(new_block_date: datetime, all_transactions: list[TransactionModel], all_products: dict, old_block_date: datetime = None, old_product_remains: list[ProductRemainModel]=[], include_zero_values=False):
+    def calculate_remains(new_block_date: datetime, all_transactions: list[TransactionModel], all_products: dict, old_block_date: datetime = None, old_product_remains: list[ProductRemainModel]=[], include_zero_values=False, checkpoints: RemainsCheckpoints = None):
+        if checkpoints is not None:
+            remains = {model.id: model for model in checkpoints.remains(new_block_date, old_block_date, old_product_remains)}
+        else:
+            remains = TurnoverBalanceSheet.__full_remains(new_block_date, all_transactions, all_products,
+                                                          old_block_date, old_product_remains)
+
+        if include_zero_values:
+            unique_product_ids = {model.product.id for model in remains.values()}
+            for product in all_products.values():
+                if product.id not in unique_product_ids:
+                    model = ProductRemainModel.create(0.0, product.unit, product, None)
+                    remains[model.id] = model
+        return remains
+
+    # Подсчёт остатков по всем транзакциям (без контрольных точек)
+    @staticmethod
+    def __full_remains(new_block_date: datetime, all_transactions: list[TransactionModel], all_products: dict, old_block_date: datetime = None, old_product_remains: list[ProductRemainModel]=[]):
         start_date = datetime.fromtimestamp(0)  # timestamp с начала 1970 года
         tbs_items: list[TurnoverBalanceItem] = TurnoverBalanceSheet.calculate(all_transactions, all_products,
                                                                               FilterTbsDto(), start_date,
                                                                               new_block_date,
                                                                               old_block_date, old_product_remains,
-                                                                              include_zero_values=include_zero_values)
+                                                                              include_zero_values=False)
         remains = {}
+        pairs = set()
         for item in tbs_items:
-            model = ProductRemainModel.create(item.inflows + item.outflows, item.unit, item.product, item.storage)
+            # Остаток = остаток на старую дату блокировки + обороты после неё
+            model = ProductRemainModel.create(item.start_balance + item.inflows + item.outflows, item.unit, item.product, item.storage)
             remains[model.id] = model
+            pairs.add((item.storage.id, item.product.id))
+
+        # Пары, у которых есть только остатки на старую дату блокировки, в ведомость не попадают:
+        # склады ведомости берутся из транзакций
+        remains_only: dict[tuple, ProductRemainModel] = dict()
+        for remain in old_product_remains:
+            if remain.storage is None:
+                continue
+            key = (remain.storage.id, remain.product.id)
+            if key in pairs:
+                continue
+            if key in remains_only:
+                remains_only[key].value += remain.value
+            else:
+                model = remains_only[key] = ProductRemainModel.create(remain.value, remain.unit, remain.product, remain.storage)
+                remains[model.id] = model
         return remains
 
     @staticmethod
-    def change_block_date(new_block_date: datetime, all_transactions: list[TransactionModel], all_products: dict):
+    def change_block_date(new_block_date: datetime, all_transactions: list[TransactionModel], all_products: dict, checkpoints: RemainsCheckpoints = None):
         repo = Repository()
         sett = SettingsManager().settings
-        repo.data[RepoKeys.PRODUCT_REMAINS] = TurnoverBalanceSheet.calculate_remains(new_block_date, all_transactions, all_products, sett.block_date, repo.get_values(RepoKeys.PRODUCT_REMAINS))
+        repo.replace(RepoKeys.PRODUCT_REMAINS, TurnoverBalanceSheet.calculate_remains(new_block_date, all_transactions, all_products, sett.block_date, repo.get_values(RepoKeys.PRODUCT_REMAINS), checkpoints=checkpoints))
         sett.block_date = new_block_date
-
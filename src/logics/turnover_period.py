@@ -0,0 +1,12 @@
+from enum import StrEnum
+
+
+class TurnoverPeriod(StrEnum):
+    """
+    Перечисление (Enum), определяющее длительность интервала временного ряда оборотов.
+    Интервалы выравниваются по календарю: день, неделя (с понедельника), месяц (с первого числа).
+    """
+
+    DAY = 'day'
+    WEEK = 'week'
+    MONTH = 'month'
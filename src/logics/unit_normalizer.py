@@ -0,0 +1,62 @@
+from src.core.abstract_listener import AbstractListener
+from src.core.event_type import EventType
+from src.core.functions import measurement_unit_to_super_base
+from src.core.observe_service import ObserveService
+from src.core.singletone import Singleton
+from src.logics.tbs_engines.transaction_row import TransactionRow
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.transaction import TransactionModel
+
+
+class UnitNormalizer(AbstractListener, metaclass=Singleton):
+    """
+    Сервис приведения значений к базовой (корневой) единице измерения.
+    Для каждой единицы один раз вычисляет пару (общий коэффициент, корневая единица)
+    и хранит её в кэше. Кэш сбрасывается по событию EventType.CHANGE_UNIT.
+
+    Использует Singleton, чтобы кэш был общим для всех расчётов.
+    """
+
+    # id единицы -> (единица, общий коэффициент, корневая единица)
+    __cache: dict[str, tuple]
+
+    def __init__(self):
+        self.__cache = {}
+        ObserveService.add(self)
+
+    def handle(self, event: EventType, params):
+        """
+        Сбросить кэш при изменении любой единицы измерения
+        (изменение может затронуть все производные от неё единицы).
+        """
+        if event == EventType.CHANGE_UNIT:
+            self.__cache.clear()
+
+    def normalize(self, unit: MeasurementUnitModel) -> tuple[float, MeasurementUnitModel]:
+        """
+        Возвращает общий коэффициент пересчёта и корневую единицу для заданной единицы.
+        Результат совпадает с measurement_unit_to_super_base, но вычисляется один раз.
+
+        :param unit: Исходная единица измерения.
+        :return: Кортеж (коэффициент, корневая единица).
+        """
+        cached = self.__cache.get(unit.id)
+        # Сравнение по ссылке: разные объекты с одинаковым id не должны делить запись кэша
+        if cached is None or cached[0] is not unit:
+            factor, base_unit = measurement_unit_to_super_base(unit)
+            cached = (unit, factor, base_unit)
+            self.__cache[unit.id] = cached
+        return cached[1], cached[2]
+
+    def to_rows(self, transactions: list[TransactionModel]) -> list[TransactionRow]:
+        """
+        Формирует представление транзакций в базовых единицах измерения, не изменяя сами модели.
+
+        :param transactions: Список транзакций.
+        :return: Список TransactionRow в том же порядке.
+        """
+        rows = []
+        for trans in transactions:
+            factor, base_unit = self.normalize(trans.unit)
+            rows.append(TransactionRow(trans.period, trans.value * factor, base_unit, trans.product, trans.storage))
+        return rows
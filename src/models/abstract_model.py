@@ -14,6 +14,8 @@ class AbstractModel(ABC):
     DTO_CLASS = AbstractDto
 
     _id: str = ""
+    # Модель создана фабричным методом (после этого изменение наименования или пересчёта единицы рассылает событие)
+    _initialized = False
 
     def __init__(self):
         self._id = str(uuid.uuid4())
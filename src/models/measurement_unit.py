@@ -1,3 +1,5 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
 from src.dto.cached_id import CachedId
 from src.dto.measurement_dto import MeasurementUnitDto
 from src.models.abstract_model import AbstractModel
@@ -40,7 +42,10 @@ class MeasurementUnitModel(AbstractModel):
     @base_unit.setter
     def base_unit(self, value: "MeasurementUnitModel"):
         validate_val(value, MeasurementUnitModel, none_allowed=True)
+        changed = self._base_unit != value if value is not None else self._base_unit is not None
         self._base_unit = value
+        if changed:
+            self.__notify_change()
 
     # --- Коэффициент пересчета ---
     @property
@@ -50,7 +55,18 @@ class MeasurementUnitModel(AbstractModel):
     @conversion_factor.setter
     @validate_setter(float)
     def conversion_factor(self, value: float):
+        changed = self._conversion_factor != value
         self._conversion_factor = value
+        if changed:
+            self.__notify_change()
+
+    def __notify_change(self):
+        """
+        Сообщить об изменении пересчёта уже созданной единицы измерения
+        (присваивания внутри фабричных методов событий не создают).
+        """
+        if self._initialized:
+            ObserveService.create_event(EventType.CHANGE_UNIT, {"model": self})
 
     def convert_to(self, value: float, target_unit: "MeasurementUnitModel") -> float:
         """
@@ -72,6 +88,7 @@ class MeasurementUnitModel(AbstractModel):
             item.base_unit = base
         item.name = name
         item.conversion_factor = factor
+        item._initialized = True
         return item
 
     @staticmethod
@@ -85,6 +102,7 @@ class MeasurementUnitModel(AbstractModel):
         if dto.base_unit is not None:
             item.base_unit = cache[dto.base_unit.id]
         item.conversion_factor = dto.conversion_factor
+        item._initialized = True
         return item
 
     """
@@ -1,3 +1,5 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
 from src.dto.cached_id import CachedId
 from src.dto.product_dto import ProductDto
 from src.models.abstract_model import AbstractModel
@@ -32,7 +34,10 @@ class ProductModel(AbstractModel):
     @name.setter
     @validate_setter(str, check_func=lambda x: 0 < len(x.strip()) <= 50)
     def name(self, value: str):
+        renamed = self._initialized and self._name != value.strip()
         self._name = value.strip()
+        if renamed:
+            ObserveService.create_event(EventType.CHANGE_NAME, {"model": self})
 
     # --- Полное наименование ---
     @property
@@ -42,7 +47,10 @@ class ProductModel(AbstractModel):
     @full_name.setter
     @validate_setter(str, check_func=lambda x: 0 < len(x.strip()) <= 255)
     def full_name(self, value: str):
+        renamed = self._initialized and self._full_name != value.strip()
         self._full_name = value.strip()
+        if renamed:
+            ObserveService.create_event(EventType.CHANGE_NAME, {"model": self})
 
     # --- Единица измерения ---
     @property
@@ -82,6 +90,7 @@ class ProductModel(AbstractModel):
             item.unit = unit
         if group:
             item.group = group
+        item._initialized = True
         return item
 
     @staticmethod
@@ -100,6 +109,7 @@ class ProductModel(AbstractModel):
         if dto.group is not None:
             item.group = cache[dto.group.id]
 
+        item._initialized = True
         return item
 
     """
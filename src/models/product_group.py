@@ -1,3 +1,5 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
 from src.dto.product_group_dto import ProductGroupDto
 from src.models.abstract_model import AbstractModel
 from src.models.validators.decorators import validate_setter
@@ -24,7 +26,10 @@ class ProductGroupModel(AbstractModel):
     @name.setter
     @validate_setter(str, check_func=not_empty)
     def name(self, value: str):
+        renamed = self._initialized and self._name != value.strip()
         self._name = value.strip()
+        if renamed:
+            ObserveService.create_event(EventType.CHANGE_NAME, {"model": self})
 
     @staticmethod
     def create(name: str):
@@ -35,6 +40,7 @@ class ProductGroupModel(AbstractModel):
         """
         item = ProductGroupModel()
         item.name = name
+        item._initialized = True
         return item
 
     @staticmethod
@@ -45,6 +51,7 @@ class ProductGroupModel(AbstractModel):
         item = ProductGroupModel()
         item.id = dto.id
         item.name = dto.name
+        item._initialized = True
         return item
 
     """
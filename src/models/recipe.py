@@ -1,3 +1,5 @@
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
 from src.dto.cached_id import CachedId
 from src.dto.recipe_dto import RecipeDto
 from src.models.abstract_model import AbstractModel
@@ -30,7 +32,10 @@ class RecipeModel(AbstractModel):
     @name.setter
     @validate_setter(str, check_func=not_empty)
     def name(self, value: str):
+        renamed = self._initialized and self._name != value.strip()
         self._name = value.strip()
+        if renamed:
+            ObserveService.create_event(EventType.CHANGE_NAME, {"model": self})
 
     # --- Время приготовления ---
     @property
@@ -85,6 +90,7 @@ class RecipeModel(AbstractModel):
             item.steps = steps
         if cooking_time:
             item.cooking_time = cooking_time
+        item._initialized = True
         return item
 
     @staticmethod
@@ -100,6 +106,7 @@ class RecipeModel(AbstractModel):
 
         # Преобразование списка CachedId в список IngredientModel
         item.ingredients = [cache[ingredient_id.id] for ingredient_id in dto.ingredients]
+        item._initialized = True
 
         return item
 
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from src.dto.cached_id import CachedId
+from src.dto.remain_checkpoint_dto import RemainCheckpointDto
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.product import ProductModel
+from src.models.product_remain import ProductRemainModel
+from src.models.storage import StorageModel
+from src.models.validators.decorators import validate_setter
+
+
+# Модель контрольной точки остатков: остаток номенклатуры на складе на начало даты period
+class RemainCheckpointModel(ProductRemainModel):
+    # соответствующий модели dto класс
+    DTO_CLASS = RemainCheckpointDto
+
+    _period: datetime = None
+
+    def __init__(self):
+        super().__init__()
+
+    # --- Дата контрольной точки ---
+    @property
+    def period(self) -> datetime:
+        return self._period
+
+    @period.setter
+    @validate_setter(datetime)
+    def period(self, value: datetime):
+        self._period = value
+
+    # --- Фабричные методы и DTO ---
+    @staticmethod
+    def create(period: datetime, value: float, unit_model: MeasurementUnitModel,
+               product_model: ProductModel, storage_model: StorageModel) -> "RemainCheckpointModel":
+        """
+            Фабричный метод для создания экземпляра
+        """
+        item = RemainCheckpointModel()
+        item.period = period
+        item.value = value
+        item.unit = unit_model
+        item.product = product_model
+        item.storage = storage_model
+        return item
+
+    @staticmethod
+    def from_dto(dto: RemainCheckpointDto, cache: dict) -> "RemainCheckpointModel":
+        item = RemainCheckpointModel()
+        item.id = dto.id
+        item.period = datetime.strptime(dto.period, "%Y-%m-%d")
+        item.value = dto.value
+
+        if dto.unit is not None:
+            item.unit = cache[dto.unit.id]
+        if dto.product is not None:
+            item.product = cache[dto.product.id]
+        if dto.storage is not None:
+            item.storage = cache[dto.storage.id]
+
+        return item
+
+    """
+    Перевести доменную модель в DTO
+    """
+    def to_dto(self) -> RemainCheckpointDto:
+        return RemainCheckpointDto(
+            self._id,
+            self._period.strftime("%Y-%m-%d"),
+            self._value,
+            self._unit and CachedId(self._unit.id),
+            self._product and CachedId(self._product.id),
+            self._storage and CachedId(self._storage.id)
+        )
@@ -0,0 +1,157 @@
+from src.dto.cached_id import CachedId
+from src.dto.tbs_rollup_dto import TurnoverRollupItemDto
+from src.models.abstract_model import AbstractModel
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.product_group import ProductGroupModel
+from src.models.storage import StorageModel
+from src.models.validators.decorators import validate_setter
+
+
+# Итоговая строка сгруппированной ОСВ: сумма элементов ведомости по складу и/или группе номенклатуры
+class TurnoverRollupItem(AbstractModel):
+    def __init__(self):
+        super().__init__()
+
+    # соответствующий модели dto класс
+    DTO_CLASS = TurnoverRollupItemDto
+
+    # --- Приватные поля ---
+    _storage: StorageModel = None
+    _group: ProductGroupModel = None
+    _unit: MeasurementUnitModel = None
+    _products_count: int = 0
+    _start_balance: float = 0.0
+    _inflows: float = 0.0
+    _outflows: float = 0.0
+
+    # --- Склад (None - по всем складам) ---
+    @property
+    def storage(self) -> StorageModel:
+        return self._storage
+
+    @storage.setter
+    @validate_setter(StorageModel, none_allowed=True)
+    def storage(self, value: StorageModel):
+        self._storage = value
+
+    # --- Группа номенклатуры (None - по всем группам) ---
+    @property
+    def group(self) -> ProductGroupModel:
+        return self._group
+
+    @group.setter
+    @validate_setter(ProductGroupModel, none_allowed=True)
+    def group(self, value: ProductGroupModel):
+        self._group = value
+
+    # --- Единица измерения (Unit) ---
+    @property
+    def unit(self) -> MeasurementUnitModel:
+        return self._unit
+
+    @unit.setter
+    @validate_setter(MeasurementUnitModel)
+    def unit(self, value: MeasurementUnitModel):
+        self._unit = value
+
+    # --- Количество продуктов в строке ---
+    @property
+    def products_count(self) -> int:
+        return self._products_count
+
+    @products_count.setter
+    @validate_setter(int)
+    def products_count(self, value: int):
+        self._products_count = value
+
+    # --- Начальное сальдо (Start Balance) ---
+    @property
+    def start_balance(self) -> float:
+        return self._start_balance
+
+    @start_balance.setter
+    @validate_setter(float)
+    def start_balance(self, value: float):
+        self._start_balance = value
+
+    # --- Поступления (Inflows) ---
+    @property
+    def inflows(self) -> float:
+        return self._inflows
+
+    @inflows.setter
+    @validate_setter(float)
+    def inflows(self, value: float):
+        self._inflows = value
+
+    # --- Расходы (Outflows) ---
+    @property
+    def outflows(self) -> float:
+        return self._outflows
+
+    @outflows.setter
+    @validate_setter(float, check_func=lambda x: x <= 0)
+    def outflows(self, value: float):
+        self._outflows = value
+
+    # --- Вычисляемые свойства (Computed Properties) ---
+
+    @property
+    def change_in_balance(self) -> float:
+        """Изменение за период: поступления + расходы (расходы < 0)"""
+        return self.inflows + self.outflows
+
+    @property
+    def end_balance(self) -> float:
+        """Конечное сальдо"""
+        return self.start_balance + self.change_in_balance
+
+    # --- Фабричные методы и DTO-методы ---
+
+    @staticmethod
+    def create(storage: StorageModel | None, group: ProductGroupModel | None,
+               unit: MeasurementUnitModel) -> 'TurnoverRollupItem':
+        """
+        Фабричный метод для создания пустой итоговой строки.
+        """
+        item = TurnoverRollupItem()
+        item.storage = storage
+        item.group = group
+        item.unit = unit
+        return item
+
+    @staticmethod
+    def from_dto(dto: TurnoverRollupItemDto, cache: dict) -> 'TurnoverRollupItem':
+        """
+            Фабричный метод для создания экземпляра TurnoverRollupItem из dto
+        """
+        item = TurnoverRollupItem()
+        item.id = dto.id
+        item.products_count = dto.products_count
+        item.start_balance = dto.start_balance
+        item.inflows = dto.inflows
+        item.outflows = dto.outflows
+
+        if dto.storage is not None:
+            item.storage = cache[dto.storage.id]
+        if dto.group is not None:
+            item.group = cache[dto.group.id]
+        if dto.unit is not None:
+            item.unit = cache[dto.unit.id]
+
+        return item
+
+    def to_dto(self) -> TurnoverRollupItemDto:
+        """
+        Перевести доменную модель в DTO
+        """
+        return TurnoverRollupItemDto(
+            id=self._id,
+            storage=self._storage and CachedId(self._storage.id),
+            group=self._group and CachedId(self._group.id),
+            unit=self._unit and CachedId(self._unit.id),
+            products_count=self._products_count,
+            start_balance=self._start_balance,
+            inflows=self._inflows,
+            outflows=self._outflows
+        )
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from src.dto.cached_id import CachedId
+from src.dto.tbs_series_dto import TurnoverSeriesItemDto
+from src.models.measurement_unit import MeasurementUnitModel
+from src.models.product import ProductModel
+from src.models.storage import StorageModel
+from src.models.tbs_item import TurnoverBalanceItem
+from src.models.validators.decorators import validate_setter
+
+
+# Элемент временного ряда оборотов: обороты пары (склад, продукт) за интервал [period_start, period_end)
+class TurnoverSeriesItem(TurnoverBalanceItem):
+    def __init__(self):
+        super().__init__()
+
+    # соответствующий модели dto класс
+    DTO_CLASS = TurnoverSeriesItemDto
+
+    _period_start: datetime = None
+    _period_end: datetime = None
+
+    # --- Начало интервала ---
+    @property
+    def period_start(self) -> datetime:
+        return self._period_start
+
+    @period_start.setter
+    @validate_setter(datetime)
+    def period_start(self, value: datetime):
+        self._period_start = value
+
+    # --- Конец интервала (не включительно) ---
+    @property
+    def period_end(self) -> datetime:
+        return self._period_end
+
+    @period_end.setter
+    @validate_setter(datetime)
+    def period_end(self, value: datetime):
+        self._period_end = value
+
+    # --- Фабричные методы и DTO-методы ---
+
+    @staticmethod
+    def create(
+        storage: StorageModel | None,
+        product: ProductModel,
+        unit: MeasurementUnitModel,
+        period_start: datetime,
+        period_end: datetime,
+        start_balance: float = 0.0,
+        inflows: float = 0.0,
+        outflows: float = 0.0
+    ) -> 'TurnoverSeriesItem':
+        """
+        Фабричный метод для создания экземпляра TurnoverSeriesItem.
+        """
+        item = TurnoverSeriesItem()
+        item.storage = storage
+        item.product = product
+        item.unit = unit
+        item.period_start = period_start
+        item.period_end = period_end
+        item.start_balance = start_balance
+        item.inflows = inflows
+        item.outflows = outflows
+        return item
+
+    @staticmethod
+    def from_dto(dto: TurnoverSeriesItemDto, cache: dict) -> 'TurnoverSeriesItem':
+        """
+            Фабричный метод для создания экземпляра TurnoverSeriesItem из dto
+        """
+        item = TurnoverSeriesItem()
+        item.id = dto.id
+        item.period_start = datetime.fromisoformat(dto.period_start)
+        item.period_end = datetime.fromisoformat(dto.period_end)
+        item.start_balance = dto.start_balance
+        item.inflows = dto.inflows
+        item.outflows = dto.outflows
+
+        if dto.storage is not None:
+            item.storage = cache[dto.storage.id]
+        if dto.product is not None:
+            item.product = cache[dto.product.id]
+        if dto.unit is not None:
+            item.unit = cache[dto.unit.id]
+
+        return item
+
+    def to_dto(self) -> TurnoverSeriesItemDto:
+        """
+        Перевести доменную модель в DTO
+        """
+        return TurnoverSeriesItemDto(
+            id=self._id,
+            storage=self._storage and CachedId(self._storage.id),
+            product=self._product and CachedId(self._product.id),
+            unit=self._unit and CachedId(self._unit.id),
+            start_balance=self._start_balance,
+            inflows=self._inflows,
+            outflows=self._outflows,
+            period_start=self._period_start.isoformat(),
+            period_end=self._period_end.isoformat()
+        )
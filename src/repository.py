@@ -1,7 +1,15 @@
 from dataclasses import asdict
 from enum import StrEnum
 
+from src.core.event_type import EventType
+from src.core.abstract_index import AbstractIndex
+from src.core.hash_index import HashIndex
+from src.core.indexed_list import IndexedList
+from src.core.model_statistics import ModelStatistics
+from src.core.range_index import RangeIndex
+from src.core.observe_service import ObserveService
 from src.core.singletone import Singleton
+from src.core.sorted_list import SortedList
 from src.models.abstract_model import AbstractModel
 
 
@@ -18,6 +26,7 @@ class RepoKeys(StrEnum):
     STORAGES = "storages"
     TRANSACTIONS = "transactions"
     PRODUCT_REMAINS = "product_remains"
+    REMAINS_CHECKPOINTS = "remains_checkpoints"
 
 
 class Repository(metaclass=Singleton):
@@ -32,6 +41,24 @@ class Repository(metaclass=Singleton):
     # ключ для сохранения в конфиг
     CONFIG_KEY = 'models'
 
+    # Ключи, модели которых дополнительно хранятся упорядоченными по полю (для фильтров по диапазону)
+    _sorted_fields = {RepoKeys.TRANSACTIONS: "period"}
+
+    # Вторичные хеш-индексы по полям моделей (для фильтров ==, in, notin)
+    _indexed_fields = {
+        RepoKeys.PRODUCTS: ("group.id", "unit.id"),
+        RepoKeys.TRANSACTIONS: ("product.id", "storage.id"),
+        RepoKeys.PRODUCT_REMAINS: ("product.id", "storage.id"),
+    }
+
+    # Вторичные упорядоченные индексы по числовым полям и датам (для фильтров <, <=, >, >=)
+    _range_fields = {
+        RepoKeys.MEASUREMENT_UNITS: ("conversion_factor",),
+        RepoKeys.TRANSACTIONS: ("value",),
+        RepoKeys.PRODUCT_REMAINS: ("value",),
+        RepoKeys.REMAINS_CHECKPOINTS: ("period", "value"),
+    }
+
     def __init__(self):
         """
         Инициализация репозитория.
@@ -40,6 +67,14 @@ class Repository(metaclass=Singleton):
         self.__data = {}
         for key in RepoKeys:
             self.__data[str(key)] = {}  # ключи хранятся как строки
+        self.__sorted = {str(key): SortedList(field=field) for key, field in self._sorted_fields.items()}
+        self.__indexes: dict[str, dict[str, AbstractIndex]] = {}
+        for key, fields in self._indexed_fields.items():
+            self.__indexes.setdefault(str(key), {}).update({field: HashIndex(field) for field in fields})
+        for key, fields in self._range_fields.items():
+            self.__indexes.setdefault(str(key), {}).update({field: RangeIndex(field) for field in fields})
+        # Статистика полей для планировщика фильтров
+        self.__statistics = {str(key): ModelStatistics(self.__data[str(key)]) for key in RepoKeys}
 
     @property
     def data(self) -> dict[str, dict]:
@@ -49,11 +84,68 @@ class Repository(metaclass=Singleton):
         """
         return self.__data
 
+    def indexes(self, key) -> dict[str, AbstractIndex]:
+        """
+            Вторичные индексы по ключу {поле: HashIndex или RangeIndex} (пустой словарь, если индексов нет).
+        """
+        return self.__indexes.get(key, {})
+
+    def statistics(self, key) -> ModelStatistics:
+        """
+            Статистика полей моделей по ключу (количество различных значений, минимум, максимум).
+        """
+        return self.__statistics[key]
+
     def get_values(self, key) -> list:
         """
-            Получить список всех значений по ключу из репозитория
+            Получить список всех значений по ключу из репозитория.
+            Для ключей из _sorted_fields возвращается копия SortedList, упорядоченная по полю.
+            Список (IndexedList) содержит индексы репозитория (для ключей из _indexed_fields и _range_fields)
+            и статистику полей.
+        """
+        indexes = self.indexes(key)
+        if key in self.__sorted:
+            ordered = self.__sorted[key]
+            return SortedList(ordered, ordered.field, indexes, self.__statistics[key])
+        return IndexedList(self.data[key].values(), indexes, self.__statistics[key])
+
+    def add(self, key, model: AbstractModel):
+        """
+            Добавить модель в репозиторий по ключу и оповестить слушателей (EventType.ADD_MODEL).
+            Если модель с таким id уже есть, она предварительно удаляется.
+        """
+        if model.id in self.__data[key]:
+            self.delete(key, model.id)
+        self.__data[key][model.id] = model
+        if key in self.__sorted:
+            self.__sorted[key].insert_sorted(model)
+        for index in self.indexes(key).values():
+            index.add(model)
+        self.__statistics[key].changed()
+        ObserveService.create_event(EventType.ADD_MODEL, {"key": key, "model": model})
+
+    def delete(self, key, model_id: str) -> AbstractModel:
+        """
+            Удалить модель из репозитория по ключу и id и оповестить слушателей (EventType.DELETE_MODEL).
+            Возвращает удалённую модель.
+        """
+        model = self.__data[key].pop(model_id)
+        if key in self.__sorted:
+            self.__sorted[key].remove_sorted(model)
+        for index in self.indexes(key).values():
+            index.remove(model)
+        self.__statistics[key].changed()
+        ObserveService.create_event(EventType.DELETE_MODEL, {"key": key, "model": model})
+        return model
+
+    def replace(self, key, models: dict):
+        """
+            Заменить все модели по ключу на переданный словарь {id: модель}
         """
-        return list(self.data[key].values())
+        for model_id in list(self.__data[key].keys()):
+            self.delete(key, model_id)
+        for model in models.values():
+            self.add(key, model)
 
     def dump(self) -> dict:
         """
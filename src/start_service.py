@@ -9,6 +9,7 @@ from src.models.product import ProductModel
 from src.models.product_group import ProductGroupModel
 from src.models.product_remain import ProductRemainModel
 from src.models.recipe import RecipeModel
+from src.models.remain_checkpoint import RemainCheckpointModel
 from src.models.storage import StorageModel
 from src.models.transaction import TransactionModel
 
@@ -68,13 +69,14 @@ class StartService(metaclass=Singleton):
         :param model_type: класс Model, которая будет создана (наследник AbstractModel)
         :param dto_type: класс Dto, которая будет создана (наследник AbstractDto)
         """
-        for data in self.__loaded_data[key]:
+        # Ключа может не быть в файлах, сохранённых до его появления
+        for data in self.__loaded_data.get(key, []):
             dto: AbstractDto = create_dto(dto_type, data)
             if dto.id in self.__cached_models:
                 continue
             model: AbstractModel = model_type.from_dto(dto, self.__cached_models)
             self.__cached_models[model.id] = model
-            self.repo.data[key][model.id] = model
+            self.repo.add(key, model)
 
     def load(self, filepath):
         """
@@ -102,6 +104,7 @@ class StartService(metaclass=Singleton):
             (RepoKeys.STORAGES, StorageModel),
             (RepoKeys.TRANSACTIONS, TransactionModel),
             (RepoKeys.PRODUCT_REMAINS, ProductRemainModel),
+            (RepoKeys.REMAINS_CHECKPOINTS, RemainCheckpointModel),
         ]
 
         for repo_key, model_class in entities_to_load:
@@ -2,6 +2,7 @@ from datetime import datetime
 
 import pytest
 
+from src.core.functions import get_fields
 from src.logics.converters.basic_converter import BasicConverter
 from src.logics.converters.datetime_converter import DatetimeConverter
 from src.logics.converters.dict_converter import DictConverter
@@ -9,7 +10,10 @@ from src.logics.converters.iterable_converter import IterableConverter
 from src.logics.converters.model_converter import ModelConverter
 from src.logics.factory_converters import FactoryConverters
 from src.models.measurement_unit import MeasurementUnitModel
+from src.models.tbs_item import TurnoverBalanceItem
 from src.models.validators.exceptions import ArgumentException
+from src.repository import RepoKeys
+from src.start_service import StartService
 
 
 @pytest.fixture
@@ -213,5 +217,41 @@ def test_factory_converters_convert_list_of_ints():
     # Проверка
     assert result == [1, 2, 3]
 
+
+def convert_with_reflection(obj):
+    """Конвертация с get_fields для каждого объекта (исходная реализация ModelConverter)"""
+    if isinstance(obj, (bool, int, float, str, type(None))):
+        return obj
+    if isinstance(obj, datetime):
+        return obj.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(obj, dict):
+        return {key: convert_with_reflection(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [convert_with_reflection(item) for item in obj]
+    return {key: convert_with_reflection(value) for key, value in get_fields(obj).items()}
+
+
+def test_factory_converters_compiled_same_as_reflection():
+    """
+    Тест проверяет, что функции конвертации, скомпилированные для классов моделей,
+    дают тот же результат, что и конвертация с get_fields для каждого объекта,
+    и что конвертер и функция конвертации создаются один раз для типа.
+    """
+    # Подготовка
+    service = StartService('../settings.json')
+    transaction = service.repo.get_values(RepoKeys.TRANSACTIONS)[0]
+    item = TurnoverBalanceItem.create(transaction.storage, transaction.product, transaction.unit)
+    data = [service.repo.data, item, (transaction, {"nested": [transaction.period]})]
+
+    # Действие
+    result = FactoryConverters.convert(data)
+
+    # Проверки
+    assert result == convert_with_reflection(data)
+    assert ModelConverter().convert(item) == convert_with_reflection(item)
+    assert FactoryConverters.get_converter(type(item)) is FactoryConverters.get_converter(type(item))
+    assert FactoryConverters.serializer(type(item)) is FactoryConverters.serializer(type(item))
+
+
 if __name__ == "__main__":
-    pytest.main(['-v'])
\ No newline at end of file
+    pytest.main(['-v'])
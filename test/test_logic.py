@@ -2,19 +2,41 @@ from datetime import datetime
 
 import pytest
 
+from src.core.abstract_listener import AbstractListener
+from src.core.aggregator import Aggregator
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.prototype import Prototype
+from src.dto.aggregate_dto import AggregateDto
 from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
 from src.dto.filter_tbs_dto import FilterTbsDto
+from src.dto.functions import create_dto
+from src.dto.sorting_dto import SortingDto
+from src.logics.balance_index import BalanceIndex
 from src.logics.factory_entities import FactoryEntities
+from src.logics.name_search import NameSearch
+from src.logics.remains_checkpoints import RemainsCheckpoints
 from src.logics.responses.abstract_response import AbstractResponse
 from src.logics.responses.csv_response import CsvResponse
 from src.logics.responses.response_format import ResponseFormat
+from src.logics.tbs_cache import TbsCache
+from src.logics.tbs_engines.hash_tbs_engine import HashTbsEngine
+from src.logics.tbs_engines.parallel_tbs_engine import ParallelTbsEngine
+from src.logics.tbs_engines.prefix_index_tbs_engine import PrefixIndexTbsEngine
+from src.logics.tbs_engines.prototype_tbs_engine import PrototypeTbsEngine
+from src.logics.tbs_engines.vectorized_tbs_engine import VectorizedTbsEngine
+from src.logics.transaction_columns import TransactionColumns
 from src.logics.turnover_balance_sheet import TurnoverBalanceSheet
+from src.logics.turnover_period import TurnoverPeriod
+from src.logics.unit_normalizer import UnitNormalizer
 from src.models.measurement_unit import MeasurementUnitModel
 from src.models.product import ProductModel
 from src.models.product_group import ProductGroupModel
 from src.models.product_remain import ProductRemainModel
 from src.models.storage import StorageModel
 from src.models.transaction import TransactionModel
+from src.repository import RepoKeys, Repository
 
 
 @pytest.fixture
@@ -340,5 +362,734 @@ def test_tbs_calculation_date_boundary(storage_a, product_a, base_unit, all_prod
     assert item_a.end_balance == 10.0
 
 
+def tbs_items_to_tuples(items) -> set:
+    """Переводит элементы ведомости в множество кортежей для сравнения без учёта порядка."""
+    return {
+        (item.storage and item.storage.id, item.product.id, item.unit.id,
+         item.start_balance, item.inflows, item.outflows)
+        for item in items
+    }
+
+
+def create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg) -> list[TransactionModel]:
+    """Создаёт набор транзакций по двум складам и продуктам в разных единицах измерения."""
+    return [
+        TransactionModel.create(datetime(2023, 12, 15), 2.0, kg, product_a, storage_a),
+        TransactionModel.create(datetime(2024, 1, 10), 500.0, gr, product_a, storage_a),
+        TransactionModel.create(datetime(2024, 1, 12), -0.25, kg, product_a, storage_a),
+        TransactionModel.create(datetime(2024, 1, 15), 5.0, gr, product_a, storage_b),
+        TransactionModel.create(datetime(2023, 12, 1), 3.0, gr, product_b, storage_b),
+        TransactionModel.create(datetime(2024, 1, 20), -1.0, gr, product_b, storage_b),
+        TransactionModel.create(datetime(2024, 2, 1), 999.0, gr, product_b, storage_a),
+    ]
+
+
+def test_tbs_calculate_hash_engine_same_as_prototype_engine(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что HashTbsEngine выдаёт те же элементы ведомости, что и исходный PrototypeTbsEngine:
+    перекрёстные пары (склад, продукт), пересчёт в базовые единицы, остатки и продукты без движений.
+    """
+    # Подготовка
+    START_DATE = datetime(2024, 1, 1)
+    END_DATE = datetime(2024, 1, 31)
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    remains = [
+        ProductRemainModel.create(7.0, gr, product_a, storage_a),
+        ProductRemainModel.create(1.0, gr, product_b, None),
+    ]
+
+    # Действие
+    prototype_result = TurnoverBalanceSheet.calculate(
+        create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg),
+        all_products, FilterTbsDto(), START_DATE, END_DATE,
+        product_remains=remains, engine=PrototypeTbsEngine())
+    hash_result = TurnoverBalanceSheet.calculate(
+        create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg),
+        all_products, FilterTbsDto(), START_DATE, END_DATE,
+        product_remains=remains, engine=HashTbsEngine())
+
+    # Проверки
+    assert len(hash_result) == 4
+    assert tbs_items_to_tuples(hash_result) == tbs_items_to_tuples(prototype_result)
+    item = next(item for item in hash_result if item.product == product_a and item.storage == storage_a)
+    assert item.start_balance == 2007.0
+    assert item.inflows == 500.0
+    assert item.outflows == -250.0
+
+
+def test_tbs_calculate_repeatable_transactions_not_changed(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что повторный расчёт ведомости даёт тот же результат,
+    а исходные транзакции не переводятся в базовые единицы (значения и единицы не меняются).
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    before = [(trans.value, trans.unit.id) for trans in transactions]
+
+    # Действие
+    first = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(), datetime(2024, 1, 1), datetime(2024, 1, 31))
+    second = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(), datetime(2024, 1, 1), datetime(2024, 1, 31))
+
+    # Проверки
+    assert tbs_items_to_tuples(first) == tbs_items_to_tuples(second)
+    assert [(trans.value, trans.unit.id) for trans in transactions] == before
+
+
+def test_unit_normalizer_normalize_cache_reset_on_unit_change():
+    """
+    Проверяет, что UnitNormalizer возвращает коэффициент к корневой единице
+    и пересчитывает его после изменения коэффициента промежуточной единицы.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    ton = MeasurementUnitModel.create('ton', 1000.0, kg)
+    normalizer = UnitNormalizer()
+
+    # Действие
+    factor_before, base_before = normalizer.normalize(ton)
+    kg.conversion_factor = 100.0
+    factor_after, base_after = normalizer.normalize(ton)
+
+    # Проверки
+    assert factor_before == 1000000.0
+    assert base_before is gr
+    assert factor_after == 100000.0
+    assert base_after is gr
+
+
+# Слушатель, запоминающий полученные события
+class EventsRecorder(AbstractListener):
+    def __init__(self):
+        self.events = []
+
+    def handle(self, event: EventType, params):
+        self.events.append((event, params))
+
+
+def test_measurement_unit_change_event_only_on_real_change():
+    """
+    Проверяет, что EventType.CHANGE_UNIT рассылается только при изменении пересчёта
+    уже созданной единицы измерения, а не при её создании или присваивании прежнего значения.
+    """
+    # Подготовка
+    recorder = EventsRecorder()
+    ObserveService.add(recorder)
+    try:
+        # Действие
+        gr = MeasurementUnitModel.create('gr')
+        kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+        MeasurementUnitModel.from_dto(kg.to_dto(), {gr.id: gr})
+        kg.conversion_factor = 1000.0
+        kg.base_unit = gr
+        created_events = list(recorder.events)
+        kg.conversion_factor = 100.0
+        kg.base_unit = None
+    finally:
+        ObserveService.delete(recorder)
+
+    # Проверки
+    assert created_events == []
+    assert recorder.events == [(EventType.CHANGE_UNIT, {"model": kg})] * 2
+
+
+def test_tbs_calculate_vectorized_engine_same_as_hash_engine(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что VectorizedTbsEngine выдаёт те же элементы ведомости, что и HashTbsEngine,
+    в том числе с фильтром транзакций по складу и датой блокировки.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    remains = [ProductRemainModel.create(7.0, gr, product_a, storage_a)]
+    dtos = [
+        FilterTbsDto(),
+        FilterTbsDto(transaction_filters=[FilterDto(field_name="storage", value=storage_b)]),
+        FilterTbsDto(transaction_filters=[FilterDto(field_name="product.id", value=[product_b.id], op="notin")]),
+    ]
+
+    for dto in dtos:
+        # Действие
+        hash_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                     datetime(2024, 1, 31), datetime(2023, 12, 10), remains,
+                                                     engine=HashTbsEngine())
+        vectorized_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                           datetime(2024, 1, 31), datetime(2023, 12, 10), remains,
+                                                           engine=VectorizedTbsEngine(TransactionColumns(transactions)))
+
+        # Проверки
+        assert tbs_items_to_tuples(vectorized_result) == tbs_items_to_tuples(hash_result)
+
+
+def test_tbs_calculate_filter_expression_same_in_all_engines(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что дерево фильтров транзакций (or, not) даёт одинаковую ведомость во всех движках
+    и совпадает с ведомостью по эквивалентному списку фильтров.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    either_storage = FilterExpressionDto(op="or", filters=[FilterDto(field_name="storage", value=storage_a),
+                                                           FilterDto(field_name="storage.id", value=storage_b.id)])
+    not_product_b = FilterExpressionDto(op="not", filters=[FilterDto(field_name="product", value=product_b)])
+    dto = FilterTbsDto(transaction_where=FilterExpressionDto(expressions=[either_storage, not_product_b]))
+    expected_dto = FilterTbsDto(transaction_filters=[FilterDto(field_name="product.id", value=[product_b.id], op="notin")])
+    engines = [HashTbsEngine(), PrototypeTbsEngine(), VectorizedTbsEngine(TransactionColumns(transactions)),
+               PrefixIndexTbsEngine(BalanceIndex(transactions))]
+
+    # Действие
+    expected = TurnoverBalanceSheet.calculate(transactions, all_products, expected_dto, datetime(2024, 1, 1),
+                                              datetime(2024, 1, 31), engine=HashTbsEngine())
+    results = [TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                              datetime(2024, 1, 31), engine=engine) for engine in engines]
+
+    # Проверки
+    assert all(item.product.id != product_b.id or item.storage is None for item in expected)
+    for result in results:
+        assert tbs_items_to_tuples(result) == tbs_items_to_tuples(expected)
+    assert TbsCache.make_key(dto, datetime(2024, 1, 1), datetime(2024, 1, 31)) != \
+           TbsCache.make_key(FilterTbsDto(), datetime(2024, 1, 1), datetime(2024, 1, 31))
+
+
+def test_aggregate_columns_same_as_aggregator(storage_a, storage_b, product_a, product_b):
+    """
+    Проверяет, что агрегация транзакций над столбцами (TransactionColumns) совпадает с агрегацией
+    за один проход по моделям (Aggregator) над транзакциями, упорядоченными по дате (как в репозитории),
+    включая порядок строк, а неподдерживаемая группировка возвращает None.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    columns = TransactionColumns(transactions)
+    aggregates = [AggregateDto(field_name="value", func=func) for func in ("sum", "min", "max", "avg")]
+    aggregates += [AggregateDto(func="count"), AggregateDto(field_name="value", func="count", name="values")]
+    filters = [FilterDto(field_name="period", value=datetime(2024, 1, 31), op="<=")]
+    cases = [[], ["storage"], ["storage.id", "product"], ["product.id", "unit"]]
+
+    for group_by in cases:
+        # Действие
+        by_period = sorted(transactions, key=lambda item: item.period)
+        expected = Aggregator.aggregate(Prototype(by_period).lazy().filter_mul(filters), group_by, aggregates)
+        result = columns.aggregate(filters, None, group_by, aggregates)
+
+        # Проверки
+        assert len(result) == len(expected)
+        for row, expected_row in zip(result, expected):
+            assert row.keys() == expected_row.keys()
+            for name, value in expected_row.items():
+                assert row[name] == (pytest.approx(value) if isinstance(value, float) else value)
+
+    by_storage = {row["storage"].id: row for row in columns.aggregate(filters, None, ["storage"], aggregates)}
+    assert by_storage[storage_b.id]["count"] == 3
+    assert by_storage[storage_b.id]["sum_value"] == pytest.approx(7.0)
+    assert by_storage[storage_a.id]["avg_value"] == pytest.approx((2.0 + 500.0 - 0.25) / 3)
+    assert columns.aggregate(filters, None, ["product.name"], aggregates) is None
+
+
+def test_name_search_ranked_and_synchronized_with_events(base_unit):
+    """
+    Проверяет, что поиск по наименованиям находит те же модели, что и просмотр подстрок,
+    ранжирует совпадения (полное, начало, начало слова, подстрока) и переиндексирует модели
+    по событиям репозитория и изменения наименования.
+    """
+    # Подготовка
+    group = ProductGroupModel.create("Мучные изделия")
+    names = ["Мука", "Мука ржаная", "Пшеничная мука", "Блинная смесь", "Ёлочная игрушка", "Молоко 3.2%"]
+    products = [ProductModel.create(name, unit=base_unit, group=group) for name in names]
+    products += [ProductModel.create(f"Продукт {number}", unit=base_unit, group=group) for number in range(200)]
+    search = NameSearch()
+    for product in products:
+        search.handle(EventType.ADD_MODEL, {"key": RepoKeys.PRODUCTS, "model": product})
+    search.handle(EventType.ADD_MODEL, {"key": RepoKeys.PRODUCT_GROUPS, "model": group})
+    queries = ("мук", "укт 1", "лочн", "3.2", "продукт 19")
+    expected = {query: {product.id for product in products if query in product.name.lower().replace("ё", "е")}
+                for query in queries}
+
+    # Действие
+    ranked = [model.name for model in search.search("МУКА")]
+    found = {query: {model.id for model in search.search(query, [RepoKeys.PRODUCTS], limit=1000)}
+             for query in queries}
+    ObserveService.add(search)
+    try:
+        products[0].name = "Крупа"
+        group.name = "Крупы"
+    finally:
+        ObserveService.delete(search)
+    search.handle(EventType.DELETE_MODEL, {"key": RepoKeys.PRODUCTS, "model": products[1]})
+
+    # Проверки
+    assert ranked == ["Мука", "Мука ржаная", "Пшеничная мука"]
+    assert [model.name for model in search.search("ел")] == ["Ёлочная игрушка"]
+    assert found == expected
+    assert [model.name for model in search.search("мука")] == ["Пшеничная мука"]
+    assert [model.name for model in search.search("круп")] == ["Крупа", "Крупы"]
+
+
+def test_change_name_event_only_on_rename(base_unit):
+    """
+    Проверяет, что EventType.CHANGE_NAME рассылается только при переименовании созданной модели,
+    а не при создании модели фабричными методами или присваивании прежнего наименования.
+    """
+    # Подготовка
+    recorder = EventsRecorder()
+    ObserveService.add(recorder)
+    try:
+        # Действие
+        group = ProductGroupModel.create("Мучные изделия")
+        product = ProductModel.create("Мука", "Мука пшеничная", base_unit, group)
+        ProductModel.from_dto(product.to_dto(), {base_unit.id: base_unit, group.id: group})
+        ProductGroupModel.from_dto(group.to_dto(), {})
+        product.name = "Мука"
+        created_events = list(recorder.events)
+        product.full_name = "Мука ржаная"
+        group.name = "Крупы"
+    finally:
+        ObserveService.delete(recorder)
+
+    # Проверки
+    assert created_events == []
+    assert recorder.events == [(EventType.CHANGE_NAME, {"model": product}), (EventType.CHANGE_NAME, {"model": group})]
+
+
+def test_transaction_columns_handle_synchronized_with_events(storage_a, product_a, base_unit):
+    """
+    Проверяет, что TransactionColumns синхронизируется по событиям репозитория
+    (добавление и удаление транзакции) и изменения единицы измерения.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    first = TransactionModel.create(datetime(2024, 1, 1), 1.0, kg, product_a, storage_a)
+    second = TransactionModel.create(datetime(2024, 1, 2), 2.0, base_unit, product_a, storage_a)
+    third = TransactionModel.create(datetime(2024, 1, 3), 3.0, kg, product_a, storage_a)
+    columns = TransactionColumns([first, second])
+
+    # Действие
+    columns.handle(EventType.ADD_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": third})
+    columns.handle(EventType.DELETE_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": first})
+    kg.conversion_factor = 100.0
+    columns.handle(EventType.CHANGE_UNIT, {"model": kg})
+
+    # Проверки
+    assert columns.size == 2
+    assert [model.id for model in columns.models] == [third.id, second.id]
+    assert list(columns.value) == [3.0, 2.0]
+    assert list(columns.factor) == [100.0, 1.0]
+    assert columns.period[0] == TransactionColumns.to_timestamp(datetime(2024, 1, 3))
+
+
+def test_tbs_calculate_index_engine_same_as_hash_engine(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что PrefixIndexTbsEngine выдаёт те же элементы ведомости, что и HashTbsEngine,
+    для фильтров, поддерживаемых индексом, и для остальных фильтров (расчёт передаётся HashTbsEngine).
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    remains = [ProductRemainModel.create(7.0, gr, product_a, storage_a)]
+    index = BalanceIndex(transactions)
+    dtos = [
+        FilterTbsDto(),
+        FilterTbsDto(transaction_filters=[FilterDto(field_name="storage", value=storage_b)]),
+        FilterTbsDto(transaction_filters=[FilterDto(field_name="product.id", value=product_a.id)]),
+        FilterTbsDto(transaction_filters=[FilterDto(field_name="product.id", value=[product_b.id], op="notin")]),
+    ]
+
+    for dto in dtos:
+        # Действие
+        hash_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                     datetime(2024, 1, 31), datetime(2023, 12, 10), remains,
+                                                     engine=HashTbsEngine())
+        index_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                      datetime(2024, 1, 31), datetime(2023, 12, 10), remains,
+                                                      engine=PrefixIndexTbsEngine(index))
+
+        # Проверки
+        assert tbs_items_to_tuples(index_result) == tbs_items_to_tuples(hash_result)
+
+
+def test_tbs_calculate_index_engine_period_before_block_date(storage_a, product_a, base_unit, all_products):
+    """
+    Проверяет, что при начале периода раньше даты блокировки PrefixIndexTbsEngine не учитывает
+    в оборотах транзакции до даты блокировки (как HashTbsEngine).
+    """
+    # Подготовка
+    BLOCK_DATE = datetime(2024, 2, 1)
+    transactions = [
+        TransactionModel.create(datetime(2024, 1, 2), 5.0, base_unit, product_a, storage_a),
+        TransactionModel.create(datetime(2024, 2, 2), 3.0, base_unit, product_a, storage_a),
+        TransactionModel.create(datetime(2024, 2, 3), -1.0, base_unit, product_a, storage_a),
+    ]
+
+    # Действие
+    hash_result = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(), datetime(2024, 1, 1),
+                                                 datetime(2024, 2, 28), BLOCK_DATE, engine=HashTbsEngine())
+    index_result = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(), datetime(2024, 1, 1),
+                                                  datetime(2024, 2, 28), BLOCK_DATE,
+                                                  engine=PrefixIndexTbsEngine(BalanceIndex(transactions)))
+
+    # Проверки
+    assert tbs_items_to_tuples(index_result) == tbs_items_to_tuples(hash_result)
+    item = next(item for item in index_result if item.product == product_a)
+    assert item.inflows == 3.0
+    assert item.outflows == -1.0
+
+
+def test_tbs_calculate_index_engine_filters_from_json(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что PrefixIndexTbsEngine принимает фильтры из JSON (create_dto): id строкой в полях
+    storage и storage.id, и выдаёт те же элементы ведомости, что и HashTbsEngine.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    index = BalanceIndex(transactions)
+    dtos = [create_dto(FilterTbsDto, {"transaction_filters": [{"field_name": field_name, "value": storage_a.id,
+                                                               "op": "=="}]})
+            for field_name in ("storage", "storage.id")]
+
+    for dto in dtos:
+        # Действие
+        hash_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                     datetime(2024, 1, 31), engine=HashTbsEngine())
+        index_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                      datetime(2024, 1, 31), engine=PrefixIndexTbsEngine(index))
+
+        # Проверки
+        assert tbs_items_to_tuples(index_result) == tbs_items_to_tuples(hash_result)
+    assert any(item.storage == storage_a for item in index_result)
+
+
+def test_balance_index_handle_synchronized_with_events(storage_a, product_a, base_unit):
+    """
+    Проверяет, что BalanceIndex учитывает транзакции, пришедшие не по порядку дат,
+    удаление транзакции и изменение единицы измерения.
+    """
+    # Подготовка
+    kg = MeasurementUnitModel.create('kg', 1000.0, base_unit)
+    first = TransactionModel.create(datetime(2024, 1, 5), 1.0, kg, product_a, storage_a)
+    second = TransactionModel.create(datetime(2024, 1, 10), -200.0, base_unit, product_a, storage_a)
+    earlier = TransactionModel.create(datetime(2024, 1, 1), 300.0, base_unit, product_a, storage_a)
+    index = BalanceIndex([first, second])
+
+    # Действие
+    index.handle(EventType.ADD_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": earlier})
+    before_delete = index.query(datetime(2024, 1, 5), datetime(2024, 1, 31))
+    index.handle(EventType.DELETE_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": second})
+    kg.conversion_factor = 100.0
+    index.handle(EventType.CHANGE_UNIT, {"model": kg})
+    after_delete = index.query(datetime(2024, 1, 5), datetime(2024, 1, 31))
+
+    # Проверки
+    key = (storage_a.id, product_a.id)
+    assert index.series(*key).days == [datetime(2024, 1, day).toordinal() for day in (1, 5)]
+    assert before_delete[key] == (300.0, 1000.0, -200.0)
+    assert after_delete[key] == (300.0, 100.0, 0.0)
+
+
+def remains_to_tuples(remains: dict) -> set:
+    """Переводит ненулевые остатки в множество кортежей для сравнения без учёта порядка."""
+    return {
+        (model.storage and model.storage.id, model.product.id, model.unit.id, model.value)
+        for model in remains.values() if model.value != 0
+    }
+
+
+def test_calculate_remains_checkpoints_same_as_full_calculation(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что остатки по контрольным точкам совпадают с полным расчётом,
+    в том числе после добавления транзакции раньше существующих контрольных точек.
+    """
+    # Подготовка
+    BLOCK_DATE = datetime(2023, 12, 10)
+    TARGET_DATE = datetime(2024, 1, 25)
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    remains = [ProductRemainModel.create(7.0, gr, product_a, storage_a)]
+    checkpoints = RemainsCheckpoints(transactions)
+    added = TransactionModel.create(datetime(2023, 12, 20), 4.0, gr, product_a, storage_b)
+
+    # Действие
+    first = TurnoverBalanceSheet.calculate_remains(TARGET_DATE, transactions, all_products, BLOCK_DATE, remains,
+                                                   checkpoints=checkpoints)
+    checkpoints.handle(EventType.ADD_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": added})
+    transactions.append(added)
+    second = TurnoverBalanceSheet.calculate_remains(TARGET_DATE, transactions, all_products, BLOCK_DATE, remains,
+                                                    checkpoints=checkpoints)
+    full = TurnoverBalanceSheet.calculate_remains(TARGET_DATE, transactions, all_products, BLOCK_DATE, remains)
+    months = list(checkpoints.checkpoints)
+    checkpoints.clear()
+
+    # Проверки
+    assert months == [RemainsCheckpoints.month_of(datetime(2024, 1, 1))]
+    assert (storage_a.id, product_a.id, gr.id, 2257.0) in remains_to_tuples(first)
+    assert remains_to_tuples(second) == remains_to_tuples(full)
+    assert (storage_b.id, product_a.id, gr.id, 9.0) in remains_to_tuples(second)
+
+
+def test_calculate_remains_pairs_without_transactions(storage_a, storage_b, product_a, product_b, base_unit, all_products):
+    """
+    Проверяет, что остатки пар без транзакций после старой даты блокировки (склад без движений)
+    сохраняются и при полном расчёте, и при расчёте по контрольным точкам.
+    """
+    # Подготовка
+    BLOCK_DATE = datetime(2024, 1, 1)
+    TARGET_DATE = datetime(2024, 3, 15)
+    transactions = [TransactionModel.create(datetime(2024, 1, 10), 5.0, base_unit, product_a, storage_a),
+                    TransactionModel.create(datetime(2024, 2, 10), -2.0, base_unit, product_a, storage_a)]
+    remains = [ProductRemainModel.create(3.0, base_unit, product_a, storage_a),
+               ProductRemainModel.create(10.0, base_unit, product_b, storage_b),
+               ProductRemainModel.create(1.0, base_unit, product_b, storage_b)]
+    checkpoints = RemainsCheckpoints(transactions)
+
+    # Действие
+    full = TurnoverBalanceSheet.calculate_remains(TARGET_DATE, transactions, all_products, BLOCK_DATE, remains)
+    by_checkpoints = TurnoverBalanceSheet.calculate_remains(TARGET_DATE, transactions, all_products, BLOCK_DATE,
+                                                            remains, checkpoints=checkpoints)
+    without_transactions = TurnoverBalanceSheet.calculate_remains(TARGET_DATE, [], all_products, BLOCK_DATE, remains)
+    checkpoints.clear()
+
+    # Проверки
+    expected = {(storage_a.id, product_a.id, base_unit.id, 6.0), (storage_b.id, product_b.id, base_unit.id, 11.0)}
+    assert remains_to_tuples(full) == expected
+    assert remains_to_tuples(by_checkpoints) == expected
+    assert remains_to_tuples(without_transactions) == {(storage_a.id, product_a.id, base_unit.id, 3.0),
+                                                       (storage_b.id, product_b.id, base_unit.id, 11.0)}
+
+
+def test_remains_checkpoints_value_index_updated_by_transaction(storage_a, product_a, base_unit):
+    """
+    Проверяет, что после корректировки контрольных точек транзакцией отбор контрольных точек
+    репозитория по значению (упорядоченный индекс value) совпадает с линейным просмотром.
+    """
+    # Подготовка
+    repo = Repository()
+    transactions = [TransactionModel.create(datetime(2024, 1, 10), 5.0, base_unit, product_a, storage_a)]
+    checkpoints = RemainsCheckpoints(transactions)
+    checkpoints.remains(datetime(2024, 3, 15))
+    added = TransactionModel.create(datetime(2024, 1, 20), 100.0, base_unit, product_a, storage_a)
+    filters = [FilterDto(field_name="value", value=50.0, op=">")]
+
+    # Действие
+    checkpoints.handle(EventType.ADD_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": added})
+    ids = {checkpoint.id for month in checkpoints.checkpoints.values() for checkpoint in month.values()}
+    indexed = [item for item in Prototype(repo.get_values(RepoKeys.REMAINS_CHECKPOINTS)).filter_mul(filters).data
+               if item.id in ids]
+    linear = [item for item in Prototype(list(repo.data[RepoKeys.REMAINS_CHECKPOINTS].values())).filter_mul(filters).data
+              if item.id in ids]
+    checkpoints.clear()
+
+    # Проверки
+    assert sorted(item.value for item in linear) == [105.0, 105.0]
+    assert {item.id for item in indexed} == {item.id for item in linear}
+
+
+def test_tbs_cache_hits_and_invalidation_by_transaction(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что повторный расчёт ведомости берётся из кеша, а добавление транзакции
+    сбрасывает только записи, в фильтры которых она попадает.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    cache = TbsCache(max_size=2)
+    dto_a = FilterTbsDto(transaction_filters=[FilterDto(field_name="storage", value=storage_a)])
+    dto_b = FilterTbsDto(transaction_filters=[FilterDto(field_name="storage.id", value=storage_b.id)])
+    added = TransactionModel.create(datetime(2024, 1, 5), 1.0, gr, product_b, storage_b)
+
+    def calculate(dto):
+        return TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                              datetime(2024, 1, 31), cache=cache)
+
+    # Действие
+    first_a = calculate(dto_a)
+    calculate(dto_b)
+    second_a = calculate(FilterTbsDto(transaction_filters=[FilterDto(field_name="storage", value=storage_a)]))
+    cache.handle(EventType.ADD_MODEL, {"key": RepoKeys.TRANSACTIONS, "model": added})
+    size_after_add = cache.size
+    calculate(dto_a)
+
+    # Проверки
+    assert tbs_items_to_tuples(second_a) == tbs_items_to_tuples(first_a)
+    assert size_after_add == 1
+    assert cache.stats() == {"size": 1, "max_size": 2, "hits": 2, "misses": 2}
+
+
+def test_tbs_calculate_parallel_engine_same_as_hash_engine(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что ParallelTbsEngine (с пулом из двух процессов) выдаёт те же элементы ведомости,
+    что и HashTbsEngine, при разбиении по моделям и по колоночному хранилищу (в том числе с фильтром).
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    remains = [ProductRemainModel.create(7.0, gr, product_a, storage_a)]
+    engines = [ParallelTbsEngine(workers=2), ParallelTbsEngine(workers=2, columns=TransactionColumns(transactions))]
+    dtos = [FilterTbsDto(), FilterTbsDto(transaction_filters=[FilterDto(field_name="product.id", value=product_a.id)])]
+
+    for engine in engines:
+        engine.min_parallel_rows = 0
+        for dto in dtos:
+            # Действие
+            hash_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                         datetime(2024, 1, 31), datetime(2023, 12, 10), remains,
+                                                         engine=HashTbsEngine())
+            parallel_result = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                                             datetime(2024, 1, 31), datetime(2023, 12, 10), remains,
+                                                             engine=engine)
+
+            # Проверки
+            assert tbs_items_to_tuples(parallel_result) == tbs_items_to_tuples(hash_result)
+        engine.close()
+
+
+def test_tbs_calculate_series_buckets_same_as_tbs(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что каждый интервал временного ряда совпадает с ведомостью за этот интервал,
+    а конечное сальдо интервала равно начальному сальдо следующего.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+
+    # Действие
+    series = TurnoverBalanceSheet.calculate_series(transactions, all_products, FilterTbsDto(), datetime(2023, 12, 5),
+                                                   datetime(2024, 1, 31, 23, 59, 59), TurnoverPeriod.MONTH)
+    january = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(), datetime(2024, 1, 1),
+                                             datetime(2024, 1, 31, 23, 59, 59), include_zero_values=False)
+
+    # Проверки
+    assert len(series) == 2 * 3
+    assert [item.period_start for item in series[:2]] == [datetime(2023, 12, 5), datetime(2024, 1, 1)]
+    for previous, current in zip(series[::2], series[1::2]):
+        assert previous.end_balance == current.start_balance
+    assert tbs_items_to_tuples(series[1::2]) == {item for item in tbs_items_to_tuples(january) if any(item[3:])}
+
+
+def test_tbs_calculate_series_pairs_with_remains_only(storage_a, storage_b, product_a, product_b, base_unit,
+                                                     all_products):
+    """
+    Проверяет, что временной ряд содержит пары, у которых есть только остатки на дату блокировки,
+    и что такие пары отбираются фильтром транзакций по складу.
+    """
+    # Подготовка
+    BLOCK_DATE = datetime(2024, 1, 1)
+    transactions = [TransactionModel.create(datetime(2024, 1, 10), 5.0, base_unit, product_a, storage_a)]
+    remains = [ProductRemainModel.create(3.0, base_unit, product_a, storage_a),
+               ProductRemainModel.create(10.0, base_unit, product_b, storage_b)]
+    by_storage = create_dto(FilterTbsDto, {"transaction_filters": [{"field_name": "storage.id", "value": storage_a.id}]})
+    by_period = FilterTbsDto(transaction_filters=[FilterDto(field_name="period", value=BLOCK_DATE, op=">=")])
+    arguments = (datetime(2024, 1, 1), datetime(2024, 2, 29, 23, 59, 59), TurnoverPeriod.MONTH, BLOCK_DATE, remains)
+
+    # Действие
+    series = TurnoverBalanceSheet.calculate_series(transactions, all_products, FilterTbsDto(), *arguments)
+    filtered = TurnoverBalanceSheet.calculate_series(transactions, all_products, by_storage, *arguments)
+    by_period_series = TurnoverBalanceSheet.calculate_series(transactions, all_products, by_period, *arguments)
+
+    # Проверки
+    rows = {(item.storage.id, item.product.id, item.period_start.month): (item.start_balance, item.end_balance)
+            for item in series}
+    assert rows == {(storage_a.id, product_a.id, 1): (3.0, 8.0), (storage_a.id, product_a.id, 2): (8.0, 8.0),
+                    (storage_b.id, product_b.id, 1): (10.0, 10.0), (storage_b.id, product_b.id, 2): (10.0, 10.0)}
+    assert {item.storage.id for item in filtered} == {storage_a.id}
+    assert {item.storage.id for item in by_period_series} == {storage_a.id}
+
+
+def test_tbs_calculate_group_by_rollup(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что группировка ведомости по группе номенклатуры и по складу возвращает
+    итоговые строки с суммами элементов ведомости по продуктам.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    group = ProductGroupModel.create('Группа')
+    product_a.group = group
+    product_b.group = group
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    START_DATE = datetime(2024, 1, 1)
+    END_DATE = datetime(2024, 1, 31)
+
+    # Действие
+    items = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(), START_DATE, END_DATE)
+    by_group = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(group_by=["product.group"]),
+                                              START_DATE, END_DATE)
+    by_storage = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(group_by=["storage"]),
+                                                START_DATE, END_DATE)
+
+    # Проверки
+    assert len(by_group) == 1
+    assert by_group[0].group == group and by_group[0].storage is None and by_group[0].products_count == 2
+    assert by_group[0].end_balance == sum(item.end_balance for item in items)
+    assert {row.storage.id: row.inflows for row in by_storage} == {
+        storage.id: sum(item.inflows for item in items if item.storage == storage) for storage in (storage_a, storage_b)
+    }
+
+
+def test_tbs_calculate_group_by_storage_products_count(storage_a, storage_b, product_a, product_b, base_unit,
+                                                       all_products):
+    """
+    Проверяет, что количество продуктов в итоговой строке склада учитывает только продукты с движениями,
+    а не нулевые пары (склад, продукт), дополняющие ведомость.
+    """
+    # Подготовка
+    transactions = [
+        TransactionModel.create(datetime(2024, 1, 10), 5.0, base_unit, product_a, storage_a),
+        TransactionModel.create(datetime(2024, 1, 12), 3.0, base_unit, product_b, storage_b),
+    ]
+
+    # Действие
+    by_storage = TurnoverBalanceSheet.calculate(transactions, all_products, FilterTbsDto(group_by=["storage"]),
+                                                datetime(2024, 1, 1), datetime(2024, 1, 31))
+
+    # Проверки
+    assert {row.storage.id: row.products_count for row in by_storage} == {storage_a.id: 1, storage_b.id: 1}
+    assert {row.storage.id: row.inflows for row in by_storage} == {storage_a.id: 5.0, storage_b.id: 3.0}
+
+
+def test_tbs_calculate_page_same_as_full_result(storage_a, storage_b, product_a, product_b, all_products):
+    """
+    Проверяет, что страница ведомости (offset, limit) совпадает со срезом полного отсортированного
+    результата - при расчёте без кеша (частичная сортировка) и из кеша.
+    """
+    # Подготовка
+    gr = MeasurementUnitModel.create('gr')
+    kg = MeasurementUnitModel.create('kg', 1000.0, gr)
+    transactions = create_mixed_transactions(storage_a, storage_b, product_a, product_b, gr, kg)
+    sorts = SortingDto(field_names=["end_balance"], descending=True)
+    cache = TbsCache()
+
+    def calculate(offset=0, limit=None, tbs_cache=None):
+        dto = FilterTbsDto(result_sorts=sorts, offset=offset, limit=limit)
+        items = TurnoverBalanceSheet.calculate(transactions, all_products, dto, datetime(2024, 1, 1),
+                                               datetime(2024, 1, 31), cache=tbs_cache)
+        return [(item.storage and item.storage.id, item.product.id, item.end_balance) for item in items]
+
+    # Действие
+    full = calculate()
+    page = calculate(1, 2)
+    cached_full = calculate(tbs_cache=cache)
+    cached_page = calculate(1, 2, cache)
+
+    # Проверки
+    assert len(full) > 3
+    assert page == full[1:3]
+    assert cached_full == full
+    assert cached_page == full[1:3]
+    assert cache.stats()["hits"] == 1
+
+
 if __name__ == "__main__":
     pytest.main(['-v'])
\ No newline at end of file
@@ -1,9 +1,17 @@
+import re
+
 import pytest
 
+from src.core.filter_compiler import FilterCompiler
 from src.core.functions import get_nested_attr
 from src.core.prototype import Prototype
+from src.core.range_index import RangeIndex
+from src.core.sorted_list import SortedList
 from src.dto.filter_dto import FilterDto
+from src.dto.filter_expression_dto import FilterExpressionDto
+from src.dto.sort_field_dto import SortFieldDto
 from src.dto.sorting_dto import SortingDto
+from src.models.validators.exceptions import OperationException
 from src.repository import RepoKeys
 from src.start_service import StartService
 
@@ -136,5 +144,288 @@ def test_prototype_sort_multi_field_nested(service):
 
     assert is_sorted_descending, "Список отсортирован неправильно или не по убыванию."
 
+def test_prototype_filter_sorted_list_same_as_linear():
+    """
+    Тест проверяет, что фильтры сравнения по полю упорядоченного SortedList (двоичный поиск)
+    дают тот же результат, что и последовательная фильтрация обычного списка.
+    """
+    # Подготовка
+    items = [Dummy(value) for value in [5, 1, 3, 3, 8, 1, 7]]
+    ordered = SortedList(field="value")
+    for item in items:
+        ordered.insert_sorted(item)
+    ordered.remove_sorted(items[4])
+
+    for op in ["<", "<=", ">", ">=", "=="]:
+        dto = FilterDto(field_name="value", value=3, op=op)
+
+        # Действие
+        linear = Prototype(sorted(items[:4] + items[5:], key=lambda item: item.value)).filter(dto).data
+        fast = Prototype(ordered).filter(dto).data
+
+        # Проверки
+        assert isinstance(fast, SortedList)
+        assert [item.value for item in fast] == [item.value for item in linear]
+
+
+def test_repository_transactions_sorted_by_period(service):
+    """
+    Тест проверяет, что репозиторий возвращает транзакции упорядоченными по дате.
+    """
+    # Действие
+    transactions = service.repo.get_values(RepoKeys.TRANSACTIONS)
+
+    # Проверки
+    assert isinstance(transactions, SortedList)
+    assert len(transactions) == len(service.repo.data[RepoKeys.TRANSACTIONS])
+    assert [item.period for item in transactions] == sorted(item.period for item in transactions)
+
+
+def test_filter_compiler_predicate_nested_fields():
+    """
+    Тест проверяет, что компилированный предикат объединяет фильтры по вложенным полям
+    логическим И, а неизвестный оператор отклоняется при компиляции.
+    """
+    # Подготовка
+    items = [Dummy(Dummy(value)) for value in [1, 2, 3, 4, 5]]
+    dtos = [FilterDto(field_name="value.value", value=2, op=">"), FilterDto(field_name="value.value", value=5, op="!=")]
+
+    # Действие
+    predicate = FilterCompiler.compile(dtos, Prototype._operator_to_func)
+    result = Prototype(items).filter_mul(dtos).data
+
+    # Проверки
+    assert [item.value.value for item in items if predicate(item)] == [3, 4]
+    assert [item.value.value for item in result] == [3, 4]
+    with pytest.raises(OperationException):
+        FilterCompiler.compile([FilterDto(field_name="value", value=1, op="~")], Prototype._operator_to_func)
+
+
+def test_prototype_filter_hash_index_same_as_linear(service):
+    """
+    Тест проверяет, что отбор по вторичным индексам репозитория (==, in, notin, фильтр по модели)
+    совпадает с линейным просмотром и учитывает удаление и добавление моделей.
+    """
+    # Подготовка
+    repo = service.repo
+    transactions = repo.get_values(RepoKeys.TRANSACTIONS)
+    trans = transactions[len(transactions) // 2]
+    cases = [
+        [FilterDto(field_name="product.id", value=trans.product.id, op="==")],
+        [FilterDto(field_name="storage", value=trans.storage, op="=="), FilterDto(field_name="value", value=0, op=">")],
+        [FilterDto(field_name="product", value=[trans.product], op="in"),
+         FilterDto(field_name="period", value=trans.period, op="<=")],
+        [FilterDto(field_name="product.id", value=[trans.product.id], op="notin")],
+    ]
+
+    # Действие
+    indexed = [Prototype(transactions).filter_mul(dtos).data for dtos in cases]
+    linear = [Prototype(list(transactions)).filter_mul(dtos).data for dtos in cases]
+    repo.delete(RepoKeys.TRANSACTIONS, trans.id)
+    after_delete = Prototype(repo.get_values(RepoKeys.TRANSACTIONS)).filter_mul(cases[0]).data
+    repo.add(RepoKeys.TRANSACTIONS, trans)
+    after_add = Prototype(repo.get_values(RepoKeys.TRANSACTIONS)).filter_mul(cases[0]).data
+
+    # Проверки
+    assert repo.indexes(RepoKeys.TRANSACTIONS)["product.id"].complete
+    for indexed_data, linear_data in zip(indexed, linear):
+        assert [item.id for item in indexed_data] == [item.id for item in linear_data]
+    assert isinstance(indexed[0], SortedList)
+    assert trans.id in [item.id for item in indexed[0]]
+    assert trans.id not in [item.id for item in after_delete]
+    assert [item.id for item in after_add] == [item.id for item in indexed[0]]
+
+
+def test_prototype_filter_in_operator():
+    """
+    Тест проверяет, что оператор in проверяет вхождение значения поля в значение фильтра.
+    """
+    # Подготовка
+    items = [Dummy(value) for value in [1, 2, 3, 4]]
+
+    # Действие
+    result = Prototype(items).filter(FilterDto(field_name="value", value=[2, 4], op="in")).data
+
+    # Проверки
+    assert [item.value for item in result] == [2, 4]
+
+
+def test_prototype_filter_range_index_same_as_linear(service):
+    """
+    Тест проверяет, что отбор по упорядоченному индексу (в том числе в пересечении с хеш-индексом)
+    совпадает с линейным просмотром и учитывает удаление моделей.
+    """
+    # Подготовка
+    repo = service.repo
+    transactions = repo.get_values(RepoKeys.TRANSACTIONS)
+    trans = max(transactions, key=lambda item: item.value)
+    cases = [
+        [FilterDto(field_name="value", value=trans.value, op=">=")],
+        [FilterDto(field_name="value", value=0, op="<"), FilterDto(field_name="storage.id", value=trans.storage.id, op="==")],
+        [FilterDto(field_name="value", value=trans.value, op="=="), FilterDto(field_name="product", value=trans.product, op="==")],
+    ]
+
+    # Действие
+    indexed = [Prototype(transactions).filter_mul(dtos).data for dtos in cases]
+    linear = [Prototype(list(transactions)).filter_mul(dtos).data for dtos in cases]
+    repo.delete(RepoKeys.TRANSACTIONS, trans.id)
+    after_delete = Prototype(repo.get_values(RepoKeys.TRANSACTIONS)).filter_mul(cases[0]).data
+    repo.add(RepoKeys.TRANSACTIONS, trans)
+
+    # Проверки
+    assert isinstance(repo.indexes(RepoKeys.TRANSACTIONS)["value"], RangeIndex)
+    for indexed_data, linear_data in zip(indexed, linear):
+        assert [item.id for item in indexed_data] == [item.id for item in linear_data]
+    assert trans.id in [item.id for item in indexed[2]]
+    assert trans.id not in [item.id for item in after_delete]
+
+
+def test_prototype_plan_orders_filters_by_cost(service):
+    """
+    Тест проверяет, что планировщик начинает с отбора по индексу, проверяет регулярное выражение последним
+    и что результат по плану совпадает с фильтрацией в исходном порядке.
+    """
+    # Подготовка
+    transactions = service.repo.get_values(RepoKeys.TRANSACTIONS)
+    trans = transactions[0]
+    dtos = [
+        FilterDto(field_name="product.name", value=".*", op="like"),
+        FilterDto(field_name="value", value=trans.value, op=">="),
+        FilterDto(field_name="product.id", value=trans.product.id, op="=="),
+    ]
+
+    # Действие
+    plan = Prototype(transactions).plan(dtos)
+    explain = plan.explain()
+    result = Prototype(transactions).filter_mul(dtos).data
+    sequential = [item for item in transactions if all(Prototype([item]).filter(dto).data for dto in dtos)]
+
+    # Проверки
+    assert explain["rows"] == len(transactions)
+    assert explain["steps"][0]["access"] == "index"
+    assert explain["steps"][-1]["op"] == "like"
+    assert plan.predicates[-1] is dtos[0]
+    assert [item.id for item in result] == [item.id for item in sequential]
+
+
+def test_prototype_lazy_top_k_and_page_same_as_sorted():
+    """
+    Тест проверяет, что ленивый конвейер с частичной сортировкой (limit) и страницей (offset)
+    выдаёт тот же результат, что и полная сортировка, в том числе для равных ключей.
+    """
+    # Подготовка
+    items = [Dummy(Dummy(value % 7)) for value in range(50)]
+    dtos = [FilterDto(field_name="value.value", value=0, op="!=")]
+    sorts = SortingDto(field_names=["value.value"], descending=True)
+    expected = Prototype(items).filter_mul(dtos).sort(sorts).data
+
+    # Действие
+    top = Prototype(items).lazy().filter_mul(dtos).top_k(sorts, 5)
+    page = Prototype(items).lazy().filter_mul(dtos).sort(sorts).offset(10).limit(5).data
+    unsorted_page = Prototype(items).lazy().filter_mul(dtos).offset(3).limit(2).data
+
+    # Проверки
+    assert top == expected[:5]
+    assert page == expected[10:15]
+    assert unsorted_page == Prototype(items).filter_mul(dtos).data[3:5]
+
+
+def test_prototype_filter_like_same_as_fullmatch():
+    """
+    Тест проверяет, что like и ilike (литеральные шаблоны строковыми методами и регулярные выражения)
+    совпадают с re.fullmatch, а неверный шаблон вызывает OperationException.
+    """
+    # Подготовка
+    items = [Dummy(value) for value in ["Мука", "мука пшеничная", "Сахар", "Мука\nржаная", "a.b", "axb", ""]]
+    patterns = ["Мука", "Мука.*", ".*ная", ".*ука.*", "a\\.b", "a.b", "[МС].*", ".*"]
+
+    for pattern in patterns:
+        for op, flags in (("like", 0), ("ilike", re.IGNORECASE)):
+            # Действие
+            result = Prototype(items).filter(FilterDto(field_name="value", value=pattern, op=op)).data
+
+            # Проверки
+            assert result == [item for item in items if re.fullmatch(pattern, item.value, flags)], (op, pattern)
+
+    with pytest.raises(OperationException):
+        Prototype(items).filter(FilterDto(field_name="value", value="[", op="like"))
+
+
+def test_prototype_filter_expression_same_as_python(service):
+    """
+    Тест проверяет, что дерево фильтров (and, or, not) совпадает с вычислением условия на Python,
+    узел or по индексированным полям выполняется объединением выборок индексов,
+    а неверная логическая операция вызывает OperationException.
+    """
+    # Подготовка
+    transactions = service.repo.get_values(RepoKeys.TRANSACTIONS)
+    first, second = transactions[0], transactions[len(transactions) // 2]
+    either_product = FilterExpressionDto(op="or", filters=[FilterDto(field_name="product", value=first.product),
+                                                           FilterDto(field_name="product.id", value=second.product.id)])
+    cases = [
+        (either_product, lambda t: t.product.id in (first.product.id, second.product.id)),
+        (FilterExpressionDto(filters=[FilterDto(field_name="value", value=0, op=">")], expressions=[either_product]),
+         lambda t: t.value > 0 and t.product.id in (first.product.id, second.product.id)),
+        (FilterExpressionDto(op="not", filters=[FilterDto(field_name="storage", value=first.storage),
+                                                FilterDto(field_name="value", value=0, op="<")]),
+         lambda t: not (t.storage.id == first.storage.id and t.value < 0)),
+        (FilterExpressionDto(op="or", filters=[FilterDto(field_name="value", value=0, op="<")],
+                             expressions=[FilterExpressionDto(op="not", expressions=[either_product])]),
+         lambda t: t.value < 0 or t.product.id not in (first.product.id, second.product.id)),
+    ]
+
+    for expression, condition in cases:
+        # Действие
+        result = Prototype(transactions).filter_expr(expression).data
+        lazy_result = Prototype(transactions).lazy().filter_expr(expression).data
+        linear = Prototype(list(transactions)).filter_expr(expression).data
+
+        # Проверки
+        expected = [item.id for item in transactions if condition(item)]
+        assert [item.id for item in result] == expected
+        assert [item.id for item in lazy_result] == expected
+        assert [item.id for item in linear] == expected
+
+    selective = FilterExpressionDto(op="or", filters=[FilterDto(field_name="product", value=first.product),
+                                                      FilterDto(field_name="product.id", value="unknown")])
+    plan = Prototype(transactions).plan([], selective)
+    assert plan.explain()["steps"][0]["access"] == "index"
+    assert [item.id for item in plan.execute(Prototype._operator_to_func)] == \
+           [item.id for item in transactions if item.product.id == first.product.id]
+    with pytest.raises(OperationException):
+        Prototype(transactions).filter_expr(FilterExpressionDto(op="xor"))
+
+
+def test_prototype_sort_fields_same_as_python(service):
+    """
+    Тест проверяет сортировку с направлением и положением None для каждого поля
+    (полная и частичная сортировка совпадают с sorted по составному ключу),
+    а также сортировку по полю RangeIndex и SortedList по готовому порядку.
+    """
+    # Подготовка
+    items = [Dummy(Dummy(None if value % 5 == 0 else value % 4)) for value in range(40)]
+    for number, item in enumerate(items):
+        item.number = number % 3
+    sorts = SortingDto(fields=[SortFieldDto(field_name="value.value", descending=True, nulls_first=True),
+                               SortFieldDto(field_name="number")])
+    expected = sorted(items, key=lambda item: (item.value.value is not None, -(item.value.value or 0), item.number))
+    units = service.repo.get_values(RepoKeys.MEASUREMENT_UNITS)
+    transactions = service.repo.get_values(RepoKeys.TRANSACTIONS)
+
+    # Действие
+    result = Prototype(items).sort(sorts).data
+    top = Prototype(items).lazy().sort(sorts).offset(3).limit(10).data
+    nulls_last = Prototype(items).sort(SortingDto(fields=[SortFieldDto(field_name="value.value")])).data
+    units_descending = Prototype(units).sort(SortingDto(field_names=["conversion_factor"], descending=True)).data
+    by_period = Prototype(transactions).lazy().sort(SortingDto(field_names=["period"])).limit(3).data
+
+    # Проверки
+    assert result == expected
+    assert top == expected[3:13]
+    assert nulls_last == sorted(items, key=lambda item: (item.value.value is None, item.value.value or 0))
+    assert units_descending == sorted(list(units), key=lambda item: item.conversion_factor, reverse=True)
+    assert by_period == sorted(list(transactions), key=lambda item: item.period)[:3]
+
+
 if __name__ == "__main__":
     pytest.main(['-v'])
\ No newline at end of file
@@ -1,9 +1,18 @@
+import csv
+import io
+import json
+from datetime import datetime
+
 import pytest
 
 from src.logics.responses.csv_response import CsvResponse
 from src.logics.responses.error_response import ErrorResponse
+from src.logics.responses.json_refs_response import JsonRefsResponse
 from src.logics.responses.json_response import JsonResponse
 from src.logics.responses.markdown_response import MarkdownResponse
+from src.logics.responses.ndjson_response import NdjsonResponse
+from src.logics.turnover_balance_sheet import TurnoverBalanceSheet
+from src.models.measurement_unit import MeasurementUnitModel
 from src.repository import RepoKeys
 from src.start_service import StartService
 
@@ -64,3 +73,129 @@ def test_error_response_build(products):
     # Проверка
     assert result == "Error response: some error"
 
+
+# Раскрыть ссылки {"id": ...} ответа с таблицей ссылок
+def resolve_refs(value, refs: dict):
+    if isinstance(value, dict):
+        if len(value) == 1 and value.get("id") in refs:
+            return resolve_refs(refs[value["id"]], refs)
+        return {key: resolve_refs(item, refs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(item, refs) for item in value]
+    return value
+
+# Проверить формирование Json с таблицей ссылок
+def test_json_refs_response_build(service):
+    # Подготовка
+    transactions = list(service.repo.get_values(RepoKeys.TRANSACTIONS))
+    recipes = list(service.repo.data[RepoKeys.RECIPES].values())
+
+    for data in (transactions, recipes):
+        # Действие
+        result = json.loads(JsonRefsResponse.build(data))
+
+        # Проверка
+        assert resolve_refs(result["data"], result["refs"]) == json.loads(JsonResponse.build(data))
+        assert [row["id"] for row in result["data"]] == [item.id for item in data]
+    refs = json.loads(JsonRefsResponse.build(transactions))["refs"]
+    for product_id in {item.product.id for item in transactions}:
+        assert refs[product_id]["unit"].keys() == {"id"}
+
+
+# Проверить потоковое формирование Json
+def test_json_response_stream_same_as_build(service, products):
+    # Подготовка
+    transactions = list(service.repo.get_values(RepoKeys.TRANSACTIONS))
+
+    for data in (transactions, service.repo.data, [], products[0]):
+        for response in (JsonResponse, JsonRefsResponse):
+            # Действие
+            chunks = list(response.stream(data, chunk_items=4))
+
+            # Проверка
+            assert "".join(chunks) == response.build(data)
+    assert len(list(JsonResponse.stream(transactions, chunk_items=4))) == 4
+    assert "".join(MarkdownResponse.stream(products)) == MarkdownResponse.build(products)
+
+# Проверить, что потоковый ответ не зависит от изменения данных после вызова stream
+def test_stream_snapshot_before_transfer(service, products):
+    # Подготовка
+    transactions = list(service.repo.get_values(RepoKeys.TRANSACTIONS))
+    for response in (JsonResponse, JsonRefsResponse, NdjsonResponse, CsvResponse):
+        for data in ({"products": {item.id: item for item in products}, "transactions": list(transactions)},
+                     list(transactions)):
+            if response is CsvResponse and isinstance(data, dict):
+                continue
+            expected = response.build(data)
+
+            # Действие
+            chunks = response.stream(data, chunk_items=4)
+            if isinstance(data, dict):
+                data["products"].clear()
+                data["transactions"].append(transactions[0])
+                data["added"] = []
+            else:
+                data.pop()
+
+            # Проверка
+            assert "".join(chunks) == expected
+
+# Проверить формирование NDJSON
+def test_ndjson_response_build(service, products):
+    # Подготовка
+    transactions = list(service.repo.get_values(RepoKeys.TRANSACTIONS))
+    models = [model for models in service.repo.data.values() for model in models.values()]
+
+    # Действие
+    chunks = list(NdjsonResponse.stream(transactions, chunk_items=4))
+    repository_lines = NdjsonResponse.build(service.repo.data).splitlines()
+
+    # Проверка
+    assert len(chunks) == 2
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == json.loads(JsonResponse.build(transactions))
+    assert [json.loads(line) for line in repository_lines] == json.loads(JsonResponse.build(models))
+    assert NdjsonResponse.build(products[0]) == JsonResponse.build(products[0]) + "\n"
+    assert NdjsonResponse.build([]) == ""
+
+# Проверить, что NDJSON выводит словарь моделей (остатки {id: модель}) по одной модели в строке
+def test_ndjson_response_build_models_dict(service):
+    # Подготовка
+    remains = TurnoverBalanceSheet.calculate_remains(datetime(2030, 1, 1),
+                                                     service.repo.get_values(RepoKeys.TRANSACTIONS),
+                                                     service.repo.data[RepoKeys.PRODUCTS], include_zero_values=True)
+
+    # Действие
+    lines = NdjsonResponse.build(remains).splitlines()
+
+    # Проверка
+    assert len(remains) > 1
+    assert [json.loads(line) for line in lines] == json.loads(JsonResponse.build(list(remains.values())))
+    assert NdjsonResponse.build({"status": "ok"}) == '{"status": "ok"}\n'
+
+# Проверить формирование csv со столбцами вложенных моделей и кавычками
+def test_csv_response_flattened_and_quoted(service):
+    # Подготовка
+    transactions = list(service.repo.get_values(RepoKeys.TRANSACTIONS))
+    base = MeasurementUnitModel.create('грамм; "г"\nосновная')
+    units = [base, MeasurementUnitModel.create("килограмм", 1000.0, base)]
+
+    # Действие
+    chunks = list(CsvResponse.stream(transactions, chunk_items=4))
+    rows = list(csv.reader(io.StringIO("".join(chunks)), delimiter=";"))
+    unit_rows = list(csv.reader(io.StringIO(CsvResponse.build(units)), delimiter=";"))
+
+    # Проверка
+    assert len(chunks) == 2
+    assert "".join(chunks) == CsvResponse.build(transactions)
+    header = rows[0]
+    for row, item in zip(rows[1:], transactions):
+        values = dict(zip(header, row))
+        assert values["product.name"] == item.product.name
+        assert values["product.group.name"] == item.product.group.name
+        assert values["unit.name"] == item.unit.name
+        assert values["storage.id"] == item.storage.id
+        assert float(values["value"]) == item.value
+    assert len(rows) == len(transactions) + 1
+    assert [dict(zip(unit_rows[0], row))["base_unit.name"] for row in unit_rows[1:]] == ["", base.name]
+    assert dict(zip(unit_rows[0], unit_rows[1]))["name"] == base.name
+